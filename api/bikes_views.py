@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
+from apps.core.filters import AvailabilityFilter
 from apps.bikes.models import (
     BikeCity, BikeTransmission, BikeFuelType, BikeBrand, BikeModelYear,
     Bike, BikeImage, BikeAvailability, BikeReview
@@ -46,7 +47,7 @@ class BikeViewSet(viewsets.ModelViewSet):
     queryset = Bike.objects.select_related(
         'city', 'transmission', 'fuel_type', 'brand', 'model_year', 'service_provider'
     ).prefetch_related('bike_images', 'reviews')
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, AvailabilityFilter]
     search_fields = ['bike_name', 'model', 'brand__name', 'city__name']
     filterset_fields = [
         'city', 'brand', 'fuel_type', 'transmission', 'model_year',
@@ -76,19 +77,6 @@ class BikeViewSet(viewsets.ModelViewSet):
                 Q(price_per_hour__lte=max_price) | Q(price_per_day__lte=max_price)
             )
         
-        # Filter by availability date range
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        
-        if start_date and end_date:
-            # Find bikes that are available for the requested date range
-            unavailable_bikes = BikeAvailability.objects.filter(
-                date__range=[start_date, end_date],
-                is_available=False
-            ).values_list('bike_id', flat=True)
-            
-            queryset = queryset.exclude(id__in=unavailable_bikes)
-        
         return queryset
 
     @action(detail=True, methods=['get'])
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
+from apps.core.filters import AvailabilityFilter
 from apps.cars.models import (
     CarCity, CarTransmission, CarFuelType, CarType, CarBrand, CarModelYear,
     Car, CarImage, CarAvailability, CarReview
@@ -51,7 +52,7 @@ class CarViewSet(viewsets.ModelViewSet):
     queryset = Car.objects.select_related(
         'city', 'transmission', 'fuel_type', 'vehicle_type', 'brand', 'model_year', 'service_provider'
     ).prefetch_related('car_images', 'reviews')
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, AvailabilityFilter]
     search_fields = ['car_name', 'model', 'brand__name', 'city__name']
     filterset_fields = [
         'city', 'brand', 'fuel_type', 'transmission', 'vehicle_type', 
@@ -81,18 +82,6 @@ class CarViewSet(viewsets.ModelViewSet):
                 Q(price_per_hour__lte=max_price) | Q(price_per_day__lte=max_price)
             )
         
-        # Filter by availability date range
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        
-        if start_date and end_date:
-            unavailable_cars = CarAvailability.objects.filter(
-                date__range=[start_date, end_date],
-                is_available=False
-            ).values_list('car_id', flat=True)
-            
-            queryset = queryset.exclude(id__in=unavailable_cars)
-        
         # Filter by seating capacity
         min_seats = self.request.query_params.get('min_seats')
         max_seats = self.request.query_params.get('max_seats')
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
+from apps.core.filters import AvailabilityFilter
 from apps.fulltours.models import (
     Itinerary, ItineraryImage, FulltourCity,
     Fulltour, FulltourImage, FulltourAvailability, FulltourReview
@@ -32,7 +33,7 @@ class FulltourViewSet(viewsets.ModelViewSet):
     queryset = Fulltour.objects.select_related(
         'city', 'service_provider'
     ).prefetch_related('Fulltour_images', 'reviews')
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter, AvailabilityFilter]
     search_fields = ['Fulltour_name', 'city__name']
     filterset_fields = [
         'city',
@@ -62,19 +63,6 @@ class FulltourViewSet(viewsets.ModelViewSet):
                 Q(price_per_hour__lte=max_price) | Q(price_per_day__lte=max_price)
             )
         
-        # Filter by availability date range
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        
-        if start_date and end_date:
-            # Find Fulltours that are available for the requested date range
-            unavailable_Fulltours = FulltourAvailability.objects.filter(
-                date__range=[start_date, end_date],
-                is_available=False
-            ).values_list('Fulltour_id', flat=True)
-            
-            queryset = queryset.exclude(id__in=unavailable_Fulltours)
-        
         return queryset
 
     @action(detail=True, methods=['get'])
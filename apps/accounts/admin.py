@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .models import User, OutboundEmail
 
 class UserAdmin(BaseUserAdmin):
     list_display = ('email', 'username', 'user_type', 'firm_name', 'is_verified', 'is_profile_public', 'is_staff', 'date_joined')
@@ -23,4 +23,13 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
-admin.site.register(User, UserAdmin)
\ No newline at end of file
+admin.site.register(User, UserAdmin)
+
+
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('to_email', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('to_email', 'subject')
+    readonly_fields = ('attempts', 'locked_at', 'last_error', 'created_at', 'sent_at')
+
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
@@ -0,0 +1,75 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from django.template import Context
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+SITE_NAME = 'TravellerClicks'
+
+RenderedEmail = namedtuple('RenderedEmail', ['subject', 'body', 'html_body'])
+
+
+def compiled_template(name):
+    """
+    The engine-level Template for `name`. The cached loader compiles each
+    template once per process (and drops it on autoreload in development).
+    """
+    return get_template(name).template
+
+
+@lru_cache(maxsize=None)
+def static_parts(header_color, year):
+    """
+    CSS and footer are the same for every email of a kind, so they are
+    rendered once per process (per header colour and year) and passed in
+    as already-safe context.
+    """
+    context = Context({'header_color': header_color, 'site_name': SITE_NAME, 'year': year})
+    return {
+        'email_styles': mark_safe(compiled_template('accounts/emails/_styles.html').render(context)),
+        'email_footer': mark_safe(compiled_template('accounts/emails/_footer.html').render(context)),
+    }
+
+
+class EmailTemplate:
+    """
+    Subject plus HTML and plain-text templates (accounts/emails/<name>.html
+    and .txt) for one kind of email.
+    """
+
+    def __init__(self, name, subject, header_color='#1976d2'):
+        self.name = name
+        self.subject = subject
+        self.header_color = header_color
+
+    def base_context(self):
+        year = timezone.now().year
+        return {'site_name': SITE_NAME, 'year': year, **static_parts(self.header_color, year)}
+
+    def render(self, context):
+        return self.render_batch([context])[0]
+
+    def render_batch(self, contexts):
+        """
+        Render one RenderedEmail per context dict. Templates and the shared
+        context are set up once; each message only pushes its own values.
+        """
+        html_template = compiled_template(f'accounts/emails/{self.name}.html')
+        text_template = compiled_template(f'accounts/emails/{self.name}.txt')
+        shared = Context(self.base_context())
+
+        rendered = []
+        for context in contexts:
+            with shared.push(context):
+                rendered.append(RenderedEmail(
+                    self.subject,
+                    text_template.render(shared).strip(),
+                    html_template.render(shared),
+                ))
+        return rendered
+
+
+VERIFICATION_EMAIL = EmailTemplate('verification', 'Verify your TravellerClicks account')
+WELCOME_EMAIL = EmailTemplate('welcome', 'Welcome to TravellerClicks - Your Account is Active!', header_color='#4caf50')
@@ -0,0 +1,46 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from apps.accounts.outbox import claim_batch, deliver
+
+
+class Command(BaseCommand):
+    help = 'Send emails queued in the outbox using a pool of sender threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Sender threads, each with its own SMTP connection')
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails claimed per round')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Drain what is due now and exit')
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        total = 0
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='outbox') as pool:
+            while True:
+                close_old_connections()
+                batch = claim_batch(options['batch_size'])
+                if not batch:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                # Split the batch so each thread reuses one SMTP session for its share
+                chunks = [batch[i::workers] for i in range(workers) if batch[i::workers]]
+                sent = sum(pool.map(self.deliver_chunk, chunks))
+                total += sent
+                self.stdout.write(f'Sent {sent} of {len(batch)} emails')
+
+        self.stdout.write(self.style.SUCCESS(f'Outbox drained, {total} emails sent'))
+
+    def deliver_chunk(self, emails):
+        try:
+            return deliver(emails)
+        finally:
+            # Threads get their own DB connections; don't leak them between rounds
+            connections.close_all()
@@ -0,0 +1,110 @@
+import os
+import socketserver
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for Django's SMTP backend and keeps every message"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def handle(self):
+        self.reply('220 smtp-sink ready')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb == 'EHLO':
+                self.reply('250-smtp-sink')
+                self.reply('250 AUTH PLAIN LOGIN')
+            elif verb == 'HELO':
+                self.reply('250 smtp-sink')
+            elif verb == 'AUTH':
+                # Any credentials are accepted
+                mechanism = command.split(' ')[1:]
+                if mechanism[:1] == ['LOGIN']:
+                    self.reply('334 VXNlcm5hbWU6')
+                    self.rfile.readline()
+                    self.reply('334 UGFzc3dvcmQ6')
+                    self.rfile.readline()
+                elif len(mechanism) == 1:
+                    self.reply('334 ')
+                    self.rfile.readline()
+                self.reply('235 Authentication successful')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip(), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip())
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                self.server.store(sender, recipients, self.read_data())
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                if verb == 'RSET':
+                    sender, recipients = None, []
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b'.\r\n', b'.\n'):
+                break
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b'..') else line)
+        return b''.join(lines)
+
+
+class SMTPSinkServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, maildir, stdout):
+        super().__init__(address, SMTPSinkHandler)
+        self.maildir = maildir
+        self.stdout = stdout
+        self.count = 0
+
+    def store(self, sender, recipients, data):
+        self.count += 1
+        if self.maildir:
+            path = os.path.join(self.maildir, f'{time.time():.6f}-{self.count}.eml')
+            with open(path, 'wb') as f:
+                f.write(data)
+        self.stdout.write(f'Message {self.count} from {sender} to {", ".join(recipients)} ({len(data)} bytes)')
+
+
+class Command(BaseCommand):
+    help = 'Run a local SMTP stand-in that accepts and stores every message (for tests and development)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1025)
+        parser.add_argument('--maildir', default='', help='Directory to write received messages to as .eml files')
+
+    def handle(self, *args, **options):
+        if options['maildir']:
+            os.makedirs(options['maildir'], exist_ok=True)
+
+        server = SMTPSinkServer((options['host'], options['port']), options['maildir'], self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"SMTP sink listening on {options['host']}:{options['port']}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -1,6 +1,21 @@
 # Generated by Django 5.1.7 on 2025-09-28 09:00
 
-from django.db import migrations, models
+from django.db import migrations
+
+# 0001_initial was regenerated with these columns, so only databases created
+# from the earlier 0001 lack them; the model state already has them
+COLUMNS = ['verification_token', 'verification_token_expires']
+
+
+def add_missing_columns(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        existing = {column.name for column in connection.introspection.get_table_description(cursor, User._meta.db_table)}
+    for name in COLUMNS:
+        field = User._meta.get_field(name)
+        if field.column not in existing:
+            schema_editor.add_field(User, field)
 
 
 class Migration(migrations.Migration):
@@ -10,14 +25,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.AddField(
-            model_name='user',
-            name='verification_token',
-            field=models.CharField(blank=True, max_length=255, null=True),
-        ),
-        migrations.AddField(
-            model_name='user',
-            name='verification_token_expires',
-            field=models.DateTimeField(blank=True, null=True),
-        ),
-    ]
\ No newline at end of file
+        migrations.RunPython(add_missing_columns, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,24 @@
 # Generated by Django 5.1.7 on 2025-10-02 05:35
 
-from django.db import migrations, models
+from django.db import migrations
+
+# 0001_initial was regenerated with these columns, so only databases created
+# from the earlier 0001 lack them; the model state already has them
+COLUMNS = [
+    'business_address', 'business_registration', 'emergency_contact', 'emergency_contact_name',
+    'firm_name', 'helpdesk_number', 'is_profile_public',
+]
+
+
+def add_missing_columns(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        existing = {column.name for column in connection.introspection.get_table_description(cursor, User._meta.db_table)}
+    for name in COLUMNS:
+        field = User._meta.get_field(name)
+        if field.column not in existing:
+            schema_editor.add_field(User, field)
 
 
 class Migration(migrations.Migration):
@@ -10,39 +28,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.AddField(
-            model_name='user',
-            name='business_address',
-            field=models.TextField(blank=True, null=True),
-        ),
-        migrations.AddField(
-            model_name='user',
-            name='business_registration',
-            field=models.CharField(blank=True, max_length=100, null=True),
-        ),
-        migrations.AddField(
-            model_name='user',
-            name='emergency_contact',
-            field=models.CharField(blank=True, max_length=15, null=True),
-        ),
-        migrations.AddField(
-            model_name='user',
-            name='emergency_contact_name',
-            field=models.CharField(blank=True, max_length=255, null=True),
-        ),
-        migrations.AddField(
-            model_name='user',
-            name='firm_name',
-            field=models.CharField(blank=True, max_length=255, null=True),
-        ),
-        migrations.AddField(
-            model_name='user',
-            name='helpdesk_number',
-            field=models.CharField(blank=True, max_length=15, null=True),
-        ),
-        migrations.AddField(
-            model_name='user',
-            name='is_profile_public',
-            field=models.BooleanField(default=True),
-        ),
+        migrations.RunPython(add_missing_columns, migrations.RunPython.noop),
     ]
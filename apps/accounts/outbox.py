@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+# Retry delays grow 30s, 60s, 120s, ... capped at one hour
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+
+# A row left in 'sending' this long belongs to a worker that died mid-batch
+SENDING_LEASE = timedelta(minutes=10)
+
+
+def queue_email(to_email, subject, body, html_body=''):
+    """
+    Add an email to the outbox. This is a single INSERT in the caller's
+    transaction; the worker picks it up once that transaction commits.
+    """
+    return OutboundEmail.objects.create(to_email=to_email, subject=subject, body=body, html_body=html_body)
+
+
+def queue_emails(messages, batch_size=500):
+    """
+    Add many emails to the outbox with bulk INSERTs.
+    `messages` is an iterable of (to_email, subject, body, html_body).
+    """
+    return OutboundEmail.objects.bulk_create(
+        [OutboundEmail(to_email=to_email, subject=subject, body=body, html_body=html_body)
+         for to_email, subject, body, html_body in messages],
+        batch_size=batch_size,
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt after `attempts` failed ones"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to `batch_size` due emails as 'sending' and return them.
+    Rows are locked with SKIP LOCKED where the database supports it so
+    several workers can drain the outbox without sending anything twice.
+    """
+    now = timezone.now()
+    abandoned = Q(status='sending', locked_at__lt=now - SENDING_LEASE)
+    due = OutboundEmail.objects.filter(
+        Q(status='pending', next_attempt_at__lte=now)
+        | abandoned & Q(attempts__lt=F('max_attempts'))
+    ).order_by('next_attempt_at')
+
+    with transaction.atomic():
+        # Each claim counted as an attempt, so an email whose sends keep
+        # killing the worker stops here like any other failing one
+        OutboundEmail.objects.filter(abandoned, attempts__gte=F('max_attempts')).update(
+            status='failed', locked_at=None, last_error='Worker stopped while sending',
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            status='sending', locked_at=now, attempts=F('attempts') + 1,
+        )
+    for email in batch:
+        email.attempts += 1
+    return batch
+
+
+def deliver(emails):
+    """
+    Send claimed emails over one backend connection and record the outcome
+    of each. Failures are rescheduled with backoff until max_attempts.
+    Returns the number sent.
+    """
+    backend = get_connection(fail_silently=False)
+    try:
+        backend.open()
+    except Exception as e:
+        # SMTP unreachable: reschedule the whole chunk instead of leaving it claimed
+        for email in emails:
+            mark_failed(email, e)
+        return 0
+
+    sent = 0
+    try:
+        for email in emails:
+            message = EmailMultiAlternatives(
+                subject=email.subject,
+                body=email.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email.to_email],
+                connection=backend,
+            )
+            if email.html_body:
+                message.attach_alternative(email.html_body, 'text/html')
+
+            try:
+                message.send()
+            except Exception as e:
+                mark_failed(email, e)
+            else:
+                OutboundEmail.objects.filter(pk=email.pk).update(
+                    status='sent', sent_at=timezone.now(), locked_at=None, last_error='',
+                )
+                sent += 1
+    finally:
+        backend.close()
+    return sent
+
+
+def mark_failed(email, error):
+    if email.attempts >= email.max_attempts:
+        status, next_attempt_at = 'failed', email.next_attempt_at
+    else:
+        status, next_attempt_at = 'pending', timezone.now() + retry_delay(email.attempts)
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status=status, next_attempt_at=next_attempt_at, locked_at=None, last_error=str(error),
+    )
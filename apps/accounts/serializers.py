@@ -1,9 +1,10 @@
 ﻿from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
+from apps.core.serializers import DirectUploadMixin
 from .models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DirectUploadMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
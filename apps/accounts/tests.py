@@ -0,0 +1,75 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import OutboundEmail
+from .outbox import RETRY_MAX_SECONDS, SENDING_LEASE, claim_batch, deliver, queue_email, retry_delay
+
+
+class OutboxTests(TestCase):
+    def test_registration_queues_the_verification_email(self):
+        response = APIClient().post('/api/accounts/register/', {
+            'username': 'traveller', 'email': 'traveller@example.com',
+            'password': 'Xy12345678!', 'password_confirm': 'Xy12345678!',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.to_email, email.status), ('traveller@example.com', 'pending'))
+        # Nothing is sent inside the request
+        self.assertEqual(mail.outbox, [])
+
+    def test_claimed_emails_are_sent_once(self):
+        queue_email('a@example.com', 'Subject', 'Body', '<p>Body</p>')
+
+        batch = claim_batch(10)
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch[0].attempts, 1)
+        self.assertEqual(OutboundEmail.objects.get().status, 'sending')
+        # Claimed rows are not handed to another worker
+        self.assertEqual(claim_batch(10), [])
+
+        self.assertEqual(deliver(batch), 1)
+        self.assertEqual(OutboundEmail.objects.get().status, 'sent')
+        self.assertEqual([message.to for message in mail.outbox], [['a@example.com']])
+
+    def test_failed_sends_are_retried_with_backoff(self):
+        queue_email('a@example.com', 'Subject', 'Body')
+
+        with mock.patch('apps.accounts.outbox.EmailMultiAlternatives.send', side_effect=SMTPException('refused')):
+            self.assertEqual(deliver(claim_batch(10)), 0)
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('pending', 1, 'refused'))
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=25))
+        # Not due again until the delay has passed
+        self.assertEqual(claim_batch(10), [])
+
+    def test_retry_delay_doubles_up_to_the_cap(self):
+        self.assertEqual([retry_delay(attempts).total_seconds() for attempts in (1, 2, 3)], [30, 60, 120])
+        self.assertEqual(retry_delay(50).total_seconds(), RETRY_MAX_SECONDS)
+
+    def test_emails_fail_after_max_attempts(self):
+        queue_email('a@example.com', 'Subject', 'Body')
+        OutboundEmail.objects.update(max_attempts=1)
+
+        with mock.patch('apps.accounts.outbox.EmailMultiAlternatives.send', side_effect=SMTPException('refused')):
+            deliver(claim_batch(10))
+
+        self.assertEqual(OutboundEmail.objects.get().status, 'failed')
+
+    def test_abandoned_emails_are_reclaimed_until_attempts_run_out(self):
+        expired = timezone.now() - SENDING_LEASE - timedelta(minutes=1)
+        retried = queue_email('a@example.com', 'Subject', 'Body')
+        exhausted = queue_email('b@example.com', 'Subject', 'Body')
+        OutboundEmail.objects.update(status='sending', locked_at=expired, attempts=2, max_attempts=3)
+        OutboundEmail.objects.filter(pk=exhausted.pk).update(attempts=3)
+
+        self.assertEqual([email.pk for email in claim_batch(10)], [retried.pk])
+        exhausted.refresh_from_db()
+        self.assertEqual((exhausted.status, exhausted.locked_at), ('failed', None))
@@ -1,3 +1,5 @@
+import logging
+
 from django.shortcuts import render
 from django.conf import settings
 from rest_framework import generics, status
@@ -6,7 +8,6 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate
-from django.utils import timezone
 from django.db import transaction
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
@@ -14,6 +15,8 @@ from .models import User
 from .serializers import UserSerializer, UserRegistrationSerializer, UserLoginSerializer
 from .email_utils import send_verification_email, send_welcome_email
 
+logger = logging.getLogger(__name__)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register_view(request):
@@ -28,36 +31,28 @@ def register_view(request):
     
     try:
         with transaction.atomic():  # Ensure data consistency
-            # Use Django's built-in create_user method for better security
-            user = User.objects.create_user(
-                username=serializer.validated_data['username'],
-                email=serializer.validated_data['email'],
-                password=serializer.validated_data['password'],
+            # Same normalisation and password hashing as create_user, but the
+            # verification token is set before the single INSERT
+            user = User(
+                username=User.normalize_username(serializer.validated_data['username']),
+                email=User.objects.normalize_email(serializer.validated_data['email']),
                 first_name=serializer.validated_data.get('first_name', ''),
                 last_name=serializer.validated_data.get('last_name', ''),
                 phone_number=serializer.validated_data.get('phone_number', ''),
                 location=serializer.validated_data.get('location', ''),
                 is_verified=False
             )
-            
-            # Generate verification token
+            user.set_password(serializer.validated_data['password'])
             user.generate_verification_token()
-            user.save(update_fields=['verification_token', 'verification_token_expires'])
+            user.save()
             
-            # Send verification email asynchronously would be better for performance
-            email_sent = send_verification_email(user)
+            # Queued in the outbox and sent by the worker once this commits
+            send_verification_email(user)
             
-            if email_sent:
-                return Response({
-                    'message': 'Registration successful! Please check your email for a verification link.',
-                    'email': user.email
-                }, status=status.HTTP_201_CREATED)
-            else:
-                return Response({
-                    'message': 'Registration successful but failed to send verification email. Please contact support.',
-                    'email': user.email,
-                    'requires_resend': True
-                }, status=status.HTTP_201_CREATED)
+            return Response({
+                'message': 'Registration successful! Please check your email for a verification link.',
+                'email': user.email
+            }, status=status.HTTP_201_CREATED)
                 
     except ValidationError as e:
         return Response({
@@ -126,6 +121,7 @@ def profile_view(request):
         serializer = UserSerializer(request.user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            cache.delete(f"user_data_{request.user.id}")
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -141,18 +137,7 @@ def verify_email_view(request):
             'success': False
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Debug logging
-    print(f"DEBUG: Received verification token: {token}")
-    
     try:
-        # First, let's see if any user has this token (regardless of verification status)
-        users_with_token = User.objects.filter(verification_token=token)
-        print(f"DEBUG: Found {users_with_token.count()} users with this token")
-        
-        if users_with_token.exists():
-            for user in users_with_token:
-                print(f"DEBUG: User {user.email} - is_verified: {user.is_verified}, token_expires: {user.verification_token_expires}")
-        
         # Use select_for_update for concurrency safety
         with transaction.atomic():
             user = User.objects.select_for_update().get(
@@ -160,11 +145,8 @@ def verify_email_view(request):
                 is_verified=False  # Only get unverified users
             )
             
-            print(f"DEBUG: Found unverified user: {user.email}")
-            
             # Check if token is valid and not expired
             if user.is_verification_token_valid(token):
-                print(f"DEBUG: Token is valid for user {user.email}")
                 # Verify the user atomically
                 user.is_verified = True
                 user.verification_token = None  # Clear the token
@@ -175,7 +157,7 @@ def verify_email_view(request):
                 cache_key = f"user_data_{user.id}"
                 cache.delete(cache_key)
                 
-                # Send welcome email (could be made async for better performance)
+                # Queued in the outbox and sent by the worker once this commits
                 send_welcome_email(user)
                 
                 return Response({
@@ -184,8 +166,7 @@ def verify_email_view(request):
                     'can_login': True
                 }, status=status.HTTP_200_OK)
             else:
-                print(f"DEBUG: Token is invalid or expired for user {user.email}")
-                print(f"DEBUG: Token expiry: {user.verification_token_expires}, Current time: {timezone.now()}")
+                logger.debug('Expired verification token for user %s', user.pk)
                 return Response({
                     'error': 'Verification token is invalid or has expired. Please request a new verification email.',
                     'success': False,
@@ -193,13 +174,13 @@ def verify_email_view(request):
                 }, status=status.HTTP_400_BAD_REQUEST)
                 
     except User.DoesNotExist:
-        print(f"DEBUG: No unverified user found with token: {token}")
+        logger.debug('Verification token matched no unverified user')
         return Response({
             'error': 'Invalid verification token or account already verified.',
             'success': False
         }, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        print(f"DEBUG: Exception during verification: {str(e)}")
+        logger.exception('Email verification failed')
         return Response({
             'error': 'Verification failed. Please try again.',
             'success': False,
@@ -219,9 +200,10 @@ def resend_verification_view(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Check rate limiting (basic implementation)
+        # Rate limit: cache.add only succeeds for the first request in the
+        # window, atomically across workers sharing the cache
         rate_limit_key = f"resend_verification_{email}"
-        if cache.get(rate_limit_key):
+        if not cache.add(rate_limit_key, True, 60):
             return Response({
                 'error': 'Please wait before requesting another verification email.',
                 'can_retry_after': 60  # seconds
@@ -239,22 +221,13 @@ def resend_verification_view(request):
         user.generate_verification_token()
         user.save(update_fields=['verification_token', 'verification_token_expires'])
         
-        # Send new verification email
-        email_sent = send_verification_email(user)
+        # Queue the new verification email
+        send_verification_email(user)
         
-        if email_sent:
-            # Set rate limit (1 minute)
-            cache.set(rate_limit_key, True, 60)
-            
-            return Response({
-                'message': 'New verification email sent successfully. Please check your inbox.',
-                'email_sent': True
-            }, status=status.HTTP_200_OK)
-        else:
-            return Response({
-                'error': 'Failed to send verification email. Please try again later.',
-                'email_sent': False
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({
+            'message': 'New verification email sent successfully. Please check your inbox.',
+            'email_sent': True
+        }, status=status.HTTP_200_OK)
             
     except User.DoesNotExist:
         # Don't reveal if email exists for security
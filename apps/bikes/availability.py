@@ -0,0 +1,5 @@
+from apps.core.availability import register_daily_table
+
+from .models import BikeAvailability
+
+bike_calendar = register_daily_table(BikeAvailability, 'bike')
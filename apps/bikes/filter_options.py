@@ -0,0 +1,15 @@
+from apps.core.filter_options import cached_filter_options
+
+from .models import BikeBrand, BikeCity, BikeFuelType, BikeModelYear, BikeRentalType, BikeTransmission
+
+
+@cached_filter_options('bikes', [BikeBrand, BikeCity, BikeModelYear, BikeTransmission, BikeFuelType, BikeRentalType])
+def bike_filter_options():
+    return {
+        'brands': list(BikeBrand.objects.values_list('name', flat=True).distinct()),
+        'cities': list(BikeCity.objects.values_list('name', flat=True).distinct()),
+        'model_years': list(BikeModelYear.objects.values_list('year', flat=True).order_by('-year')),
+        'transmissions': list(BikeTransmission.objects.values_list('type', flat=True).distinct()),
+        'fuel_types': list(BikeFuelType.objects.values_list('type', flat=True).distinct()),
+        'rental_types': list(BikeRentalType.objects.values_list('type', flat=True).distinct()),
+    }
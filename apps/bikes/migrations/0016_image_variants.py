@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bikes', '0015_rating_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bikeimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Thumbnails and resized copies, see apps.core.images'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import apps.bikes.utils
+import apps.core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bikes', '0017_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bikeimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.bikes.utils.bike_image_upload_path),
+        ),
+    ]
@@ -0,0 +1,10 @@
+from apps.search.indexes import register_search_index
+
+from .models import Bike
+
+bike_index = register_search_index(
+    Bike, 'bike',
+    keywords=['model', 'brand__name', 'city__name', 'fuel_type__type', 'transmission__type'],
+    body=['description'],
+    city='city__name',
+)
@@ -1,10 +1,13 @@
 from rest_framework import serializers
+from apps.core.serializers import DirectUploadMixin, EagerLoadingMixin, ImageVariantsField, PrimaryImageVariantsField
 from .models import BikeBrand, BikeCity, PickupLocation, Bike, BikeTransmission, BikeFuelType, BikeRentalType, BikeImage, BikeModelYear
 
-class BikeImageSerializer(serializers.ModelSerializer):
+class BikeImageSerializer(DirectUploadMixin, serializers.ModelSerializer):
+    variants = ImageVariantsField()
+
     class Meta:
         model = BikeImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'created_at']
+        fields = ['id', 'image', 'width', 'height', 'placeholder', 'variants', 'alt_text', 'is_primary', 'created_at']
 
 class BikeBrandSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,14 +34,16 @@ class BikeTransmissionSerializer(serializers.ModelSerializer):
         model = BikeTransmission
         fields = '__all__'
 
-class PickupLocationSerializer(serializers.ModelSerializer):
+class PickupLocationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     city_name = serializers.CharField(source='city.name', read_only=True)
     
+    select_related_fields = ('city',)
+    
     class Meta:
         model = PickupLocation
         fields = ['id', 'name', 'address', 'city', 'city_name', 'latitude', 'longitude']
 
-class BikeSerializer(serializers.ModelSerializer):
+class BikeSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     brand_name = serializers.CharField(source='brand.name', read_only=True)
     city_name = serializers.CharField(source='city.name', read_only=True)
     service_provider_name = serializers.CharField(source='service_provider.username', read_only=True)
@@ -49,7 +54,14 @@ class BikeSerializer(serializers.ModelSerializer):
     bike_images = BikeImageSerializer(many=True, read_only=True)
     primary_image = serializers.CharField(read_only=True)
     all_images = serializers.ListField(read_only=True)
+    primary_image_variants = PrimaryImageVariantsField('bike_images')
     model_year_display = serializers.CharField(source='model_year.year', read_only=True)  # Display the year
+    rating_breakdown = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    
+    select_related_fields = (
+        'brand', 'city', 'service_provider', 'transmission', 'fuel_type', 'rental_type', 'model_year'
+    )
+    prefetch_related_fields = ('pickup_locations__city', 'bike_images')
     
     class Meta:
         model = Bike
@@ -60,8 +72,8 @@ class BikeSerializer(serializers.ModelSerializer):
             'engine_capacity', 'mileage', 'city', 'city_name', 'pickup_locations',
             'price_per_hour', 'price_per_day', 'price_per_week', 'price_per_month', 
             'safety_deposit', 'operating_hours', 'available', 'documents_required',
-            'terms_and_conditions', 'bike_images', 'primary_image', 'all_images', 
-            'rating', 'total_reviews', 'total_trips', 'created_at'
+            'terms_and_conditions', 'bike_images', 'primary_image', 'primary_image_variants', 'all_images', 
+            'rating', 'total_reviews', 'rating_breakdown', 'total_trips', 'created_at'
         ]
         read_only_fields = ['id', 'service_provider', 'rating', 'total_reviews', 'created_at']
 
@@ -0,0 +1,39 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.core.management.commands.seed_catalogue import IMAGES_PER_LISTING
+
+from .models import Bike, BikeImage
+
+# The list endpoint's queries whatever the number of bikes: the count, the
+# page, and prefetches of pickup locations, their cities and the images
+LIST_QUERIES = 5
+
+
+@override_settings(IMAGE_PIPELINE_WORKERS=0)
+class BikeListQueryCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Seeded images are written to disk; keep them out of MEDIA_ROOT
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root))
+        super().setUpClass()
+
+    def test_list_queries_do_not_grow_with_the_catalogue(self):
+        client = APIClient()
+        # seed_catalogue extends the catalogue already there
+        for size in (1, 20, 200):
+            with self.subTest(size=size):
+                call_command('seed_catalogue', size=size, stdout=StringIO())
+                self.assertEqual(Bike.objects.count(), size)
+                self.assertEqual(BikeImage.objects.count(), size * IMAGES_PER_LISTING)
+
+                with self.assertNumQueries(LIST_QUERIES):
+                    response = client.get('/api/bikes/')
+                self.assertEqual(response.status_code, 200)
@@ -1,18 +1,24 @@
-from rest_framework import generics, viewsets, filters, status
+from rest_framework import generics, viewsets, filters
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
 from .models import Bike, BikeBrand, BikeCity, BikeFuelType, BikeTransmission, BikeModelYear, PickupLocation
 from .serializers import BikeSerializer, BikeCreateSerializer, BikeBrandSerializer, BikeCitySerializer, BikeFuelTypeSerializer, BikeTransmissionSerializer, BikeModelYearSerializer, PickupLocationSerializer
-from .location_utils import haversine_distance
+from apps.core.geo import annotate_nearest_pickup
+from apps.core.pagination import DistanceCursorPagination
+from apps.bookings.views import BookItemView
+from apps.core.filters import AvailabilityFilter
+from apps.core.views import EagerLoadingViewMixin, FilterOptionsView
+from apps.search.filters import IndexSearchFilter
+from .filter_options import bike_filter_options
 
-class BikeViewSet(viewsets.ModelViewSet):
+class BikeViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     queryset = Bike.objects.all()
     serializer_class = BikeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['brand', 'city', 'transmission', 'fuel_type', 'model_year', 'available']
     search_fields = ['title', 'model', 'description', 'brand__name', 'city__name']
     ordering_fields = ['price_per_day', 'rating', 'created_at']
@@ -21,17 +27,17 @@ class BikeViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(service_provider=self.request.user)
 
-class BikeRentView(generics.ListAPIView):
+class BikeRentView(EagerLoadingViewMixin, generics.ListAPIView):
     serializer_class = BikeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
         return Bike.objects.filter(available=True)
 
-class AvailableBikesView(generics.ListAPIView):
+class AvailableBikesView(EagerLoadingViewMixin, generics.ListAPIView):
     serializer_class = BikeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, IndexSearchFilter, AvailabilityFilter]
     filterset_fields = ['brand', 'city', 'transmission', 'fuel_type']
     search_fields = ['title', 'model', 'description']
     
@@ -49,20 +55,16 @@ class AvailableBikesView(generics.ListAPIView):
             
         return queryset.order_by('-rating')
 
-class BookBikeView(generics.CreateAPIView):
-    permission_classes = [IsAuthenticated]
-    
-    def post(self, request):
-        # This would integrate with the bookings app
-        # For now, just return success response
-        return Response({"message": "Booking request submitted"}, status=status.HTTP_201_CREATED)
+class BookBikeView(BookItemView):
+    item_model = Bike
+    service_type = 'bike'
 
-class BikeDetailView(generics.RetrieveAPIView):
+class BikeDetailView(EagerLoadingViewMixin, generics.RetrieveAPIView):
     queryset = Bike.objects.all()
     serializer_class = BikeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-class BikeFilterView(generics.ListAPIView):
+class BikeFilterView(EagerLoadingViewMixin, generics.ListAPIView):
     serializer_class = BikeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
@@ -83,38 +85,19 @@ class BikeFilterView(generics.ListAPIView):
             
         return queryset.order_by('-rating')
 
-class BikeFilterOptionsView(generics.GenericAPIView):
+class BikeFilterOptionsView(FilterOptionsView):
     """View to provide filter options for the frontend"""
     permission_classes = [IsAuthenticatedOrReadOnly]
-    
-    def get(self, request):
-        # Import related models
-        from .models import BikeTransmission, BikeFuelType, BikeRentalType
-        
-        # Get all unique filter options from the database
-        brands = list(BikeBrand.objects.values_list('name', flat=True).distinct())
-        cities = list(BikeCity.objects.values_list('name', flat=True).distinct())
-        model_years = list(BikeModelYear.objects.values_list('year', flat=True).order_by('-year'))
-        transmissions = list(BikeTransmission.objects.values_list('type', flat=True).distinct())
-        fuel_types = list(BikeFuelType.objects.values_list('type', flat=True).distinct())
-        rental_types = list(BikeRentalType.objects.values_list('type', flat=True).distinct())
-        
-        return Response({
-            'brands': brands,
-            'cities': cities,
-            'model_years': model_years,
-            'transmissions': transmissions,
-            'fuel_types': fuel_types,
-            'rental_types': rental_types,
-        })
+    filter_options = bike_filter_options
 
-class NearbyBikesView(generics.ListAPIView):
+class NearbyBikesView(EagerLoadingViewMixin, generics.ListAPIView):
     """View to get bikes near a specific location, sorted by distance"""
     serializer_class = BikeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = DistanceCursorPagination
     
     def list(self, request, *args, **kwargs):
-        queryset = Bike.objects.filter(available=True)
+        queryset = self.filter_queryset(Bike.objects.filter(available=True))
         
         # Get user coordinates from query parameters
         user_lat = self.request.query_params.get('lat')
@@ -135,58 +118,34 @@ class NearbyBikesView(generics.ListAPIView):
             serializer = self.get_serializer(queryset, many=True)
             return Response(serializer.data)
         
-        # Calculate distances for all bikes and filter by radius
-        bikes_with_distance = []
-        
-        for bike in queryset:
-            closest_distance = float('inf')
-            closest_pickup_location = None
-            
-            # Find the closest pickup location for each bike
-            for pickup_location in bike.pickup_locations.all():
-                if pickup_location.latitude and pickup_location.longitude:
-                    distance = haversine_distance(
-                        user_lat, user_lng,
-                        float(pickup_location.latitude),
-                        float(pickup_location.longitude)
-                    )
-                    if distance < closest_distance:
-                        closest_distance = distance
-                        closest_pickup_location = pickup_location
-            
-            # Add bike to results if within radius
-            if closest_distance <= radius and closest_pickup_location:
-                bikes_with_distance.append({
-                    'bike': bike,
-                    'distance': round(closest_distance, 2),
-                    'closest_pickup': closest_pickup_location
-                })
-        
-        # Sort by distance (ascending - nearest first)
-        bikes_with_distance.sort(key=lambda x: x['distance'])
+        # Distance to the closest pickup location is computed, filtered and
+        # ordered in SQL; only the requested page is materialized
+        queryset = annotate_nearest_pickup(queryset, user_lat, user_lng, radius)
+        page = self.paginate_queryset(queryset)
+        closest_pickups = PickupLocation.objects.in_bulk([bike.closest_pickup_id for bike in page])
         
         # Serialize bikes and add distance information
         result_data = []
-        for item in bikes_with_distance:
-            bike_data = self.get_serializer(item['bike']).data
-            bike_data['distance_km'] = item['distance']
+        for bike, bike_data in zip(page, self.get_serializer(page, many=True).data):
+            closest_pickup = closest_pickups[bike.closest_pickup_id]
+            bike_data['distance_km'] = round(bike.distance, 2)
             bike_data['closest_pickup_location'] = {
-                'id': item['closest_pickup'].id,
-                'name': item['closest_pickup'].name,
-                'address': item['closest_pickup'].address,
-                'latitude': str(item['closest_pickup'].latitude),
-                'longitude': str(item['closest_pickup'].longitude),
+                'id': closest_pickup.id,
+                'name': closest_pickup.name,
+                'address': closest_pickup.address,
+                'latitude': str(closest_pickup.latitude),
+                'longitude': str(closest_pickup.longitude),
             }
             result_data.append(bike_data)
         
-        return Response(result_data)
+        return self.get_paginated_response(result_data)
 
 class BikeModelYearViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = BikeModelYear.objects.all()
     serializer_class = BikeModelYearSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-class PickupLocationViewSet(viewsets.ReadOnlyModelViewSet):
+class PickupLocationViewSet(EagerLoadingViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PickupLocation.objects.all()
     serializer_class = PickupLocationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
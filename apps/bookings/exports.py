@@ -0,0 +1,143 @@
+import csv
+import tempfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+from openpyxl import Workbook
+
+from .models import Booking, BookingPayment
+
+# Rows fetched per round trip; on PostgreSQL iterator() reads them through a server-side cursor
+CHUNK_SIZE = 2000
+# Rows joined into one chunk of a streamed response
+LINES_PER_CHUNK = 500
+XLSX_MAX_ROWS = 1_048_575  # sheet limit minus the header row
+# Text starting with these is run as a formula by spreadsheet applications
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ExportDataset:
+    """Columns of an export as (header, queryset lookup) pairs over `model`"""
+
+    def __init__(self, name, model, columns, owner_lookup):
+        self.name = name
+        self.model = model
+        self.headers = [header for header, _ in columns]
+        self.lookups = [lookup for _, lookup in columns]
+        self.owner_lookup = owner_lookup
+
+    def queryset_for(self, user):
+        """Everything for staff, otherwise only what the service provider received"""
+        queryset = self.model.objects.all()
+        if not user.is_staff:
+            queryset = queryset.filter(**{self.owner_lookup: user})
+        return queryset
+
+    def rows(self, queryset):
+        return queryset.order_by('pk').values_list(*self.lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+BOOKINGS = ExportDataset('bookings', Booking, [
+    ('booking_reference', 'booking_reference'),
+    ('service_type', 'service_type'),
+    ('object_id', 'object_id'),
+    ('status', 'status'),
+    ('payment_status', 'payment_status'),
+    ('start_date', 'start_date'),
+    ('end_date', 'end_date'),
+    ('duration_days', 'duration_days'),
+    ('base_cost', 'base_cost'),
+    ('additional_charges', 'additional_charges'),
+    ('discount', 'discount'),
+    ('total_cost', 'total_cost'),
+    ('security_deposit', 'security_deposit'),
+    ('user_email', 'user__email'),
+    ('contact_name', 'contact_name'),
+    ('contact_phone', 'contact_phone'),
+    ('contact_email', 'contact_email'),
+    ('pickup_location', 'pickup_location'),
+    ('drop_location', 'drop_location'),
+    ('created_at', 'created_at'),
+], owner_lookup='service_provider')
+
+PAYMENTS = ExportDataset('payments', BookingPayment, [
+    ('booking_reference', 'booking__booking_reference'),
+    ('transaction_id', 'transaction_id'),
+    ('payment_method', 'payment_method'),
+    ('amount', 'amount'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('processed_at', 'processed_at'),
+], owner_lookup='booking__service_provider')
+
+DATASETS = {dataset.name: dataset for dataset in (BOOKINGS, PAYMENTS)}
+
+
+class Echo:
+    """File-like object that hands back what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def chunked(lines):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= LINES_PER_CHUNK:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def escape_formula(value):
+    """
+    Client-entered text (contact names, locations) as inert text in a
+    spreadsheet. The importer strips the quote again, so a "+91..." phone
+    survives a round trip; text that really began with a quote before one
+    of FORMULA_PREFIXES loses it.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def unescape_formula(value):
+    """Undo escape_formula for a cell read back from a CSV or XLSX export"""
+    if isinstance(value, str) and value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def csv_stream(headers, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    yield from chunked(writer.writerow([escape_formula(value) for value in row]) for row in rows)
+
+
+def jsonl_stream(headers, rows):
+    encoder = DjangoJSONEncoder()
+    yield from chunked(encoder.encode(dict(zip(headers, row))) + '\n' for row in rows)
+
+
+def xlsx_file(headers, rows):
+    """
+    Write the rows to an unnamed temporary .xlsx file and return it rewound.
+    Write-only mode keeps one row in memory at a time; the zip container
+    can only be streamed once it is complete.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for count, row in enumerate(rows, 1):
+        if count > XLSX_MAX_ROWS:
+            raise ValueError(f'More than {XLSX_MAX_ROWS} rows do not fit in one sheet; export CSV or JSONL instead')
+        # Excel has no timezone-aware datetimes
+        sheet.append([
+            value.replace(tzinfo=None) if getattr(value, 'tzinfo', None) else escape_formula(value) for value in row
+        ])
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
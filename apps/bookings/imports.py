@@ -0,0 +1,211 @@
+import csv
+import json
+import math
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from openpyxl import load_workbook
+from rest_framework import serializers
+
+from .exports import unescape_formula
+from .models import Booking
+from .references import next_booking_reference
+
+User = get_user_model()
+
+
+class BookingImportSerializer(serializers.Serializer):
+    """One imported row; columns match the bookings export"""
+    booking_reference = serializers.CharField(max_length=20, required=False)
+    service_type = serializers.ChoiceField(choices=Booking.SERVICE_TYPE_CHOICES)
+    object_id = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=Booking.STATUS_CHOICES, default='confirmed')
+    payment_status = serializers.ChoiceField(choices=Booking.PAYMENT_STATUS_CHOICES, default='pending')
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    duration_days = serializers.IntegerField(min_value=1, required=False)
+    base_cost = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    additional_charges = serializers.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0'))
+    discount = serializers.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0'))
+    total_cost = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    security_deposit = serializers.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0'))
+    user_email = serializers.EmailField()
+    contact_name = serializers.CharField(max_length=255)
+    contact_phone = serializers.CharField(max_length=15)
+    contact_email = serializers.EmailField(required=False)
+    pickup_location = serializers.CharField(max_length=255, required=False)
+    drop_location = serializers.CharField(max_length=255, required=False)
+    special_requests = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if attrs['end_date'] <= attrs['start_date']:
+            raise serializers.ValidationError('end_date must be after start_date')
+        attrs.setdefault('duration_days', max(1, math.ceil((attrs['end_date'] - attrs['start_date']) / timedelta(days=1))))
+        attrs.setdefault('total_cost', attrs['base_cost'] + attrs['additional_charges'] - attrs['discount'])
+        attrs.setdefault('contact_email', attrs['user_email'])
+        return attrs
+
+
+def read_rows(path, file_format):
+    """
+    Yield (line number, row dict) from a CSV, JSONL or XLSX file without
+    loading it whole. Spreadsheet cells lose the quote the exports put in
+    front of text that would read as a formula.
+    """
+    if file_format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {key: unescape_formula(value) for key, value in row.items()}
+    elif file_format == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+    elif file_format == 'xlsx':
+        workbook = load_workbook(path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [str(header) for header in next(rows, ())]
+            for line_number, values in enumerate(rows, 2):
+                yield line_number, dict(zip(headers, map(unescape_formula, values)))
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f'Unsupported format {file_format!r}')
+
+
+class BookingImporter:
+    """
+    Validates rows and inserts them a chunk at a time with bulk_create,
+    resolving users, items and providers and checking for overlaps with
+    a handful of queries per chunk. Invalid rows are skipped and reported
+    in `errors` as (line number, message).
+
+    Like reserve(), each chunk checks for overlaps and inserts in one
+    transaction holding locks on the booked items, so a reservation made
+    meanwhile waits for the chunk instead of clashing with it.
+    """
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.imported = 0
+        self.errors = []
+        # One instance validates every row; building a serializer deep-copies all its fields
+        self.serializer = BookingImportSerializer()
+
+    def import_chunk(self, rows):
+        valid = []
+        for line_number, row in rows:
+            # Empty cells mean "use the default" rather than an invalid value
+            data = {key: value for key, value in row.items() if key and value not in ('', None)}
+            try:
+                valid.append((line_number, self.serializer.run_validation(data)))
+            except serializers.ValidationError as e:
+                self.errors.append((line_number, self.describe(e.detail)))
+
+        # Taken before the transaction so they can come from the allocator's cached block
+        references = [] if self.dry_run else [
+            next_booking_reference() for _, data in valid if 'booking_reference' not in data
+        ]
+        with transaction.atomic():
+            bookings = self.build(valid, iter(references))
+            if bookings and not self.dry_run:
+                Booking.objects.bulk_create(bookings)
+        self.imported += len(bookings)
+
+    def build(self, valid, references):
+        users = dict(
+            User.objects.filter(email__in={data['user_email'] for _, data in valid}).values_list('email', 'pk')
+        )
+        items = self.resolve_items(valid)
+        taken_references = set(Booking.objects.filter(
+            booking_reference__in=[data['booking_reference'] for _, data in valid if 'booking_reference' in data]
+        ).values_list('booking_reference', flat=True))
+        holds = self.existing_holds(valid, items)
+
+        bookings = []
+        for line_number, data in valid:
+            item = items.get((data['service_type'], data['object_id']))
+            reference = data.get('booking_reference')
+            error = None
+            if data['user_email'] not in users:
+                error = f"no user with email {data['user_email']}"
+            elif item is None:
+                error = f"no {data['service_type']} with id {data['object_id']}"
+            elif reference and reference in taken_references:
+                error = f'booking_reference {reference} is already used'
+            elif data['status'] in Booking.HOLDING_STATUSES:
+                key = item[0], data['object_id']
+                if any(start < data['end_date'] and end > data['start_date'] for start, end in holds[key]):
+                    error = 'overlaps another booking of the same item'
+                else:
+                    holds[key].append((data['start_date'], data['end_date']))
+            if error:
+                self.errors.append((line_number, error))
+                continue
+
+            content_type_id, provider_id = item
+            if reference:
+                taken_references.add(reference)
+            elif not self.dry_run:
+                reference = next(references)
+            fields = {key: value for key, value in data.items() if key not in ('user_email', 'booking_reference')}
+            bookings.append(Booking(
+                booking_reference=reference,
+                user_id=users[data['user_email']],
+                content_type_id=content_type_id,
+                service_provider_id=provider_id,
+                **fields,
+            ))
+        return bookings
+
+    def resolve_items(self, valid):
+        """
+        {(service_type, id): (content type id, provider id)} for the items
+        the rows refer to, locked until the transaction ends
+        """
+        ids_by_type = defaultdict(set)
+        for _, data in valid:
+            ids_by_type[data['service_type']].add(data['object_id'])
+
+        items = {}
+        for service_type, ids in ids_by_type.items():
+            label, provider_field = Booking.SERVICE_MODELS[service_type]
+            model = apps.get_model(label)
+            content_type_id = ContentType.objects.get_for_model(model).pk
+            # In primary key order, so concurrent imports lock in the same order
+            rows = model.objects.select_for_update().filter(pk__in=ids).order_by('pk')
+            for pk, provider_id in rows.values_list('pk', f'{provider_field}_id'):
+                items[service_type, pk] = (content_type_id, provider_id)
+        return items
+
+    def existing_holds(self, valid, items):
+        """{(content type id, object id): [(start, end)]} of stored bookings that could clash with the rows"""
+        holds = defaultdict(list)
+        keys = {
+            (items[data['service_type'], data['object_id']][0], data['object_id'])
+            for _, data in valid if (data['service_type'], data['object_id']) in items
+        }
+        if not keys:
+            return holds
+        stored = Booking.objects.filter(
+            content_type_id__in={content_type_id for content_type_id, _ in keys},
+            object_id__in={object_id for _, object_id in keys},
+            status__in=Booking.HOLDING_STATUSES,
+            start_date__lt=max(data['end_date'] for _, data in valid),
+            end_date__gt=min(data['start_date'] for _, data in valid),
+        ).values_list('content_type_id', 'object_id', 'start_date', 'end_date')
+        for content_type_id, object_id, start, end in stored.iterator():
+            holds[content_type_id, object_id].append((start, end))
+        return holds
+
+    def describe(self, errors):
+        if isinstance(errors, dict):
+            return '; '.join(f'{field}: {" ".join(map(str, messages))}' for field, messages in errors.items())
+        return str(errors)
@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.bikes.models import Bike
+from apps.bookings.models import Booking
+from apps.bookings.reservations import BookingConflict, reserve
+
+User = get_user_model()
+
+BENCHMARK_EMAIL = 'booking-benchmark@example.com'
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire simultaneous reservations at the configured database: many at one bike '
+        '(exactly one must win) and many spread over different bikes (all must win). '
+        'Needs bikes in the database (e.g. from seed_catalogue) and a database shared '
+        'between threads (PostgreSQL or an SQLite file, not :memory:). '
+        'Bookings it creates are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--attempts', type=int, default=64, help='Reservations fired per scenario')
+        parser.add_argument('--items', type=int, default=16, help='Bikes to spread the second scenario over')
+
+    def handle(self, *args, **options):
+        bikes = list(Bike.objects.filter(available=True).order_by('pk')[:options['items']])
+        if not bikes:
+            raise CommandError('No available bikes; run seed_catalogue first.')
+
+        user, _ = User.objects.get_or_create(
+            email=BENCHMARK_EMAIL, defaults={'username': 'booking-benchmark', 'is_active': True}
+        )
+        # Far in the future so real bookings and availability are not involved
+        origin = (timezone.now() + timedelta(days=365 * 50)).replace(hour=10, minute=0, second=0, microsecond=0)
+        attempts = options['attempts']
+
+        try:
+            contended = [(bikes[0], origin, origin + timedelta(days=3))] * attempts
+            wins, conflicts, errors, elapsed = self.fire(user, contended, options['threads'])
+            self.report('one bike, same dates', wins, conflicts, errors, elapsed)
+            if wins != 1 or errors:
+                raise CommandError(f'Expected exactly one winning reservation, got {wins} ({len(errors)} errors)')
+
+            # Each bike gets consecutive non-overlapping 2-day slots after the contended window
+            spread = []
+            for i in range(attempts):
+                start = origin + timedelta(days=10 + 2 * (i // len(bikes)))
+                spread.append((bikes[i % len(bikes)], start, start + timedelta(days=2)))
+            wins, conflicts, errors, elapsed = self.fire(user, spread, options['threads'])
+            self.report(f'{len(bikes)} bikes, no overlaps', wins, conflicts, errors, elapsed)
+            if wins != attempts:
+                raise CommandError(f'Expected all {attempts} reservations to win, got {wins} ({len(errors)} errors)')
+        finally:
+            Booking.objects.filter(user=user).delete()
+
+        self.stdout.write(self.style.SUCCESS('Reservations stayed consistent under concurrency'))
+
+    def fire(self, user, requests, threads):
+        first_wave = min(threads, len(requests))
+        barrier = threading.Barrier(first_wave)
+
+        def attempt(index):
+            item, start, end = requests[index]
+            try:
+                if index < first_wave:
+                    # Line the first wave up so it really hits the database together
+                    barrier.wait(timeout=5)
+                reserve(
+                    user, item, start, end, 'bike',
+                    contact_name='Benchmark', contact_phone='0000000000', contact_email=BENCHMARK_EMAIL,
+                )
+                return 'win'
+            except BookingConflict:
+                return 'conflict'
+            except Exception as e:
+                return e
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(attempt, range(len(requests))))
+        elapsed = time.perf_counter() - start
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        for error in errors[:3]:
+            self.stderr.write(f'{type(error).__name__}: {error}')
+        return results.count('win'), results.count('conflict'), errors, elapsed
+
+    def report(self, label, wins, conflicts, errors, elapsed):
+        total = wins + conflicts + len(errors)
+        self.stdout.write(
+            f'{label:<24} {wins:>4} won {conflicts:>4} conflicted {len(errors):>3} errors '
+            f'in {elapsed:.2f}s ({total / elapsed:.0f} reservations/s)'
+        )
@@ -0,0 +1,102 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from apps.bookings.models import Booking
+from apps.bookings.references import ALPHABET, PREFIX, ReferenceAllocator, format_reference, is_valid_reference
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate booking references in a throwaway test database with the block '
+        'allocator and with the old random-digits-plus-exists() loop, check they are '
+        'unique and that the check symbol catches typos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000)
+        parser.add_argument('--legacy-count', type=int, default=10_000, help='References made the old way, for comparison')
+        parser.add_argument('--typos', type=int, default=10_000, help='Corrupted references checked against the check symbol')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict.setdefault('TEST', {})['MIGRATE'] = False
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            references = self.allocated(options['count'])
+            self.legacy(options['legacy_count'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.typos(random.Random(0).sample(references, min(options['typos'], len(references))))
+        self.stdout.write(self.style.SUCCESS(f'{len(references)} unique references'))
+
+    def allocated(self, count):
+        allocator = ReferenceAllocator()
+        queries = []
+        with connection.execute_wrapper(self.count_into(queries)):
+            start = time.perf_counter()
+            references = [format_reference(allocator.allocate()) for _ in range(count)]
+            elapsed = time.perf_counter() - start
+
+        if len(set(references)) != count:
+            raise CommandError(f'{count - len(set(references))} duplicate references')
+        invalid = [reference for reference in references if not is_valid_reference(reference)]
+        if invalid:
+            raise CommandError(f'{len(invalid)} references fail their own check, e.g. {invalid[0]}')
+        self.report('block allocator', count, len(queries), elapsed)
+        self.stdout.write(f'  e.g. {", ".join(references[:5])}')
+        return references
+
+    def legacy(self, count):
+        queries = []
+        with connection.execute_wrapper(self.count_into(queries)):
+            start = time.perf_counter()
+            for _ in range(count):
+                while True:
+                    reference = 'TC' + ''.join(random.choices(string.digits, k=8))
+                    if not Booking.objects.filter(booking_reference=reference).exists():
+                        break
+            elapsed = time.perf_counter() - start
+        self.report('random + exists()', count, len(queries), elapsed)
+
+    def count_into(self, queries):
+        def wrapper(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+        return wrapper
+
+    def typos(self, references):
+        substitutions = swaps = caught_substitutions = caught_swaps = 0
+        rnd = random.Random(1)
+        for reference in references:
+            body = reference[len(PREFIX):]
+            i = rnd.randrange(len(body))
+            wrong = rnd.choice(ALPHABET.replace(body[i], ''))
+            substitutions += 1
+            caught_substitutions += not is_valid_reference(PREFIX + body[:i] + wrong + body[i + 1:])
+
+            i = rnd.randrange(len(body) - 1)
+            if body[i] != body[i + 1]:
+                swaps += 1
+                swapped = body[:i] + body[i + 1] + body[i] + body[i + 2:]
+                caught_swaps += not is_valid_reference(PREFIX + swapped)
+
+        self.stdout.write(
+            f'check symbol caught {caught_substitutions}/{substitutions} single-symbol typos '
+            f'and {caught_swaps}/{swaps} adjacent swaps'
+        )
+        if caught_substitutions != substitutions:
+            raise CommandError('The check symbol missed a single-symbol typo')
+
+    def report(self, label, count, queries, elapsed):
+        self.stdout.write(
+            f'{label:<18} {count:>8} references {queries:>7} queries '
+            f'{elapsed:>7.2f}s ({count / elapsed:,.0f}/s)'
+        )
@@ -0,0 +1,53 @@
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bookings.imports import BookingImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-import bookings from a CSV, JSONL or XLSX file with the same columns as '
+        'the bookings export. Rows are validated and inserted in chunks; invalid rows '
+        'are skipped and listed with their line numbers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'jsonl', 'xlsx'],
+                            help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted together')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+        parser.add_argument('--max-errors', type=int, default=20, help='Invalid rows to list')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        file_format = options['file_format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl', 'xlsx'):
+            raise CommandError(f'Cannot tell the format of {path}; pass --format')
+
+        importer = BookingImporter(dry_run=options['dry_run'])
+        rows = read_rows(path, file_format)
+        start = time.perf_counter()
+        while True:
+            chunk = list(islice(rows, options['batch_size']))
+            if not chunk:
+                break
+            importer.import_chunk(chunk)
+            self.stdout.write(f'{importer.imported} imported, {len(importer.errors)} rejected', ending='\r')
+        self.stdout.write('')
+
+        for line_number, message in sorted(importer.errors)[:options['max_errors']]:
+            self.stderr.write(f'line {line_number}: {message}')
+        if len(importer.errors) > options['max_errors']:
+            self.stderr.write(f'... and {len(importer.errors) - options["max_errors"]} more')
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {importer.imported} bookings in {time.perf_counter() - start:.1f}s, '
+            f'{len(importer.errors)} rows rejected'
+        ))
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+HOLDING_STATUSES = "'pending', 'confirmed', 'active'"
+# Offending bookings listed per problem when the migration refuses to run
+REPORT_LIMIT = 20
+
+
+def check_existing_bookings(apps, schema_editor):
+    """
+    Stop before the constraints with a list of the bookings that would
+    violate them; they need their dates or statuses corrected by hand.
+    """
+    Booking = apps.get_model('bookings', 'Booking')
+    bookings = Booking.objects.using(schema_editor.connection.alias)
+    problems = []
+
+    inverted = list(
+        bookings.filter(end_date__lte=models.F('start_date')).order_by('pk').values_list('pk', flat=True)
+    )
+    if inverted:
+        problems.append(f'{len(inverted)} bookings ending on or before their start: {inverted[:REPORT_LIMIT]}')
+
+    if schema_editor.connection.vendor == 'postgresql':
+        overlapping = []
+        previous = None
+        rows = (
+            bookings.filter(status__in=['pending', 'confirmed', 'active'])
+            .order_by('content_type_id', 'object_id', 'start_date', 'pk')
+            .values_list('pk', 'content_type_id', 'object_id', 'start_date', 'end_date')
+        )
+        for pk, content_type_id, object_id, start, end in rows.iterator():
+            item = (content_type_id, object_id)
+            if previous is not None and previous[0] == item and start < previous[2]:
+                overlapping.append((previous[1], pk))
+            if previous is None or previous[0] != item or end > previous[2]:
+                previous = (item, pk, end)
+        if overlapping:
+            problems.append(
+                f'{len(overlapping)} pairs of pending/confirmed/active bookings of the same item '
+                f'overlapping: {overlapping[:REPORT_LIMIT]}'
+            )
+
+    if problems:
+        raise RuntimeError(
+            'Existing bookings violate the new constraints; correct or cancel them and migrate again.\n'
+            + '\n'.join(problems)
+        )
+
+
+def add_overlap_constraint(apps, schema_editor):
+    # Range types and exclusion constraints are PostgreSQL-only; elsewhere
+    # the reservation transaction alone prevents overlaps.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        'ALTER TABLE bookings_booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist ('
+        "content_type_id WITH =, object_id WITH =, tstzrange(start_date, end_date, '[)') WITH &&"
+        f') WHERE (status IN ({HOLDING_STATUSES}))'
+    )
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS booking_no_overlap')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_booking_documents_submitted_and_more'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_existing_bookings, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='service_type',
+            field=models.CharField(choices=[('bike', 'Bike'), ('car', 'Car'), ('campervan', 'Campervan'), ('hotel', 'Hotel'), ('guided_trip', 'Guided Trip'), ('pilgrim_tour', 'Pilgrim Tour'), ('pilgrim_hotel', 'Pilgrim Hotel'), ('fulltour', 'Full Tour'), ('holidaypackage', 'Holiday Package')], max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['content_type', 'object_id', 'start_date'], name='booking_item_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(('end_date__gt', models.F('start_date'))), name='booking_end_after_start'),
+        ),
+        migrations.RunPython(add_overlap_constraint, drop_overlap_constraint),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:21
+
+from django.db import migrations, models
+
+
+def create_counters(apps, schema_editor):
+    from apps.bookings.references import create_reference_counters
+
+    create_reference_counters(schema_editor.connection.alias, apps.get_model('bookings', 'ReferenceCounter'))
+
+
+def drop_sequence(apps, schema_editor):
+    from apps.bookings.references import SEQUENCE_NAME
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_overlap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_counters, drop_sequence),
+    ]
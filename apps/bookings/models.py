@@ -1,12 +1,29 @@
+from django.apps import apps
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
-import random
-import string
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from .references import next_booking_reference
 
 User = get_user_model()
 
+class BookingQuerySet(models.QuerySet):
+    def with_service_objects(self):
+        """
+        Resolve `service_object` for all fetched bookings at once: they are
+        grouped by content type and each model's items are loaded in one
+        query (with their city joined), instead of two queries per booking.
+        Applied when the queryset is evaluated, so it also works after
+        pagination slices it.
+        """
+        querysets = []
+        for label, _ in Booking.SERVICE_MODELS.values():
+            model = apps.get_model(label)
+            related = [field.name for field in model._meta.concrete_fields if field.name == 'city' and field.many_to_one]
+            querysets.append(model.objects.select_related(*related))
+        return self.prefetch_related(GenericPrefetch('service_object', querysets))
+
 class Booking(models.Model):
     SERVICE_TYPE_CHOICES = [
         ('bike', 'Bike'),
@@ -16,7 +33,22 @@ class Booking(models.Model):
         ('guided_trip', 'Guided Trip'),
         ('pilgrim_tour', 'Pilgrim Tour'),
         ('pilgrim_hotel', 'Pilgrim Hotel'),
+        ('fulltour', 'Full Tour'),
+        ('holidaypackage', 'Holiday Package'),
     ]
+
+    # service_type -> (model label, field holding the service provider)
+    SERVICE_MODELS = {
+        'bike': ('bikes.Bike', 'service_provider'),
+        'car': ('cars.Car', 'service_provider'),
+        'campervan': ('campervans.Campervan', 'service_provider'),
+        'hotel': ('hotels.Hotel', 'service_provider'),
+        'guided_trip': ('guided_trips.GuidedTrip', 'created_by'),
+        'pilgrim_tour': ('pilgrim.PilgrimTour', 'service_provider'),
+        'pilgrim_hotel': ('pilgrim.PilgrimHotel', 'service_provider'),
+        'fulltour': ('fulltours.Fulltour', 'service_provider'),
+        'holidaypackage': ('holidaypackages.Holidaypackage', 'service_provider'),
+    }
     
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -26,6 +58,9 @@ class Booking(models.Model):
         ('cancelled', 'Cancelled'),
         ('refunded', 'Refunded'),
     ]
+
+    # Bookings in these states hold the item; no two may overlap
+    HOLDING_STATUSES = ['pending', 'confirmed', 'active']
     
     PAYMENT_STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -91,20 +126,27 @@ class Booking(models.Model):
     cancelled_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='cancelled_bookings')
     refund_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
 
+    objects = BookingQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.booking_reference} - {self.user.email} - {self.service_type}"
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'start_date'], name='booking_item_start_idx'),
+            models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+            models.Index(fields=['service_provider', 'status', '-created_at'], name='booking_provider_status_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(end_date__gt=models.F('start_date')), name='booking_end_after_start'),
+        ]
+        # On PostgreSQL migration 0003 also adds the booking_no_overlap
+        # exclusion constraint over (content_type, object_id, [start, end))
 
     def save(self, *args, **kwargs):
         if not self.booking_reference:
-            # Generate unique booking reference
-            while True:
-                ref = 'TC' + ''.join(random.choices(string.digits, k=8))
-                if not Booking.objects.filter(booking_reference=ref).exists():
-                    self.booking_reference = ref
-                    break
+            self.booking_reference = next_booking_reference()
         super().save(*args, **kwargs)
 
     @property
@@ -119,6 +161,14 @@ class Booking(models.Model):
         """Check if booking is currently active"""
         return self.status == 'active'
 
+class ReferenceCounter(models.Model):
+    """Last counter value handed out for references (non-PostgreSQL databases)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
 class BookingPayment(models.Model):
     PAYMENT_METHOD_CHOICES = [
         ('credit_card', 'Credit Card'),
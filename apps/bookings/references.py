@@ -0,0 +1,120 @@
+import threading
+
+from django.db import connection, connections, transaction
+from django.db.models import F
+
+# Crockford base32: no I, L, O or U, so references survive being read out loud
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+PREFIX = 'TC'
+WIDTH = 6
+SPACE = len(ALPHABET) ** WIDTH  # 2**30 references before they grow a character
+# Odd, so multiplying modulo SPACE is a bijection; neighbouring bookings
+# don't get visibly neighbouring references
+MULTIPLIER = 0x2F0B5A3D
+BLOCK_SIZE = 100
+COUNTER_NAME = 'booking_reference'
+SEQUENCE_NAME = 'bookings_reference_seq'
+
+
+def encode(value):
+    digits = []
+    while value:
+        value, digit = divmod(value, len(ALPHABET))
+        digits.append(ALPHABET[digit])
+    return ''.join(reversed(digits)).rjust(WIDTH, ALPHABET[0])
+
+
+def check_symbol(body):
+    """Luhn mod 32 check character; catches any single wrong symbol and most swaps"""
+    base = len(ALPHABET)
+    total, factor = 0, 2
+    for char in reversed(body):
+        addend = factor * ALPHABET.index(char)
+        total += addend // base + addend % base
+        factor = 3 - factor
+    return ALPHABET[-total % base]
+
+
+def format_reference(value):
+    body = encode(value * MULTIPLIER % SPACE if value < SPACE else value)
+    return f'{PREFIX}{body}{check_symbol(body)}'
+
+
+def is_valid_reference(reference):
+    """Whether `reference` has the current format and a matching check symbol"""
+    reference = reference.upper()
+    body, check = reference[len(PREFIX):-1], reference[-1:]
+    return (
+        reference.startswith(PREFIX)
+        and len(body) >= WIDTH
+        and all(char in ALPHABET for char in body + check)
+        and check_symbol(body) == check
+    )
+
+
+class ReferenceAllocator:
+    """
+    Hands out unique counter values from blocks reserved in the database,
+    so only one booking in BLOCK_SIZE costs a query and nothing needs an
+    existence check. Values left in a block when the process exits are
+    simply never used.
+
+    PostgreSQL blocks come from a sequence, which is outside transactions.
+    Elsewhere a ReferenceCounter row is bumped; that is transactional, so
+    inside an atomic block only a single value is reserved (it is rolled
+    back together with whatever used it) and nothing is cached.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next_value = self.end = 0
+
+    def allocate(self):
+        with self.lock:
+            if self.next_value >= self.end:
+                if connection.vendor == 'postgresql':
+                    self.next_value, self.end = self.sequence_block()
+                elif connection.in_atomic_block:
+                    return self.counter_block(1)[0]
+                else:
+                    self.next_value, self.end = self.counter_block(BLOCK_SIZE)
+            value = self.next_value
+            self.next_value += 1
+            return value
+
+    def sequence_block(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [SEQUENCE_NAME])
+            start = cursor.fetchone()[0]
+        return start, start + BLOCK_SIZE
+
+    def counter_block(self, size):
+        from .models import ReferenceCounter
+
+        with transaction.atomic():
+            ReferenceCounter.objects.filter(name=COUNTER_NAME).update(value=F('value') + size)
+            last = ReferenceCounter.objects.values_list('value', flat=True).get(name=COUNTER_NAME)
+        return last - size + 1, last + 1
+
+
+allocator = ReferenceAllocator()
+
+
+def next_booking_reference():
+    return format_reference(allocator.allocate())
+
+
+def create_reference_counters(using='default', counter_model=None):
+    """
+    The sequence or counter row behind the allocator (migration 0004;
+    benchmarks that skip migrations call it themselves). Idempotent.
+    """
+    if connections[using].vendor == 'postgresql':
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME} START WITH 1 INCREMENT BY {BLOCK_SIZE}'
+            )
+    else:
+        if counter_model is None:
+            from .models import ReferenceCounter as counter_model
+        counter_model.objects.using(using).get_or_create(name=COUNTER_NAME)
@@ -0,0 +1,78 @@
+import math
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+
+from apps.core.availability import free_between
+
+from .models import Booking
+from .references import next_booking_reference
+
+
+class BookingConflict(Exception):
+    """The item is already booked or blocked for part of the requested period"""
+
+
+def overlapping_bookings(item, start, end):
+    """Bookings holding `item` at any moment of [start, end)"""
+    return Booking.objects.filter(
+        content_type=ContentType.objects.get_for_model(item),
+        object_id=item.pk,
+        status__in=Booking.HOLDING_STATUSES,
+        start_date__lt=end,
+        end_date__gt=start,
+    )
+
+
+def reserve(user, item, start, end, service_type, **details):
+    """
+    Create a pending Booking of `item` for [start, end) or raise
+    BookingConflict.
+
+    The check and insert run in one transaction holding a lock on the
+    item row, so concurrent reservations of the same item are serialized
+    while different items proceed in parallel. SQLite has no row locks;
+    there transactions take the database write lock up front (see the
+    DATABASES settings). On PostgreSQL the booking_no_overlap exclusion
+    constraint backs this up.
+    """
+    model = type(item)
+    # Availability is kept per day; the end instant itself is not used
+    last_day = (end - timedelta(microseconds=1)).date()
+    days = max(1, math.ceil((end - start) / timedelta(days=1)))
+    # Taken before the transaction so it can come from the allocator's cached block
+    reference = next_booking_reference()
+
+    with transaction.atomic():
+        item = model.objects.select_for_update().get(pk=item.pk)
+
+        if overlapping_bookings(item, start, end).exists():
+            raise BookingConflict('This item is already booked for the selected dates.')
+        if not free_between(model.objects.filter(pk=item.pk), start.date(), last_day).exists():
+            raise BookingConflict('This item is not available for the selected dates.')
+
+        base_cost = item.price_per_day * days
+        booking = Booking(
+            user=user,
+            booking_reference=reference,
+            service_type=service_type,
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=item.pk,
+            start_date=start,
+            end_date=end,
+            duration_days=days,
+            base_cost=base_cost,
+            total_cost=base_cost,
+            security_deposit=item.safety_deposit,
+            service_provider=item.service_provider,
+            **details,
+        )
+        try:
+            with transaction.atomic():
+                booking.save()
+        except IntegrityError as e:
+            if 'booking_no_overlap' in str(e):
+                raise BookingConflict('This item is already booked for the selected dates.')
+            raise
+    return booking
@@ -1,11 +1,50 @@
 from rest_framework import serializers
 from .models import Booking
 
+class ServiceObjectField(serializers.Field):
+    """
+    Title and city of the booked item. Use Booking.objects.with_service_objects()
+    so a list resolves its items a model at a time rather than row by row.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.update(source='service_object', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, item):
+        # GuidedTrip names its title trip_name; PilgrimHotel keeps its city as text
+        city = getattr(item, 'city', None)
+        return {
+            'id': item.pk,
+            'title': getattr(item, 'title', None) or getattr(item, 'trip_name', ''),
+            'city': getattr(city, 'name', city),
+        }
+
 class BookingSerializer(serializers.ModelSerializer):
+    service = ServiceObjectField()
+
     class Meta:
         model = Booking
         fields = '__all__'  # Include all fields from the Booking model
 
+class BookingListSerializer(serializers.ModelSerializer):
+    """Compact booking rows for lists; user and provider come from select_related"""
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+    service_provider_email = serializers.EmailField(source='service_provider.email', read_only=True)
+    service = ServiceObjectField()
+
+    class Meta:
+        model = Booking
+        fields = [
+            'id', 'booking_reference', 'service_type', 'object_id', 'service', 'status', 'payment_status',
+            'start_date', 'end_date', 'duration_days', 'total_cost', 'contact_name',
+            'user_email', 'service_provider_email', 'created_at',
+        ]
+
+class BookingStatusSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    total_cost = serializers.DecimalField(max_digits=14, decimal_places=2)
+
 class BookingCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
@@ -14,4 +53,20 @@ class BookingCreateSerializer(serializers.ModelSerializer):
 class BookingDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
-        fields = ['id', 'user', 'service', 'start_date', 'end_date', 'status', 'created_at']  # Specify fields for detailed view
\ No newline at end of file
+        fields = ['id', 'user', 'service', 'start_date', 'end_date', 'status', 'created_at']  # Specify fields for detailed view
+
+class ReservationSerializer(serializers.Serializer):
+    """Input for booking one catalogue item for [start_date, end_date)"""
+    item = serializers.IntegerField()
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    contact_name = serializers.CharField(max_length=255)
+    contact_phone = serializers.CharField(max_length=15)
+    contact_email = serializers.EmailField(required=False)
+    special_requests = serializers.CharField(required=False, allow_blank=True)
+    pickup_location = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if attrs['end_date'] <= attrs['start_date']:
+            raise serializers.ValidationError({'end_date': 'end_date must be after start_date.'})
+        return attrs
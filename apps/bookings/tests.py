@@ -0,0 +1,290 @@
+import csv
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike
+from apps.core.availability import block_range
+from apps.core.tests.catalogue import CatalogueTestCase
+
+from .exports import escape_formula, unescape_formula
+from .imports import BookingImporter, read_rows
+from .models import Booking, ReferenceCounter
+from .references import (
+    ALPHABET, COUNTER_NAME, PREFIX, WIDTH, ReferenceAllocator, encode, format_reference, is_valid_reference,
+)
+from .reservations import BookingConflict, reserve
+
+User = get_user_model()
+
+# Clear of the seeded bookings, which start in 2030
+START = datetime(2031, 3, 1, 10, tzinfo=timezone.utc)
+CONTACT = {'contact_name': 'Test Traveller', 'contact_phone': '9000000001'}
+
+
+class ReservationTests(CatalogueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.traveller = User.objects.get(email='catalogue-traveller@example.com')
+        cls.bike = Bike.objects.order_by('pk').first()
+
+    def reserve(self, start, end):
+        return reserve(self.traveller, self.bike, start, end, 'bike', **CONTACT)
+
+    def test_overlapping_reservations_conflict(self):
+        booking = self.reserve(START, START + timedelta(days=2))
+        self.assertEqual((booking.status, booking.duration_days), ('pending', 2))
+
+        with self.assertRaises(BookingConflict):
+            self.reserve(START + timedelta(days=1), START + timedelta(days=3))
+        # Periods are half-open, so the next one can start when this one ends
+        self.reserve(START + timedelta(days=2), START + timedelta(days=3))
+
+    def test_cancelled_bookings_free_the_dates(self):
+        booking = self.reserve(START, START + timedelta(days=2))
+        Booking.objects.filter(pk=booking.pk).update(status='cancelled')
+
+        self.reserve(START, START + timedelta(days=2))
+
+    def test_blocked_days_conflict(self):
+        block_range(Bike, [self.bike.pk], (START + timedelta(days=1)).date(), (START + timedelta(days=1)).date())
+
+        with self.assertRaises(BookingConflict):
+            self.reserve(START, START + timedelta(days=2))
+
+    def test_bookings_must_end_after_they_start(self):
+        booking = self.reserve(START, START + timedelta(days=1))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Booking.objects.filter(pk=booking.pk).update(end_date=START)
+
+    def test_book_endpoint_answers_conflicts_with_409(self):
+        client = APIClient()
+        client.force_authenticate(self.traveller)
+        data = {'item': self.bike.pk, 'start_date': START, 'end_date': START + timedelta(days=2), **CONTACT}
+
+        response = client.post('/api/bikes/book/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['status'], 'pending')
+
+        response = client.post('/api/bikes/book/', data, format='json')
+        self.assertEqual(response.status_code, 409)
+
+        response = client.post('/api/bikes/book/', {**data, 'end_date': START}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ReferenceTests(CatalogueTestCase):
+    catalogue_size = 0
+
+    def test_encoding(self):
+        self.assertEqual(encode(0), '0' * WIDTH)
+        self.assertEqual(encode(len(ALPHABET) + 1), '000011')
+
+    def test_references_are_distinct_and_valid(self):
+        references = [format_reference(value) for value in range(1, 2001)]
+
+        self.assertEqual(len(set(references)), len(references))
+        for reference in references:
+            self.assertTrue(reference.startswith(PREFIX))
+            self.assertEqual(len(reference), len(PREFIX) + WIDTH + 1)
+            self.assertTrue(is_valid_reference(reference))
+            self.assertTrue(is_valid_reference(reference.lower()))
+        # Neighbouring values don't look like neighbours
+        self.assertNotEqual(references[0][:-2], references[1][:-2])
+
+    def test_check_symbol_catches_typos(self):
+        reference = format_reference(12345)
+        body = reference[len(PREFIX):-1]
+        for position, char in enumerate(body):
+            for typo in ALPHABET.replace(char, ''):
+                mistyped = PREFIX + body[:position] + typo + body[position + 1:] + reference[-1]
+                self.assertFalse(is_valid_reference(mistyped), mistyped)
+        self.assertFalse(is_valid_reference(PREFIX + body[1] + body[0] + body[2:] + reference[-1]))
+        # Letters left out of the alphabet because they read like digits
+        self.assertFalse(is_valid_reference(PREFIX + 'O' + body[1:] + reference[-1]))
+        self.assertFalse(is_valid_reference(reference[:-2]))
+
+    def test_allocator_counts_up_from_the_counter_row(self):
+        before = ReferenceCounter.objects.get(name=COUNTER_NAME).value
+        allocator = ReferenceAllocator()
+
+        values = [allocator.allocate() for _ in range(3)]
+        # Inside a transaction values are reserved one at a time
+        self.assertEqual(values, [before + 1, before + 2, before + 3])
+        self.assertEqual(ReferenceCounter.objects.get(name=COUNTER_NAME).value, before + 3)
+
+
+class ImportExportTests(CatalogueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.provider = User.objects.get(email='catalogue-provider0@example.com')
+        cls.bike = Bike.objects.filter(service_provider=cls.provider).order_by('pk').first()
+
+    def write(self, name, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def export(self, export_format):
+        client = APIClient()
+        client.force_authenticate(self.provider)
+        response = client.get(f'/api/bookings/export/bookings.{export_format}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def import_rows(self, rows, dry_run=False):
+        importer = BookingImporter(dry_run=dry_run)
+        importer.import_chunk(list(enumerate(rows, 2)))
+        return importer
+
+    def row(self, **overrides):
+        return {
+            'service_type': 'bike', 'object_id': str(self.bike.pk), 'status': 'confirmed',
+            'start_date': START.isoformat(), 'end_date': (START + timedelta(days=2)).isoformat(),
+            'base_cost': '100.00', 'user_email': 'catalogue-traveller@example.com',
+            'contact_name': 'Imported Traveller', 'contact_phone': '9000000002', **overrides,
+        }
+
+    def test_formula_escaping_round_trips(self):
+        self.assertEqual(escape_formula('=SUM(A1)'), "'=SUM(A1)")
+        self.assertEqual(escape_formula('Goa'), 'Goa')
+        for value in ('=1+1', '+919800000000', '-5', '@user', '\tTab', 'Goa', "'quoted", None, 5):
+            self.assertEqual(unescape_formula(escape_formula(value)), value)
+
+    def test_export_reimports_unchanged(self):
+        Booking.objects.filter(service_provider=self.provider).update(contact_phone='+919800000000')
+        expected = set(Booking.objects.filter(service_provider=self.provider).values_list(
+            'booking_reference', 'object_id', 'status', 'start_date', 'total_cost', 'contact_phone',
+        ))
+        for export_format in ('csv', 'xlsx'):
+            with self.subTest(export_format):
+                path = self.write(f'bookings.{export_format}', self.export(export_format))
+                if export_format == 'csv':
+                    with open(path, newline='') as f:
+                        self.assertEqual(next(csv.DictReader(f))['contact_phone'], "'+919800000000")
+                Booking.objects.filter(service_provider=self.provider).delete()
+
+                importer = BookingImporter()
+                importer.import_chunk(list(read_rows(path, export_format)))
+
+                self.assertEqual(importer.errors, [])
+                self.assertEqual(set(Booking.objects.filter(service_provider=self.provider).values_list(
+                    'booking_reference', 'object_id', 'status', 'start_date', 'total_cost', 'contact_phone',
+                )), expected)
+
+    def test_invalid_rows_are_reported_by_line(self):
+        importer = self.import_rows([
+            self.row(),
+            self.row(end_date=START.isoformat()),
+            self.row(user_email='nobody@example.com'),
+            self.row(object_id='999999'),
+            # Overlaps the first row
+            self.row(start_date=(START + timedelta(days=1)).isoformat(), end_date=(START + timedelta(days=3)).isoformat()),
+            # Cancelled bookings hold nothing
+            self.row(status='cancelled', contact_name='Cancelled'),
+        ])
+
+        self.assertEqual(importer.imported, 2)
+        self.assertEqual([line_number for line_number, _ in importer.errors], [3, 4, 5, 6])
+        self.assertIn('no user with email nobody@example.com', dict(importer.errors)[4])
+        self.assertEqual(dict(importer.errors)[6], 'overlaps another booking of the same item')
+        booking = Booking.objects.get(contact_name='Imported Traveller')
+        self.assertTrue(is_valid_reference(booking.booking_reference))
+        self.assertEqual((booking.duration_days, booking.total_cost, booking.service_provider), (2, 100, self.provider))
+
+    def test_rows_overlapping_stored_bookings_are_rejected(self):
+        reserve(User.objects.get(email='catalogue-traveller@example.com'), self.bike, START, START + timedelta(days=1), 'bike', **CONTACT)
+
+        importer = self.import_rows([self.row()])
+        self.assertEqual((importer.imported, importer.errors), (0, [(2, 'overlaps another booking of the same item')]))
+
+    def test_dry_run_writes_nothing(self):
+        before = Booking.objects.count()
+        counter = ReferenceCounter.objects.get(name=COUNTER_NAME).value
+
+        importer = self.import_rows([self.row(), self.row(object_id='999999')], dry_run=True)
+
+        self.assertEqual((importer.imported, len(importer.errors)), (1, 1))
+        self.assertEqual(Booking.objects.count(), before)
+        self.assertEqual(ReferenceCounter.objects.get(name=COUNTER_NAME).value, counter)
+
+
+class BookingListTests(CatalogueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.traveller = User.objects.get(email='catalogue-traveller@example.com')
+        cls.provider = User.objects.get(email='catalogue-provider0@example.com')
+
+    def get(self, user, path='/api/bookings/', **params):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(path, params)
+
+    def references(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [booking['booking_reference'] for booking in response.json()['results']]
+
+    def test_bookings_are_scoped_to_the_user(self):
+        made = set(Booking.objects.filter(user=self.traveller).values_list('booking_reference', flat=True))
+        received = set(Booking.objects.filter(service_provider=self.provider).values_list('booking_reference', flat=True))
+        self.assertTrue(received and received < made)
+
+        self.assertEqual(set(self.references(self.get(self.traveller))), made)
+        # Service providers see what they received unless they ask otherwise
+        self.assertEqual(set(self.references(self.get(self.provider))), received)
+        self.assertEqual(self.references(self.get(self.provider, role='traveller')), [])
+        self.assertEqual(self.references(self.get(self.traveller, role='provider')), [])
+
+        stranger = User.objects.create_user(email='stranger@example.com', username='stranger', password='x')
+        self.assertEqual(self.references(self.get(stranger)), [])
+        booking = Booking.objects.filter(user=self.traveller).first()
+        self.assertEqual(self.get(stranger, f'/api/bookings/{booking.pk}/').status_code, 404)
+        self.assertEqual(self.get(self.traveller, f'/api/bookings/{booking.pk}/').status_code, 200)
+
+    def test_invalid_role_is_rejected(self):
+        self.assertEqual(self.get(self.traveller, role='admin').status_code, 400)
+        self.assertEqual(APIClient().get('/api/bookings/').status_code, 401)
+
+    def test_cursor_pages_newest_first(self):
+        expected = list(Booking.objects.filter(user=self.traveller).order_by('-created_at', '-pk')
+                        .values_list('booking_reference', flat=True))
+
+        pages, response = [], self.get(self.traveller, page_size=4)
+        while True:
+            pages.append(self.references(response))
+            if not response.json()['next']:
+                break
+            client = APIClient()
+            client.force_authenticate(self.traveller)
+            response = client.get(response.json()['next'])
+
+        self.assertEqual([len(page) for page in pages], [4, len(expected) - 4])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_filters_and_summary(self):
+        confirmed = self.references(self.get(self.traveller, status='confirmed'))
+        self.assertTrue(confirmed)
+        self.assertEqual(
+            set(confirmed),
+            set(Booking.objects.filter(user=self.traveller, status='confirmed').values_list('booking_reference', flat=True)),
+        )
+
+        response = self.get(self.traveller, '/api/bookings/summary/')
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()
+        self.assertEqual((summary['role'], summary['count']), ('traveller', Booking.objects.filter(user=self.traveller).count()))
+        self.assertEqual(summary['by_status']['confirmed']['count'], len(confirmed))
+        self.assertEqual(
+            self.get(self.traveller, '/api/bookings/summary/', service_type='bike').json()['count'],
+            Booking.objects.filter(user=self.traveller, service_type='bike').count(),
+        )
@@ -2,9 +2,8 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path('bookings/', views.BookingListView.as_view(), name='booking-list'),
-    path('bookings/<int:pk>/', views.BookingDetailView.as_view(), name='booking-detail'),
-    path('bookings/create/', views.BookingCreateView.as_view(), name='booking-create'),
-    path('bookings/<int:pk>/update/', views.BookingUpdateView.as_view(), name='booking-update'),
-    path('bookings/<int:pk>/delete/', views.BookingDeleteView.as_view(), name='booking-delete'),
-]
\ No newline at end of file
+    path('', views.BookingViewSet.as_view({'get': 'list'}), name='booking-list'),
+    path('summary/', views.BookingViewSet.as_view({'get': 'summary'}), name='booking-summary'),
+    path('<int:pk>/', views.BookingViewSet.as_view({'get': 'retrieve'}), name='booking-detail'),
+    path('export/<str:dataset>.<str:export_format>', views.BookingExportView.as_view(), name='booking-export'),
+]
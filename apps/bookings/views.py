@@ -1,37 +1,132 @@
-from rest_framework import viewsets
+from datetime import date
+
+from django.db.models import Count, Sum
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from apps.core.pagination import NewestFirstCursorPagination
+from .exports import DATASETS, csv_stream, jsonl_stream, xlsx_file
 from .models import Booking
-from .serializers import BookingSerializer
+from .reservations import BookingConflict, reserve
+from .serializers import BookingListSerializer, BookingSerializer, BookingStatusSummarySerializer, ReservationSerializer
+
+class BookingViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Bookings of the signed-in user: the ones they made, or with
+    ?role=provider the ones they received (the default for service
+    providers). Lists are keyset-paginated, newest first.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = NewestFirstCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'payment_status', 'service_type']
+
+    def get_role(self):
+        user = self.request.user
+        role = self.request.query_params.get('role') or ('provider' if user.is_service_provider else 'traveller')
+        if role not in ('traveller', 'provider'):
+            raise ValidationError({'role': 'role must be traveller or provider.'})
+        return role
+
+    def get_queryset(self):
+        # (user, -created_at) and (service_provider, status, -created_at) indexes serve these
+        if self.get_role() == 'provider':
+            queryset = Booking.objects.filter(service_provider=self.request.user)
+        else:
+            queryset = Booking.objects.filter(user=self.request.user)
+        return queryset.select_related('user', 'service_provider').with_service_objects()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return BookingListSerializer
+        return BookingSerializer
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Booking counts and totals per status, for dashboards"""
+        queryset = self.filter_queryset(self.get_queryset())
+        by_status = {
+            row['status']: BookingStatusSummarySerializer(row).data
+            for row in queryset.order_by().values('status').annotate(count=Count('pk'), total_cost=Sum('total_cost'))
+        }
+        return Response({
+            'role': self.get_role(),
+            'count': sum(summary['count'] for summary in by_status.values()),
+            'by_status': by_status,
+        })
+
 
-class BookingViewSet(viewsets.ModelViewSet):
-    queryset = Booking.objects.all()
-    serializer_class = BookingSerializer
+class BookItemView(generics.CreateAPIView):
+    """
+    Reserve one item of `item_model` (by id in the `item` field). Responds
+    201 with the pending booking, or 409 if the dates are taken.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ReservationSerializer
+    item_model = None
+    service_type = None
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        return Response(serializer.data, status=201)
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
-
-    def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
-
-    def update(self, request, *args, **kwargs):
-        partial = kwargs.pop('partial', False)
-        instance = self.get_object()
-        serializer = self.get_serializer(instance, data=request.data, partial=partial)
-        serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
-        return Response(serializer.data)
+        details = dict(serializer.validated_data)
+        item = get_object_or_404(self.item_model, pk=details.pop('item'), available=True)
+        details.setdefault('contact_email', request.user.email)
+
+        try:
+            booking = reserve(
+                request.user, item, details.pop('start_date'), details.pop('end_date'),
+                self.service_type, **details
+            )
+        except BookingConflict as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(BookingSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+
+class BookingExportView(APIView):
+    """
+    Download received bookings or their payments as CSV, JSONL or XLSX
+    (staff get everything). Optional ?since= and ?until= (YYYY-MM-DD,
+    inclusive) restrict created_at. CSV and JSONL are streamed row by row.
+    """
+    permission_classes = [IsAuthenticated]
+    stream_formats = {
+        'csv': (csv_stream, 'text/csv; charset=utf-8'),
+        'jsonl': (jsonl_stream, 'application/x-ndjson'),
+    }
+
+    def get(self, request, dataset, export_format):
+        if dataset not in DATASETS or export_format not in ('csv', 'jsonl', 'xlsx'):
+            raise Http404
+        if not (request.user.is_staff or request.user.is_service_provider):
+            raise PermissionDenied('Only service providers can export bookings.')
+
+        export = DATASETS[dataset]
+        queryset = export.queryset_for(request.user)
+        try:
+            if request.query_params.get('since'):
+                queryset = queryset.filter(created_at__date__gte=date.fromisoformat(request.query_params['since']))
+            if request.query_params.get('until'):
+                queryset = queryset.filter(created_at__date__lte=date.fromisoformat(request.query_params['until']))
+        except ValueError:
+            raise ValidationError({'since': 'since and until must be YYYY-MM-DD dates.'})
+
+        filename = f'{dataset}.{export_format}'
+        rows = export.rows(queryset)
+        if export_format == 'xlsx':
+            try:
+                output = xlsx_file(export.headers, rows)
+            except ValueError as e:
+                raise ValidationError({'detail': str(e)})
+            return FileResponse(output, as_attachment=True, filename=filename)
 
-    def destroy(self, request, *args, **kwargs):
-        instance = self.get_object()
-        self.perform_destroy(instance)
-        return Response(status=204)
\ No newline at end of file
+        stream, content_type = self.stream_formats[export_format]
+        response = StreamingHttpResponse(stream(export.headers, rows), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
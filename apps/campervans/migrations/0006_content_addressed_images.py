@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import apps.campervans.utils
+import apps.core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campervans', '0005_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='campervanimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.campervans.utils.campervan_image_upload_path),
+        ),
+    ]
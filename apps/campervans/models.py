@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from apps.core.ratings import COUNTER_FIELDS, breakdown
+from apps.core.storage import media_storage
 from .utils import campervan_image_upload_path
 
 User = get_user_model()
@@ -76,7 +78,11 @@ class CampervanPickupLocation(models.Model):
 
 class CampervanImage(models.Model):
     campervan = models.ForeignKey('Campervan', related_name='campervan_images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to=campervan_image_upload_path, blank=True, null=True)
+    image = models.ImageField(upload_to=campervan_image_upload_path, storage=media_storage, blank=True, null=True)
+    variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Thumbnails and resized copies, see apps.core.images')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False, help_text='Tiny blurred preview as a data: URI')
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -171,6 +177,13 @@ class Campervan(models.Model):
     # Reviews & Ratings
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     total_reviews = models.IntegerField(default=0)
+    # Running totals kept by apps.core.ratings as reviews change
+    rating_sum = models.PositiveIntegerField(default=0)
+    star_1_count = models.PositiveIntegerField(default=0)
+    star_2_count = models.PositiveIntegerField(default=0)
+    star_3_count = models.PositiveIntegerField(default=0)
+    star_4_count = models.PositiveIntegerField(default=0)
+    star_5_count = models.PositiveIntegerField(default=0)
     total_trips = models.IntegerField(default=0)
     
     # Timestamps
@@ -183,11 +196,9 @@ class Campervan(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for the campervan"""
-        primary_img = self.campervan_images.filter(is_primary=True).first()
-        if primary_img and primary_img.image:
-            return primary_img.image.url
-        # Fallback to first available image
-        first_img = self.campervan_images.first()
+        # Images are ordered primary-first, so the first row is the primary
+        # image (or the newest one). Iterating .all() reuses prefetched rows.
+        first_img = next(iter(self.campervan_images.all()), None)
         if first_img and first_img.image:
             return first_img.image.url
         return None
@@ -198,15 +209,10 @@ class Campervan(models.Model):
         return [img.image.url for img in self.campervan_images.all() if img.image]
 
     def update_rating(self):
-        """Update the average rating and total reviews count"""
-        reviews = self.reviews.all()
-        if reviews.exists():
-            self.rating = reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0.0
-            self.total_reviews = reviews.count()
-        else:
-            self.rating = 0.0
-            self.total_reviews = 0
-        self.save()
+        """Recount the rating counters from the reviews (they are normally kept incrementally)"""
+        from .ratings import campervan_ratings
+        campervan_ratings.recount(ids=[self.pk])
+        self.refresh_from_db(fields=COUNTER_FIELDS)
 
     @property
     def average_rating(self):
@@ -215,11 +221,8 @@ class Campervan(models.Model):
 
     @property
     def rating_breakdown(self):
-        """Get rating breakdown (count for each star level)"""
-        breakdown = {i: 0 for i in range(1, 6)}
-        for review in self.reviews.all():
-            breakdown[review.rating] += 1
-        return breakdown
+        """Get rating breakdown (count for each star level) from the stored counters"""
+        return breakdown(self)
 
     class Meta:
         ordering = ['-created_at']
\ No newline at end of file
@@ -0,0 +1,5 @@
+from apps.core.ratings import register_review_table
+
+from .models import CampervanReview
+
+campervan_ratings = register_review_table(CampervanReview, 'campervan')
@@ -0,0 +1,10 @@
+from apps.search.indexes import register_search_index
+
+from .models import Campervan
+
+campervan_index = register_search_index(
+    Campervan, 'campervan',
+    keywords=['model', 'brand__name', 'city__name', 'fuel_type__type', 'transmission__type'],
+    body=['description'],
+    city='city__name',
+)
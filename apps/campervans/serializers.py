@@ -1,7 +1,11 @@
 from rest_framework import serializers
+from apps.core.ratings import COUNTER_FIELDS
 from .models import Campervan
 
 class CampervanSerializer(serializers.ModelSerializer):
+    rating_breakdown = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
     class Meta:
         model = Campervan
-        fields = '__all__'  # You can specify the fields you want to include here if needed.
\ No newline at end of file
+        fields = '__all__'  # You can specify the fields you want to include here if needed.
+        read_only_fields = COUNTER_FIELDS  # Kept by apps.core.ratings from the reviews
\ No newline at end of file
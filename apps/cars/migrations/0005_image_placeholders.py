@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0004_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='carimage',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Tiny blurred preview as a data: URI'),
+        ),
+        migrations.AddField(
+            model_name='carimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
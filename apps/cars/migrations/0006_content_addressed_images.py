@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import apps.cars.utils
+import apps.core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0005_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='carimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.cars.utils.car_image_upload_path),
+        ),
+    ]
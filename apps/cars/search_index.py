@@ -0,0 +1,10 @@
+from apps.search.indexes import register_search_index
+
+from .models import Car
+
+car_index = register_search_index(
+    Car, 'car',
+    keywords=['model', 'brand__name', 'vehicle_type__type', 'city__name', 'fuel_type__type', 'transmission__type'],
+    body=['description'],
+    city='city__name',
+)
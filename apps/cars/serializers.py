@@ -1,10 +1,14 @@
 from rest_framework import serializers
-from ..models import Car
+from apps.core.ratings import COUNTER_FIELDS
+from .models import Car
 
 class CarSerializer(serializers.ModelSerializer):
+    rating_breakdown = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
     class Meta:
         model = Car
         fields = '__all__'  # This will include all fields from the Car model
+        read_only_fields = COUNTER_FIELDS  # Kept by apps.core.ratings from the reviews
 
 class CarDetailSerializer(serializers.ModelSerializer):
     class Meta:
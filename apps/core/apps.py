@@ -0,0 +1,30 @@
+from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+
+    def ready(self):
+        from .autocomplete import city_autocomplete
+        from .db_metrics import metrics
+        from .storage import track_file_references
+
+        # Each app's filter_options module connects its invalidation signals on import
+        autodiscover_modules('filter_options')
+        # ...and each availability module registers its per-day table with the calendar engine
+        autodiscover_modules('availability')
+        # ...and each ratings module registers its review table with the rating counters
+        autodiscover_modules('ratings')
+        # ...and each images module registers its image models with the derivative pipeline
+        autodiscover_modules('images')
+
+        city_autocomplete.connect()
+        # Release content-addressed blobs when the rows referencing them go
+        track_file_references()
+
+        request_started.connect(metrics.request_started, dispatch_uid='core.db_metrics.request_started')
+        connection_created.connect(metrics.connection_created, dispatch_uid='core.db_metrics.connection_created')
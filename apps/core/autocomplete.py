@@ -0,0 +1,166 @@
+import re
+import threading
+import time
+import unicodedata
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+
+# kind -> (city model label, reverse lookups of the listings in a city)
+CITY_TABLES = {
+    'bike': ('bikes.BikeCity', ['bike']),
+    'car': ('cars.CarCity', ['car']),
+    'campervan': ('campervans.CampervanCity', ['campervan']),
+    'hotel': ('hotels.HotelCity', ['hotel']),
+    'guided_trip': ('guided_trips.TripCity', ['trips_from', 'trips_to']),
+    'story': ('stories.UserstoriesCity', ['userstories']),
+    'fulltour': ('fulltours.FullTourCity', ['fulltour']),
+    'holidaypackage': ('holidaypackages.HolidayPackageCity', ['holidaypackage']),
+}
+MAX_SUGGESTIONS = 10
+VERSION_KEY = 'city_autocomplete:version'
+# Listing counts also change through bulk writes; rebuild at least this often (seconds)
+MAX_AGE = 60 * 10
+
+
+def normalize(text):
+    """Lowercase, accents and punctuation removed, single spaces"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    return ' '.join(re.findall(r'\w+', text))
+
+
+class City:
+    """One city name across every city table it appears in"""
+    __slots__ = ('name', 'words', 'state', 'country', 'rows', 'popularity')
+
+    def __init__(self, name, state, country):
+        self.name = name
+        self.words = normalize(name).split()
+        self.state = state
+        self.country = country
+        self.rows = {}  # kind -> city model instance
+        self.popularity = {}  # kind -> listings in the city
+
+    @property
+    def total_popularity(self):
+        return sum(self.popularity.values())
+
+
+class Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []
+
+
+class PrefixTrie:
+    """
+    Trie over the normalized words of city names (so "del" finds "New
+    Delhi"). Every node keeps its best MAX_SUGGESTIONS cities, so a lookup
+    is one walk down the prefix whatever the number of matches.
+    """
+
+    def __init__(self, cities, rank):
+        self.root = Node()
+        # Best cities first, so each node's list fills with its top ones and stops
+        for city in sorted(cities, key=rank):
+            # Suffixes starting at each word, so "new de" still matches "New Delhi"
+            for key in {' '.join(city.words[i:]) for i in range(len(city.words))}:
+                node = self.root
+                self.add(node, city)
+                for char in key:
+                    node = node.children.setdefault(char, Node())
+                    self.add(node, city)
+
+    @staticmethod
+    def add(node, city):
+        if len(node.top) < MAX_SUGGESTIONS and city not in node.top:
+            node.top.append(city)
+
+    def lookup(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.top
+
+
+class CityAutocomplete:
+    """
+    Process-level city name index over every app's city table, most
+    popular (most listings) first. Saving or deleting a city or a listing
+    bumps a version in the shared cache; each process rebuilds lazily on
+    its next lookup after that, or after MAX_AGE.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tries = None
+        self.version = None
+        self.built_at = 0.0
+
+    def connect(self):
+        for kind, (label, lookups) in CITY_TABLES.items():
+            city_model = apps.get_model(label)
+            models = [city_model] + [city_model._meta.get_field(lookup).related_model for lookup in lookups]
+            for model in models:
+                uid = f'core.autocomplete:{kind}:{model._meta.label}'
+                post_save.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+                post_delete.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+
+    def invalidate(self, **kwargs):
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+    def load(self):
+        cities = {}
+        for kind, (label, lookups) in CITY_TABLES.items():
+            city_model = apps.get_model(label)
+            rows = city_model.objects.annotate(
+                **{f'{lookup}_count': Count(lookup, distinct=len(lookups) > 1) for lookup in lookups}
+            )
+            for row in rows.iterator():
+                key = (normalize(row.name), normalize(row.state))
+                city = cities.get(key)
+                if city is None:
+                    city = cities[key] = City(row.name, row.state, row.country)
+                # Duplicate names within one table keep the first row
+                city.rows.setdefault(kind, row)
+                city.popularity[kind] = city.popularity.get(kind, 0) + sum(
+                    getattr(row, f'{lookup}_count') for lookup in lookups
+                )
+        return list(cities.values())
+
+    def build(self):
+        cities = self.load()
+        tries = {None: PrefixTrie(cities, rank=lambda city: (-city.total_popularity, city.name))}
+        for kind in CITY_TABLES:
+            tries[kind] = PrefixTrie(
+                [city for city in cities if kind in city.rows],
+                rank=lambda city, kind=kind: (-city.popularity.get(kind, 0), city.name),
+            )
+        return tries
+
+    def current(self):
+        version = cache.get(VERSION_KEY)
+        if self.tries is None or version != self.version or time.monotonic() - self.built_at > MAX_AGE:
+            with self.lock:
+                if self.tries is None or version != self.version or time.monotonic() - self.built_at > MAX_AGE:
+                    self.tries = self.build()
+                    self.version = version
+                    self.built_at = time.monotonic()
+        return self.tries
+
+    def suggest(self, query, kind=None, limit=MAX_SUGGESTIONS):
+        """Cities with a word starting with `query`, most popular first"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        return self.current()[kind].lookup(prefix)[:limit]
+
+
+city_autocomplete = CityAutocomplete()
@@ -0,0 +1,182 @@
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import AvailabilityMonth
+
+FULL_MONTH = (1 << 31) - 1
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_masks(start, end):
+    """{first day of month: bitmask of the days in [start, end]} for every month the range touches"""
+    masks = {}
+    month = month_start(start)
+    while month <= end:
+        last = date(month.year, month.month, monthrange(month.year, month.month)[1])
+        first_day = max(start, month).day
+        last_day = min(end, last).day
+        masks[month] = ((1 << last_day) - 1) ^ ((1 << (first_day - 1)) - 1)
+        month = last + timedelta(days=1)
+    return masks
+
+
+def blocked_ids(model, start, end):
+    """
+    Ids of `model` items blocked on any day in [start, end], as a values()
+    queryset for use as a subquery. Reads one row per item per month, found
+    through the (content_type, month, object_id) unique index.
+    """
+    masks = month_masks(start, end)
+    clash = Case(
+        *[When(month=month, then=F('blocked').bitand(mask)) for month, mask in masks.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return (
+        AvailabilityMonth.objects
+        .filter(content_type=ContentType.objects.get_for_model(model), month__in=list(masks))
+        .alias(clash=clash)
+        .filter(clash__gt=0)
+        .values('object_id')
+    )
+
+
+def free_between(queryset, start, end):
+    """Narrow `queryset` to items free on every day from `start` to `end` inclusive"""
+    return queryset.exclude(pk__in=blocked_ids(queryset.model, start, end))
+
+
+def block_range(model, ids, start, end):
+    """Mark days [start, end] as blocked for the given `model` item ids"""
+    content_type = ContentType.objects.get_for_model(model)
+    ids = list(ids)
+    with transaction.atomic():
+        for month, mask in month_masks(start, end).items():
+            AvailabilityMonth.objects.bulk_create(
+                [AvailabilityMonth(content_type=content_type, object_id=pk, month=month) for pk in ids],
+                ignore_conflicts=True,
+            )
+            AvailabilityMonth.objects.filter(
+                content_type=content_type, month=month, object_id__in=ids
+            ).update(blocked=F('blocked').bitor(mask))
+
+
+def unblock_range(model, ids, start, end):
+    """Free days [start, end] for the given `model` item ids; months left empty are deleted"""
+    content_type = ContentType.objects.get_for_model(model)
+    ids = list(ids)
+    with transaction.atomic():
+        for month, mask in month_masks(start, end).items():
+            rows = AvailabilityMonth.objects.filter(content_type=content_type, month=month, object_id__in=ids)
+            rows.update(blocked=F('blocked').bitand(FULL_MONTH ^ mask))
+            rows.filter(blocked=0).delete()
+
+
+class DailyCalendar:
+    """
+    Keeps the month bitmaps of an item model in step with its legacy
+    one-row-per-day availability table (`is_available=False` rows block
+    the day). Row saves and deletes update the bitmap for that day (and
+    for the day a row was moved away from); bulk writes to the daily table
+    need a `sync()`.
+    """
+
+    def __init__(self, daily_model, item_field):
+        self.daily_model = daily_model
+        self.item_field = item_field
+        self.item_model = daily_model._meta.get_field(item_field).related_model
+
+        uid = f'core.availability:{daily_model._meta.label}'
+        pre_save.connect(self.row_saving, sender=daily_model, weak=False, dispatch_uid=f'{uid}:pre_save')
+        post_save.connect(self.row_saved, sender=daily_model, weak=False, dispatch_uid=f'{uid}:save')
+        post_delete.connect(self.row_deleted, sender=daily_model, weak=False, dispatch_uid=f'{uid}:delete')
+
+    def row_saving(self, instance, raw=False, **kwargs):
+        instance.__dict__['_availability_day'] = None
+        if raw or instance._state.adding:
+            return
+        # The stored item and day, which this save may move the row away from
+        instance.__dict__['_availability_day'] = (
+            self.daily_model._default_manager
+            .filter(pk=instance.pk)
+            .values_list(f'{self.item_field}_id', 'date')
+            .first()
+        )
+
+    def row_saved(self, instance, raw=False, **kwargs):
+        before = instance.__dict__.pop('_availability_day', None)
+        if raw:
+            return
+        item_id = getattr(instance, f'{self.item_field}_id')
+        if before is not None and before != (item_id, instance.date):
+            self.release_day(*before)
+        if instance.is_available:
+            self.release_day(item_id, instance.date)
+        else:
+            block_range(self.item_model, [item_id], instance.date, instance.date)
+
+    def row_deleted(self, instance, **kwargs):
+        self.release_day(getattr(instance, f'{self.item_field}_id'), instance.date)
+
+    def release_day(self, item_id, day):
+        """Unblock one day of an item unless another daily row still blocks it"""
+        still_blocked = self.daily_model._default_manager.filter(
+            **{f'{self.item_field}_id': item_id}, date=day, is_available=False
+        ).exists()
+        if not still_blocked:
+            unblock_range(self.item_model, [item_id], day, day)
+
+    def sync(self, batch_size=1000, apps=None):
+        """
+        Rebuild every bitmap of the item model from the daily table. Blocks
+        made only through block_range() for this model are discarded.
+        Returns the number of month rows written. A migration passes its
+        `apps` so the historical models are used.
+        """
+        if apps is None:
+            daily_model, months = self.daily_model, AvailabilityMonth
+            content_type = ContentType.objects.get_for_model(self.item_model)
+        else:
+            daily_model, months = apps.get_model(self.daily_model._meta.label), apps.get_model('core', 'AvailabilityMonth')
+            content_type, _ = apps.get_model('contenttypes', 'ContentType').objects.get_or_create(
+                app_label=self.item_model._meta.app_label, model=self.item_model._meta.model_name,
+            )
+
+        bitmaps = defaultdict(int)
+        rows = (
+            daily_model._default_manager
+            .filter(is_available=False)
+            .values_list(f'{self.item_field}_id', 'date')
+            .order_by()
+        )
+        for item_id, day in rows.iterator(chunk_size=batch_size):
+            bitmaps[item_id, month_start(day)] |= 1 << (day.day - 1)
+
+        with transaction.atomic():
+            months.objects.filter(content_type=content_type).delete()
+            months.objects.bulk_create(
+                [
+                    months(content_type=content_type, object_id=item_id, month=month, blocked=blocked)
+                    for (item_id, month), blocked in bitmaps.items()
+                ],
+                batch_size=batch_size,
+            )
+        return len(bitmaps)
+
+
+daily_calendars = {}
+
+
+def register_daily_table(daily_model, item_field):
+    daily_calendar = DailyCalendar(daily_model, item_field)
+    daily_calendars[daily_model._meta.label] = daily_calendar
+    return daily_calendar
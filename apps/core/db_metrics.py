@@ -0,0 +1,56 @@
+import os
+import threading
+
+from django.db import connections
+
+
+class ConnectionMetrics:
+    """
+    Per-process counters of requests served and database connections
+    opened, to see how often persistent connections are actually reused.
+    With the psycopg pool every checkout counts as an opened connection;
+    the pool's own stats (physical connections) are reported alongside.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def request_started(self, **kwargs):
+        with self._lock:
+            self.requests += 1
+
+    def connection_created(self, **kwargs):
+        with self._lock:
+            self.connections_opened += 1
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+
+    def snapshot(self):
+        with self._lock:
+            requests, opened = self.requests, self.connections_opened
+        return {
+            'pid': os.getpid(),
+            'requests': requests,
+            'connections_opened': opened,
+            'reuse_ratio': round(1 - min(opened, requests) / requests, 4) if requests else None,
+            'databases': {alias: self.database_stats(alias) for alias in connections},
+        }
+
+    def database_stats(self, alias):
+        settings_dict = connections.settings[alias]
+        stats = {
+            'vendor': connections[alias].vendor,
+            'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+        }
+        if settings_dict.get('OPTIONS', {}).get('pool'):
+            stats['pool'] = connections[alias].pool.get_stats()
+        return stats
+
+
+metrics = ConnectionMetrics()
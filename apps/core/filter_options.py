@@ -0,0 +1,56 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete, post_save
+
+# Entries are dropped by signals; the timeout only bounds staleness after
+# bulk writes (queryset.update(), bulk_create) that send no signals.
+FILTER_OPTIONS_TIMEOUT = 60 * 60 * 24
+
+
+def make_etag(data):
+    """Strong ETag for a JSON-serializable payload"""
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return '"%s"' % hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+class FilterOptions:
+    """
+    Lookup values behind a filter-options endpoint, cached together with
+    their ETag. Saving or deleting a row of any of `models` drops the entry.
+    """
+
+    def __init__(self, name, build, models):
+        self.name = name
+        self.build = build
+        self.models = list(models)
+        self.cache_key = f'filter_options:{name}'
+
+        for model in self.models:
+            uid = f'{self.cache_key}:{model._meta.label}'
+            post_save.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+            post_delete.connect(self.invalidate, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+
+    def get(self):
+        """Return (options, etag), building and caching them on a miss"""
+        entry = cache.get(self.cache_key)
+        if entry is None:
+            options = self.build()
+            entry = {'options': options, 'etag': make_etag(options)}
+            cache.set(self.cache_key, entry, FILTER_OPTIONS_TIMEOUT)
+        return entry['options'], entry['etag']
+
+    def invalidate(self, **kwargs):
+        cache.delete(self.cache_key)
+
+
+def cached_filter_options(name, models):
+    """
+    Decorator turning a function that builds filter options into a cached
+    FilterOptions entry invalidated on changes to `models`.
+    """
+    def decorator(build):
+        return FilterOptions(name, build, models)
+    return decorator
@@ -0,0 +1,28 @@
+from datetime import date
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .availability import free_between
+
+
+class AvailabilityFilter(BaseFilterBackend):
+    """
+    Keep only items free on every day from ?start_date to ?end_date
+    (inclusive, YYYY-MM-DD), using the month bitmaps of apps.core.availability.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        if not (start_date and end_date):
+            return queryset
+
+        try:
+            start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        except ValueError:
+            raise ValidationError({'start_date': 'start_date and end_date must be YYYY-MM-DD dates.'})
+        if end < start:
+            raise ValidationError({'end_date': 'end_date must not be before start_date.'})
+
+        return free_between(queryset, start, end)
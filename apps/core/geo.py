@@ -0,0 +1,92 @@
+import math
+
+from django.db import models
+from django.db.models import ExpressionWrapper, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import ACos, Cast, Cos, Greatest, Least, Radians, Sin
+
+from .location_utils import EARTH_RADIUS_KM, bounding_box, encode_geohash, geohash_cover
+
+
+def geohash_for(latitude, longitude):
+    """Geohash to store for a location row ('' when coordinates are missing)"""
+    if latitude is None or longitude is None:
+        return ''
+    return encode_geohash(latitude, longitude)
+
+
+class GeoQuerySet(models.QuerySet):
+    """
+    QuerySet for location models with `latitude`, `longitude` and an indexed
+    `geohash` column. Candidates are narrowed in SQL with geohash prefixes and
+    a bounding box; only those rows get the exact great-circle distance, also
+    computed in SQL (distance_expression, annotate_nearest_pickup).
+    """
+
+    def within_bounding_box(self, latitude, longitude, radius_km):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+        queryset = self.filter(
+            latitude__gte=min_lat, latitude__lte=max_lat,
+            longitude__gte=min_lng, longitude__lte=max_lng,
+        )
+
+        cells = geohash_cover(latitude, longitude, radius_km)
+        if cells:
+            prefix_filter = Q()
+            for cell in cells:
+                prefix_filter |= Q(geohash__startswith=cell)
+            queryset = queryset.filter(prefix_filter)
+        return queryset
+
+
+def distance_expression(latitude, longitude, lat_field='latitude', lng_field='longitude'):
+    """
+    SQL expression for the great-circle distance (km) from a fixed point to
+    the row's coordinates, using the spherical law of cosines. Built from
+    Django functions so it runs on Postgres and on SQLite (where Django
+    registers the math functions itself).
+    """
+    origin_lat = math.radians(float(latitude))
+    origin_lng = math.radians(float(longitude))
+    row_lat = Radians(Cast(lat_field, FloatField()))
+    row_lng = Radians(Cast(lng_field, FloatField()))
+
+    cos_angle = (
+        Value(math.sin(origin_lat)) * Sin(row_lat)
+        + Value(math.cos(origin_lat)) * Cos(row_lat) * Cos(row_lng - Value(origin_lng))
+    )
+    # Clamp rounding noise so ACOS never sees a value outside [-1, 1]
+    cos_angle = Least(Greatest(cos_angle, Value(-1.0)), Value(1.0))
+    return ExpressionWrapper(Value(float(EARTH_RADIUS_KM)) * ACos(cos_angle), output_field=FloatField())
+
+
+def annotate_nearest_pickup(queryset, latitude, longitude, radius_km, field_name='pickup_locations'):
+    """
+    Annotate items with `distance` (km) to their closest pickup location and
+    `closest_pickup_id`, keep only those within the radius and order them
+    nearest first. Everything runs in the database; pickup locations are
+    narrowed with the geohash/bounding-box index before any distance is computed.
+    """
+    pickup_field = queryset.model._meta.get_field(field_name)
+    through = pickup_field.remote_field.through
+    candidates = pickup_field.related_model.objects.within_bounding_box(latitude, longitude, radius_km)
+
+    closest = (
+        candidates
+        .filter(**{pickup_field.related_query_name(): OuterRef('pk')})
+        .annotate(distance=distance_expression(latitude, longitude))
+        .order_by('distance')
+    )
+    items_near_candidates = through.objects.filter(**{
+        f'{pickup_field.m2m_reverse_field_name()}__in': candidates.values('pk'),
+    }).values(pickup_field.m2m_field_name())
+
+    return (
+        queryset
+        .filter(pk__in=items_near_candidates)
+        .annotate(
+            distance=Subquery(closest.values('distance')[:1], output_field=FloatField()),
+            closest_pickup_id=Subquery(closest.values('pk')[:1]),
+        )
+        .filter(distance__lte=radius_km)
+        .order_by('distance', 'pk')
+    )
@@ -0,0 +1,347 @@
+import base64
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models.signals import post_save, pre_delete, pre_save
+from PIL import Image, ImageOps
+from PIL.ExifTags import Base
+
+logger = logging.getLogger(__name__)
+
+ORIENTATION = Base.Orientation
+
+# name -> (width, height, crop). Thumbnails are cropped to exactly their
+# size; the others fit inside their box and are never upscaled.
+SIZES = {
+    'thumb': (320, 240, True),
+    'medium': (800, 800, False),
+    'large': (1600, 1600, False),
+}
+# format -> (Pillow format, file extension, encoder options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DERIVATIVES_DIR = 'derivatives'
+# Longest side of the inline placeholder, which pages show blurred and stretched
+PLACEHOLDER_SIZE = 16
+# EXIF orientations that swap width and height
+ROTATED = {5, 6, 7, 8}
+# Bump when SIZES or FORMATS change so existing rows are reprocessed
+VERSION = 1
+
+
+def load(data, draft=None):
+    """
+    The decoded, upright RGB image and the size of the original as
+    displayed. `draft` lets JPEG decoding skip to roughly that size.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        width, height = original.size
+        if original.getexif().get(ORIENTATION) in ROTATED:
+            width, height = height, width
+        if draft:
+            original.draft('RGB', draft)
+        return ImageOps.exif_transpose(original).convert('RGB'), (width, height)
+
+
+def placeholder(image):
+    """A PLACEHOLDER_SIZE px JPEG of `image` as a data: URI, under a kilobyte"""
+    small = image.copy()
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    small.save(buffer, format='JPEG', quality=60)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def render_placeholder(data):
+    """{'width', 'height', 'placeholder'} of one original image, without the derivatives"""
+    image, (width, height) = load(data, draft=(PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+    return {'width': width, 'height': height, 'placeholder': placeholder(image)}
+
+
+def render(data):
+    """
+    Derivatives of one original image: {'width', 'height', 'placeholder',
+    'sizes': {size: (width, height, {format: bytes})}}. Runs in a worker
+    process, so it touches neither storage nor the database.
+    """
+    image, (width, height) = load(data)
+
+    results = {}
+    seen = set()
+    for size, (box_width, box_height, crop) in SIZES.items():
+        if crop:
+            resized = ImageOps.fit(image, (box_width, box_height), Image.Resampling.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((box_width, box_height), Image.Resampling.LANCZOS)
+            # A small original gives the same medium and large image; keep one
+            if resized.size in seen:
+                continue
+            seen.add(resized.size)
+
+        encoded = {}
+        for name, (pillow_format, _, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=pillow_format, **options)
+            encoded[name] = buffer.getvalue()
+        results[size] = (resized.width, resized.height, encoded)
+    return {'width': width, 'height': height, 'placeholder': placeholder(image), 'sizes': results}
+
+
+def derivative_name(source, size, extension):
+    root, _ = os.path.splitext(source)
+    return os.path.join(DERIVATIVES_DIR, f'{root}-{size}.{extension}')
+
+
+def derivative_names(variants):
+    """Every stored file named in a `variants` value"""
+    return [
+        entry[name]
+        for entry in (variants or {}).get('sizes', {}).values()
+        for name in FORMATS if name in entry
+    ]
+
+
+def srcset(variants, url):
+    """
+    srcset-style view of a `variants` value, with file names turned into
+    URLs by `url`: {'thumbnail': {format: url, 'width', 'height'},
+    'srcset': {format: 'url 800w, url 1600w'}}. None when not processed.
+    """
+    sizes = (variants or {}).get('sizes')
+    if not sizes:
+        return None
+    thumbnail = sizes.get('thumb')
+    responsive = sorted(
+        (entry for size, entry in sizes.items() if size != 'thumb'),
+        key=lambda entry: entry['width'],
+    )
+    return {
+        'thumbnail': thumbnail and {
+            'width': thumbnail['width'],
+            'height': thumbnail['height'],
+            **{name: url(thumbnail[name]) for name in FORMATS},
+        },
+        'srcset': {
+            name: ', '.join(f"{url(entry[name])} {entry['width']}w" for entry in responsive)
+            for name in FORMATS
+        },
+    }
+
+
+class ImageDerivatives:
+    """
+    Thumbnails and resized WebP/JPEG copies of one image model's uploads.
+    The generated files are recorded in the model's `variants` JSON field
+    together with the original they were made from, and the original's
+    pixel size and inline placeholder are stored alongside. A row whose
+    original changed is reprocessed by the pipeline after its transaction
+    commits. Replacing the original or deleting the row deletes the old
+    derivatives.
+    """
+
+    def __init__(self, model, field='image', variants_field='variants', width_field='width',
+                 height_field='height', placeholder_field='placeholder'):
+        self.model = model
+        self.field = field
+        self.variants_field = variants_field
+        self.width_field = width_field
+        self.height_field = height_field
+        self.placeholder_field = placeholder_field
+
+        uid = f'core.images:{model._meta.label}'
+        pre_save.connect(self.image_saving, sender=model, weak=False, dispatch_uid=f'{uid}:pre_save')
+        post_save.connect(self.image_saved, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+        pre_delete.connect(self.image_deleting, sender=model, weak=False, dispatch_uid=f'{uid}:pre_delete')
+
+    @property
+    def storage(self):
+        return self.model._meta.get_field(self.field).storage
+
+    def is_stale(self, instance):
+        file = getattr(instance, self.field)
+        return bool(file) and not self.is_current(file.name, getattr(instance, self.variants_field))
+
+    @staticmethod
+    def is_current(name, variants):
+        variants = variants or {}
+        return variants.get('source') == name and variants.get('version') == VERSION
+
+    def with_images(self):
+        return self.model._default_manager.exclude(**{self.field: ''}).exclude(**{f'{self.field}__isnull': True})
+
+    def pending_placeholders(self):
+        """Ids of rows with an image but no placeholder yet"""
+        rows = self.with_images().filter(**{self.placeholder_field: ''})
+        return list(rows.order_by('pk').values_list('pk', flat=True))
+
+    def pending(self):
+        """Ids of rows whose derivatives are missing or out of date"""
+        rows = self.with_images()
+        return [
+            pk for pk, name, variants in rows.values_list('pk', self.field, self.variants_field).order_by('pk')
+            if not self.is_current(name, variants)
+        ]
+
+    def image_saved(self, instance, raw=False, **kwargs):
+        if raw or not self.is_stale(instance):
+            return
+        transaction.on_commit(partial(image_pipeline.submit, self, instance.pk))
+
+    def image_saving(self, instance, raw=False, update_fields=None, **kwargs):
+        file = getattr(instance, self.field)
+        if raw or instance._state.adding or (file and file._committed):
+            return
+        if update_fields is not None and self.field not in update_fields:
+            return
+        # A new upload or a cleared image: what was made from the old one goes.
+        # The stored value counts; the pipeline may have written it after this instance was loaded.
+        self.release_stored(instance.pk)
+        cleared = {self.variants_field: {}, self.width_field: None, self.height_field: None, self.placeholder_field: ''}
+        # Cleared in the row too, in case update_fields leaves these out
+        self.model._default_manager.filter(pk=instance.pk).update(**cleared)
+        for field, value in cleared.items():
+            setattr(instance, field, value)
+
+    def image_deleting(self, instance, **kwargs):
+        self.release_stored(instance.pk)
+
+    def release_stored(self, pk):
+        variants = self.model._default_manager.filter(pk=pk).values_list(self.variants_field, flat=True).first()
+        names = derivative_names(variants)
+        if names:
+            transaction.on_commit(partial(self.delete_files, names))
+
+    def delete_files(self, names):
+        for name in names:
+            self.storage.delete(name)
+
+    def process(self, pk, pipeline=None):
+        """Generate and record the derivatives of one row; returns False when it had nothing to do"""
+        pipeline = pipeline or image_pipeline
+        instance = self.model._default_manager.filter(pk=pk).first()
+        if instance is None or not self.is_stale(instance):
+            return False
+        source = getattr(instance, self.field).name
+        with self.storage.open(source, 'rb') as file:
+            results = pipeline.execute(render, file.read())
+
+        variants = {'source': source, 'version': VERSION, 'sizes': {}}
+        for size, (width, height, encoded) in results['sizes'].items():
+            entry = variants['sizes'][size] = {'width': width, 'height': height}
+            for name, data in encoded.items():
+                path = derivative_name(source, size, FORMATS[name][1])
+                entry[name] = self.storage.save(path, ContentFile(data))
+
+        # Only record them if the original was not replaced in the meantime
+        updated = self.model._default_manager.filter(pk=pk, **{self.field: source}).update(
+            **{self.variants_field: variants}, **self.details(results)
+        )
+        # Saved files got names of their own (or, in a content-addressed
+        # storage, one more reference each), so the superseded set can go
+        self.delete_files(derivative_names(getattr(instance, self.variants_field) if updated else variants))
+        return bool(updated)
+
+    def fill_placeholder(self, pk, pipeline=None):
+        """Store the pixel size and placeholder of one row that lacks them, without making derivatives"""
+        pipeline = pipeline or image_pipeline
+        instance = self.model._default_manager.filter(pk=pk).first()
+        file = instance and getattr(instance, self.field)
+        if not file or getattr(instance, self.placeholder_field):
+            return False
+        with self.storage.open(file.name, 'rb') as data:
+            results = pipeline.execute(render_placeholder, data.read())
+        return bool(self.model._default_manager.filter(pk=pk, **{self.field: file.name}).update(**self.details(results)))
+
+    def details(self, results):
+        return {
+            self.width_field: results['width'],
+            self.height_field: results['height'],
+            self.placeholder_field: results['placeholder'],
+        }
+
+
+class ImagePipeline:
+    """
+    Renders derivatives on a process pool (Pillow work is CPU bound and
+    holds the GIL), while a few threads read originals, store results and
+    update rows so requests never wait for it. IMAGE_PIPELINE_WORKERS = 0
+    renders inline in the calling thread instead.
+    """
+
+    def __init__(self, workers=None):
+        self.lock = threading.Lock()
+        self.processes = None
+        self.threads = None
+        self._workers = workers
+
+    @property
+    def workers(self):
+        if self._workers is not None:
+            return self._workers
+        return getattr(settings, 'IMAGE_PIPELINE_WORKERS', 2)
+
+    def process_pool(self):
+        with self.lock:
+            if self.processes is None:
+                # Spawned workers never inherit the parent's threads or database connections
+                self.processes = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self.processes
+
+    def thread_pool(self):
+        with self.lock:
+            if self.threads is None:
+                self.threads = ThreadPoolExecutor(self.workers, thread_name_prefix='image-pipeline')
+            return self.threads
+
+    def execute(self, func, data):
+        """func(data) on the process pool; `func` must be a module-level function"""
+        if not self.workers:
+            return func(data)
+        return self.process_pool().submit(func, data).result()
+
+    def submit(self, derivatives, pk):
+        """Process one row in the background"""
+        if not self.workers:
+            return self.run(derivatives, pk)
+        return self.thread_pool().submit(self.run, derivatives, pk)
+
+    def run(self, derivatives, pk, task='process'):
+        """derivatives.process (or another `task` method) for one row; False when it failed"""
+        try:
+            return getattr(derivatives, task)(pk, self)
+        except Exception:
+            logger.exception('Image derivatives failed for %s %s', derivatives.model._meta.label, pk)
+            return False
+        finally:
+            if self.workers:
+                # Pool threads get their own DB connections; don't leak them
+                connections.close_all()
+
+    def shutdown(self):
+        with self.lock:
+            for pool in (self.threads, self.processes):
+                if pool is not None:
+                    pool.shutdown()
+            self.threads = self.processes = None
+
+
+image_pipeline = ImagePipeline()
+
+image_derivatives = {}
+
+
+def register_image_model(model, **options):
+    derivatives = ImageDerivatives(model, **options)
+    image_derivatives[model._meta.label] = derivatives
+    return derivatives
@@ -0,0 +1,144 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# Precision stored on location rows (~1.2km x 0.6km cells)
+GEOHASH_PRECISION = 6
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """
+    Calculate the great circle distance between two points
+    on the earth (specified in decimal degrees)
+    Returns distance in kilometers
+    """
+    # Convert decimal degrees to radians
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+
+    # Haversine formula
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.asin(math.sqrt(a))
+    return c * EARTH_RADIUS_KM
+
+
+BatchDistances = namedtuple('BatchDistances', ['distances', 'nearest_index', 'within_radius'])
+
+
+def haversine_batch(latitude, longitude, latitudes, longitudes, radius_km=None):
+    """
+    Vectorized haversine from one origin to many candidate points.
+    Candidates may contain None/NaN for missing coordinates; those get a NaN
+    distance and are never nearest or within the radius.
+    Returns BatchDistances(distances, nearest_index, within_radius) where
+    nearest_index is None when no candidate has coordinates and
+    within_radius is None when no radius is given.
+    """
+    lat1 = math.radians(float(latitude))
+    lon1 = math.radians(float(longitude))
+    lat2 = np.radians(np.asarray(latitudes, dtype=float))
+    lon2 = np.radians(np.asarray(longitudes, dtype=float))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    valid = ~np.isnan(distances)
+    nearest_index = int(np.argmin(np.where(valid, distances, np.inf))) if valid.any() else None
+    within_radius = None
+    if radius_km is not None:
+        within_radius = valid & (np.where(valid, distances, np.inf) <= radius_km)
+    return BatchDistances(distances, nearest_index, within_radius)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair as a geohash string of the given length"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    geohash = []
+    bit = 0
+    value = 0
+    even = True  # Geohash interleaves longitude bits first
+    while len(geohash) < precision:
+        rng, coord = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value = value << 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            geohash.append(GEOHASH_ALPHABET[value])
+            bit = 0
+            value = 0
+    return ''.join(geohash)
+
+
+def geohash_cell_size(precision):
+    """Return the (latitude, longitude) size in degrees of a geohash cell"""
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return (min_lat, max_lat, min_lng, max_lng) of the box enclosing a circle.
+    Longitude bounds fall back to the full range near the poles or when the
+    box would cross the antimeridian.
+    """
+    latitude = float(latitude)
+    longitude = float(longitude)
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(-90.0, latitude - dlat)
+    max_lat = min(90.0, latitude + dlat)
+
+    cos_lat = math.cos(math.radians(latitude))
+    if cos_lat < 1e-9 or min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    min_lng = longitude - dlng
+    max_lng = longitude + dlng
+    if min_lng < -180.0 or max_lng > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def geohash_cover(latitude, longitude, radius_km, max_cells=16):
+    """
+    Return the geohash prefixes whose cells together cover the search circle.
+    Uses the finest precision that needs at most `max_cells` cells and returns
+    an empty list when even single-character cells would be too many.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = geohash_cell_size(precision)
+        rows = int((max_lat - min_lat) / lat_step) + 2
+        cols = int((max_lng - min_lng) / lng_step) + 2
+        if rows * cols <= max_cells:
+            break
+    else:
+        return []
+
+    # Sample the box every cell-width (plus its far edge) so every cell it
+    # touches contributes at least one point
+    cells = set()
+    for row in range(rows):
+        lat = min(min_lat + row * lat_step, max_lat)
+        for col in range(cols):
+            lng = min(min_lng + col * lng_step, max_lng)
+            cells.add(encode_geohash(lat, lng, precision))
+    return sorted(cells)
@@ -0,0 +1,87 @@
+import random
+import statistics
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from apps.core.autocomplete import CITY_TABLES, city_autocomplete
+
+BENCHMARK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-autocomplete'},
+}
+
+SYLLABLES = ['ka', 'ma', 'pur', 'na', 'ga', 'ra', 'bad', 'ban', 'de', 'li', 'sha', 'ti', 'van', 'ko', 'lam', 'ne']
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare city autocomplete latency of the in-process index with the '
+        'name__icontains query it replaces, in a throwaway test database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cities', type=int, default=5000, help='Cities per city table')
+        parser.add_argument('--lookups', type=int, default=1000, help='Random prefixes looked up')
+        parser.add_argument('--kind', default='fulltour', choices=list(CITY_TABLES))
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict.setdefault('TEST', {})['MIGRATE'] = False
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options):
+        rnd = random.Random(42)
+        names = sorted({
+            ''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))).title()
+            for _ in range(options['cities'])
+        })
+        region = apps.get_model('guided_trips.TripRegion').objects.create(name='Region')
+        for label, _ in CITY_TABLES.values():
+            city_model = apps.get_model(label)
+            # Trip cities belong to a region
+            extra = {'region': region} if label == 'guided_trips.TripCity' else {}
+            city_model.objects.bulk_create([city_model(name=name, state='State', **extra) for name in names])
+        prefixes = [rnd.choice(names)[:rnd.randint(1, 4)] for _ in range(options['lookups'])]
+        city_model = apps.get_model(CITY_TABLES[options['kind']][0])
+
+        start = time.perf_counter()
+        city_autocomplete.current()
+        build = time.perf_counter() - start
+        self.stdout.write(f"Index of {len(names)} names x {len(CITY_TABLES)} tables built in {build * 1000:.1f} ms")
+
+        index = self.timings(prefixes, lambda prefix: city_autocomplete.suggest(prefix, kind=options['kind']))
+        query = self.timings(prefixes, lambda prefix: list(city_model.objects.filter(name__icontains=prefix)[:10]))
+
+        self.stdout.write(f"{'lookup':<12} {'p50 us':>10} {'p99 us':>10} {'max us':>10}")
+        for label, timings in (('index', index), ('icontains', query)):
+            self.stdout.write(
+                f'{label:<12} {self.percentile(timings, 50):>10.1f} {self.percentile(timings, 99):>10.1f} '
+                f'{max(timings):>10.1f}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Index is {statistics.median(query) / statistics.median(index):.0f}x faster at the median '
+            f'({connection.vendor})'
+        ))
+
+    def timings(self, prefixes, lookup):
+        """Microseconds per lookup"""
+        timings = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            lookup(prefix)
+            timings.append((time.perf_counter() - start) * 1e6)
+        return timings
+
+    def percentile(self, timings, percent):
+        ordered = sorted(timings)
+        return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+from apps.core.db_metrics import ConnectionMetrics
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure per-request latency with and without persistent database connections. '
+        'Each simulated request goes through the request_started/request_finished '
+        'signals (which close expired connections) and runs one query.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--max-age', type=int, default=600, help='CONN_MAX_AGE for the persistent run')
+        parser.add_argument('--query', default='SELECT 1')
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        if settings_dict.get('OPTIONS', {}).get('pool'):
+            # The pool is built from settings on first use and cannot be toggled here
+            modes = [('psycopg pool (configured)', 0)]
+        else:
+            modes = [('new connection per request', 0), ('persistent connection', options['max_age'])]
+
+        self.stdout.write(f'{connection.vendor} {settings_dict.get("HOST") or settings_dict.get("NAME")}')
+        self.stdout.write(f"{'mode':<30} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'opened':>7} {'reuse':>7}")
+
+        original_max_age = settings_dict['CONN_MAX_AGE']
+        try:
+            for label, max_age in modes:
+                settings_dict['CONN_MAX_AGE'] = max_age
+                timings, counters = self.run(options['requests'], options['query'])
+                snapshot = counters.snapshot()
+                self.stdout.write(
+                    f'{label:<30} {statistics.mean(timings):>9.3f} {statistics.median(timings):>9.3f} '
+                    f'{self.percentile(timings, 95):>9.3f} {snapshot["connections_opened"]:>7} '
+                    f'{snapshot["reuse_ratio"]:>7.1%}'
+                )
+        finally:
+            settings_dict['CONN_MAX_AGE'] = original_max_age
+            connections.close_all()
+
+    def run(self, requests, query):
+        connections.close_all()
+        counters = ConnectionMetrics()
+        connection_created.connect(counters.connection_created)
+        try:
+            timings = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                counters.request_started()
+                with connection.cursor() as cursor:
+                    cursor.execute(query)
+                    cursor.fetchall()
+                request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection_created.disconnect(counters.connection_created)
+        return timings, counters
+
+    def percentile(self, values, percent):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
@@ -0,0 +1,50 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.core.location_utils import haversine_batch, haversine_distance
+
+
+class Command(BaseCommand):
+    help = 'Compare the scalar and vectorized haversine implementations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per size (best time is reported)')
+        parser.add_argument('--radius', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(42)
+        origin = (19.0760, 72.8777)  # Mumbai
+
+        self.stdout.write(f"{'points':>10} {'scalar ms':>12} {'batch ms':>12} {'speedup':>9}")
+        for size in options['sizes']:
+            latitudes = [origin[0] + rnd.uniform(-1, 1) for _ in range(size)]
+            longitudes = [origin[1] + rnd.uniform(-1, 1) for _ in range(size)]
+
+            scalar_time, scalar = self._best_of(options['repeat'], lambda: self._scalar(origin, latitudes, longitudes, options['radius']))
+            batch_time, batch = self._best_of(options['repeat'], lambda: haversine_batch(origin[0], origin[1], latitudes, longitudes, options['radius']))
+
+            if not np.allclose(scalar[0], batch.distances) or scalar[1] != batch.nearest_index:
+                self.stdout.write(self.style.ERROR(f'Results differ for {size} points'))
+
+            self.stdout.write(
+                f'{size:>10} {scalar_time * 1000:>12.2f} {batch_time * 1000:>12.2f} {scalar_time / batch_time:>8.1f}x'
+            )
+
+    def _scalar(self, origin, latitudes, longitudes, radius):
+        distances = [haversine_distance(origin[0], origin[1], lat, lng) for lat, lng in zip(latitudes, longitudes)]
+        nearest = min(range(len(distances)), key=distances.__getitem__)
+        within = [distance <= radius for distance in distances]
+        return distances, nearest, within
+
+    def _best_of(self, repeat, func):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,220 @@
+import statistics
+import tempfile
+import time
+import warnings
+from collections import namedtuple
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import UnorderedObjectListWarning
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike
+from apps.bookings.models import Booking
+from apps.bookings.references import create_reference_counters
+from apps.core.autocomplete import city_autocomplete
+from apps.fulltours.models import Fulltour
+from apps.fulltours.models import Itinerary as FulltourItinerary
+from apps.holidaypackages.models import Holidaypackage
+from apps.holidaypackages.models import Itinerary as HolidaypackageItinerary
+from apps.search.engine import install as install_search
+
+from .seed_catalogue import SEED_PASSWORD
+
+User = get_user_model()
+
+Endpoint = namedtuple('Endpoint', ['method', 'path', 'max_queries', 'data'], defaults=[None])
+
+BENCHMARK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-queries'},
+}
+
+NEARBY = 'lat=19.0760&lng=72.8777&radius=50'
+
+# Query budgets hold for any catalogue size; a count that grows with the
+# catalogue is reported separately as an N+1 regression.
+ENDPOINTS = [
+    # apps/bikes
+    Endpoint('GET', '/api/bikes/', 5),
+    Endpoint('GET', '/api/bikes/{bike}/', 4),
+    Endpoint('GET', '/api/bikes/cities/', 2),
+    Endpoint('GET', '/api/bikes/brands/', 2),
+    Endpoint('GET', '/api/bikes/fuel-types/', 2),
+    Endpoint('GET', '/api/bikes/transmissions/', 2),
+    Endpoint('GET', '/api/bikes/rent/', 5),
+    Endpoint('GET', '/api/bikes/available/', 5),
+    Endpoint('GET', '/api/bikes/details/{bike}/', 4),
+    Endpoint('GET', '/api/bikes/filters/', 5),
+    Endpoint('GET', '/api/bikes/filters/?city=Mumbai&min_price=100', 5),
+    Endpoint('GET', '/api/bikes/filter-options/', 6),
+    Endpoint('GET', f'/api/bikes/nearby/?{NEARBY}', 5),
+    Endpoint('GET', '/api/bikes/nearby/', 4),
+    Endpoint('GET', '/api/bikes/model-years/', 2),
+    Endpoint('GET', '/api/bikes/pickup-locations/', 2),
+
+    # apps/fulltours
+    Endpoint('GET', '/api/fulltours/', 5),
+    Endpoint('GET', '/api/fulltours/{fulltour}/', 4),
+    Endpoint('GET', '/api/fulltours/cities/', 2),
+    Endpoint('GET', '/api/fulltours/itineraries/', 3),
+    Endpoint('GET', '/api/fulltours/itineraries/{fulltour_itinerary}/', 2),
+    Endpoint('GET', '/api/fulltours/itinerary-images/', 2),
+    Endpoint('GET', '/api/fulltours/available/', 5),
+    Endpoint('GET', '/api/fulltours/details/{fulltour}/', 4),
+    Endpoint('GET', '/api/fulltours/filters/', 5),
+    Endpoint('GET', '/api/fulltours/filter-options/', 1),
+    Endpoint('GET', f'/api/fulltours/nearby/?{NEARBY}', 5),
+    Endpoint('GET', '/api/fulltours/nearby/', 4),
+    Endpoint('GET', '/api/fulltours/pickup-locations/', 2),
+
+    # apps/holidaypackages
+    Endpoint('GET', '/api/holidaypackages/', 5),
+    Endpoint('GET', '/api/holidaypackages/{holidaypackage}/', 4),
+    Endpoint('GET', '/api/holidaypackages/cities/', 2),
+    Endpoint('GET', '/api/holidaypackages/itineraries/', 3),
+    Endpoint('GET', '/api/holidaypackages/itineraries/{holidaypackage_itinerary}/', 2),
+    Endpoint('GET', '/api/holidaypackages/itinerary-images/', 2),
+    Endpoint('GET', '/api/holidaypackages/available/', 5),
+    Endpoint('GET', '/api/holidaypackages/details/{holidaypackage}/', 4),
+    Endpoint('GET', '/api/holidaypackages/filters/', 5),
+    Endpoint('GET', '/api/holidaypackages/filter-options/', 1),
+    Endpoint('GET', f'/api/holidaypackages/nearby/?{NEARBY}', 5),
+    Endpoint('GET', '/api/holidaypackages/nearby/', 4),
+    Endpoint('GET', '/api/holidaypackages/pickup-locations/', 2),
+
+    # apps/bookings: the page, then one query per booked model (three are seeded)
+    Endpoint('GET', '/api/bookings/', 4),
+    Endpoint('GET', '/api/bookings/?status=confirmed', 4),
+    Endpoint('GET', '/api/bookings/summary/', 1),
+    Endpoint('GET', '/api/bookings/{booking}/', 2),
+
+    # apps/search: one full-text query, plus the trigram lookup when nothing matches
+    Endpoint('GET', '/api/search/?q=catalogue+mumb', 1),
+    Endpoint('GET', '/api/search/?q=catalgoue', 2),
+    Endpoint('GET', '/api/search/suggest/?q=catalgoue', 1),
+    Endpoint('GET', '/api/bikes/?search=catalogue+mumbai', 6),
+
+    # apps/core: city autocomplete is served from the in-process index
+    Endpoint('GET', '/api/core/cities/autocomplete/?q=mu', 0),
+    Endpoint('GET', '/api/fulltours/cities/autocomplete/?q=del', 0),
+    Endpoint('GET', '/api/holidaypackages/cities/autocomplete/?q=go', 0),
+
+    # apps/accounts
+    Endpoint('POST', '/api/accounts/login/', 6, {'email': 'catalogue-traveller@example.com', 'password': SEED_PASSWORD}),
+    Endpoint('GET', '/api/accounts/profile/', 0),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed catalogues of increasing size in a throwaway test database, hit every '
+        'catalogue endpoint and fail when a query, time or size budget is exceeded. '
+        'Runs offline with DATABASE_URL=sqlite://:memory:'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[5, 50], help='Listings per catalogue for each run')
+        parser.add_argument('--repeat', type=int, default=3, help='Requests per endpoint (median time is reported)')
+        parser.add_argument('--max-ms', type=float, default=None, help='Fail when an endpoint is slower than this')
+        parser.add_argument('--max-kb', type=float, default=None, help='Fail when a response is larger than this')
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        # Build the schema straight from the models, like the test runner's
+        # --nomigrations mode, so the run does not depend on migration history
+        connection.settings_dict.setdefault('TEST', {})['MIGRATE'] = False
+        # DEBUG off as under the test runner; only the measured requests log their queries
+        setup_test_environment(debug=False)
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # What the skipped migrations would have added beyond the tables
+        install_search()
+        create_reference_counters()
+        try:
+            # A private cache so entries from the shared cache never leak into the
+            # run, and seeded images in a throwaway MEDIA_ROOT, processed as they
+            # are seeded rather than by pool threads while endpoints are measured
+            with warnings.catch_warnings(), tempfile.TemporaryDirectory() as media_root, override_settings(
+                CACHES=BENCHMARK_CACHES, MEDIA_ROOT=media_root, IMAGE_PIPELINE_WORKERS=0,
+            ):
+                # Lookup viewsets paginate unordered querysets; that is not what is measured here
+                warnings.simplefilter('ignore', UnorderedObjectListWarning)
+                failures = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError('Budgets exceeded:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS(f'All {len(ENDPOINTS)} endpoints within budget'))
+
+    def run(self, options):
+        failures = []
+        first_counts = {}
+        for size in sorted(options['sizes']):
+            # Seeding is incremental, so each run extends the previous catalogue
+            call_command('seed_catalogue', size=size, stdout=StringIO())
+            # Content types are cached per process; warm them so counts are steady-state
+            ContentType.objects.get_for_models(*(apps.get_model(label) for label, _ in Booking.SERVICE_MODELS.values()))
+            # Likewise the city autocomplete index, which seeding invalidated
+            city_autocomplete.current()
+            client = APIClient()
+            client.force_authenticate(User.objects.get(email='catalogue-traveller@example.com'))
+            ids = self.lookup_ids()
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\nCatalogue size {size} ({connection.vendor})'))
+            self.stdout.write(f"{'endpoint':<72} {'queries':>9} {'ms':>8} {'bytes':>9}")
+            for endpoint in ENDPOINTS:
+                key = (endpoint.method, endpoint.path)
+                url = endpoint.path.format(**ids)
+                status, queries, elapsed, size_bytes = self.measure(client, endpoint, url, options['repeat'])
+
+                self.stdout.write(
+                    f'{endpoint.method + " " + url:<72.72} {queries:>4}/{endpoint.max_queries:<4} '
+                    f'{elapsed * 1000:>8.1f} {size_bytes:>9}'
+                )
+                if status >= 400:
+                    failures.append(f'{endpoint.method} {url}: HTTP {status}')
+                if queries > endpoint.max_queries:
+                    failures.append(f'{endpoint.method} {url}: {queries} queries (budget {endpoint.max_queries}) at size {size}')
+                if key in first_counts and queries > first_counts[key]:
+                    failures.append(f'{endpoint.method} {url}: queries grew from {first_counts[key]} to {queries} with catalogue size')
+                if options['max_ms'] is not None and elapsed * 1000 > options['max_ms']:
+                    failures.append(f'{endpoint.method} {url}: {elapsed * 1000:.1f} ms (budget {options["max_ms"]} ms)')
+                if options['max_kb'] is not None and size_bytes > options['max_kb'] * 1024:
+                    failures.append(f'{endpoint.method} {url}: {size_bytes} bytes (budget {options["max_kb"]} KB)')
+                first_counts.setdefault(key, queries)
+        return failures
+
+    def lookup_ids(self):
+        return {
+            'bike': Bike.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'booking': Booking.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'fulltour': Fulltour.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'fulltour_itinerary': FulltourItinerary.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'holidaypackage': Holidaypackage.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'holidaypackage_itinerary': HolidaypackageItinerary.objects.order_by('pk').values_list('pk', flat=True).first(),
+        }
+
+    def measure(self, client, endpoint, url, repeat):
+        """Query count of the first request, median wall time over `repeat` requests"""
+        timings = []
+        queries = None
+        for _ in range(max(repeat, 1)):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                if endpoint.method == 'POST':
+                    response = client.post(url, endpoint.data, format='json', secure=True)
+                else:
+                    response = client.get(url, secure=True)
+                timings.append(time.perf_counter() - start)
+            if queries is None:
+                queries = len(captured.captured_queries)
+        return response.status_code, queries, statistics.median(timings), len(response.content)
@@ -0,0 +1,153 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.images import FORMATS, derivative_names, image_derivatives
+from apps.core.models import MediaBlob
+from apps.core.storage import file_references, is_blob, media_storage
+
+# Blobs this new may belong to an upload whose row is not committed yet
+GRACE = timedelta(hours=1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Move files referenced by content-addressed file fields into blobs, storing '
+        'identical files once, then recount blob references and delete unreferenced blobs'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fields', nargs='*',
+            help='File fields to move, e.g. bikes.BikeImage.image (default: all content-addressed ones)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be moved and saved')
+
+    def handle(self, *args, **options):
+        labels = options['fields'] or sorted(file_references)
+        unknown = [label for label in labels if label not in file_references]
+        if unknown:
+            raise CommandError(f"Unknown fields: {', '.join(unknown)}. Content-addressed: {', '.join(sorted(file_references))}")
+
+        self.dry_run = options['dry_run']
+        self.moved = set()
+        self.digests = {}
+        missing = 0
+        for label in labels:
+            start = time.perf_counter()
+            references = file_references[label]
+            derivatives = image_derivatives.get(references.model._meta.label)
+            if derivatives is not None and derivatives.field != references.field:
+                derivatives = None
+            moved, lost = self.move_files(references, derivatives)
+            missing += lost
+            if derivatives is not None:
+                moved += self.move_derivatives(derivatives)
+            action = 'to move' if self.dry_run else 'moved'
+            self.stdout.write(f'{label}: {moved} files {action}, {lost} missing ({time.perf_counter() - start:.2f}s)')
+
+        if self.dry_run:
+            unique = {digest: size for digest, size in self.digests.values()}
+            duplicate_bytes = sum(size for _, size in self.digests.values()) - sum(unique.values())
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(self.digests)} files would become {len(unique)} blobs, '
+                f'saving {duplicate_bytes / 2 ** 20:.1f} MB ({missing} missing)'
+            ))
+            return
+
+        # Old files go only once every row that shared them points at a blob
+        for storage, name in self.moved:
+            storage.delete(name)
+        fixed, orphans = self.recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(self.moved)} files moved into blobs, {fixed} reference counts fixed, '
+            f'{orphans} unreferenced blobs deleted ({missing} missing)'
+        ))
+
+    def blob(self, storage, name):
+        """Blob name for the stored file `name` (None when it is missing)"""
+        if not storage.exists(name):
+            return None
+        with storage.open(name, 'rb') as file:
+            if self.dry_run:
+                self.digests[name] = storage.digest(file)
+                return name
+            blob = storage.save(name, file)
+        self.moved.add((storage, name))
+        return blob
+
+    def move_files(self, references, derivatives=None):
+        """
+        Point each row at the blob of its file. Derivatives made from the
+        file are recorded against its name, so `derivatives` (the field's
+        ImageDerivatives, if any) gets the new source in the same update
+        and the rows are not reprocessed.
+        """
+        model, field, storage = references.model, references.field, references.storage
+        rows = (
+            model._default_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            .exclude(**{f'{field}__startswith': 'blobs/'})
+        )
+        columns = ['pk', field] + ([derivatives.variants_field] if derivatives else [])
+        moved = missing = 0
+        for pk, name, *variants in rows.values_list(*columns).order_by('pk').iterator():
+            blob = self.blob(storage, name)
+            if blob is None:
+                missing += 1
+                continue
+            moved += 1
+            if self.dry_run:
+                continue
+            changes = {field: blob}
+            if variants and variants[0] and variants[0].get('source') == name:
+                changes[derivatives.variants_field] = {**variants[0], 'source': blob}
+            model._default_manager.filter(pk=pk, **{field: name}).update(**changes)
+        return moved, missing
+
+    def move_derivatives(self, derivatives):
+        model, storage, variants_field = derivatives.model, derivatives.storage, derivatives.variants_field
+        moved = 0
+        for pk, variants in model._default_manager.exclude(**{variants_field: {}}).values_list('pk', variants_field):
+            changed = False
+            for entry in (variants or {}).get('sizes', {}).values():
+                for key in FORMATS:
+                    name = entry.get(key)
+                    if not name or is_blob(name):
+                        continue
+                    blob = self.blob(storage, name)
+                    if blob is not None:
+                        entry[key] = blob
+                        changed = True
+                        moved += 1
+            if changed and not self.dry_run:
+                model._default_manager.filter(pk=pk).update(**{variants_field: variants})
+        return moved
+
+    def recount(self):
+        """Store the true number of references of every blob; delete blobs nothing references"""
+        expected = Counter()
+        for references in file_references.values():
+            names = references.model._default_manager.filter(**{f'{references.field}__startswith': 'blobs/'})
+            expected.update(names.values_list(references.field, flat=True))
+        for derivatives in image_derivatives.values():
+            for variants in derivatives.model._default_manager.values_list(derivatives.variants_field, flat=True):
+                expected.update(name for name in derivative_names(variants) if is_blob(name))
+
+        fixed = orphans = 0
+        storage = media_storage()
+        for blob in MediaBlob.objects.filter(created_at__lt=timezone.now() - GRACE).iterator():
+            count = expected.get(blob.name, 0)
+            if count == 0:
+                # Down to the last reference, which delete() then drops with the file
+                MediaBlob.objects.filter(pk=blob.pk).update(references=1)
+                storage.delete(blob.name)
+                orphans += 1
+            elif count != blob.references:
+                # Relative, so references added while counting are kept
+                MediaBlob.objects.filter(pk=blob.pk).update(references=F('references') - blob.references + count)
+                fixed += 1
+        return fixed, orphans
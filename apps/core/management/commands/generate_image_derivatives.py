@@ -0,0 +1,60 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.images import ImagePipeline, image_derivatives
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate thumbnails, WebP/JPEG copies, pixel sizes and placeholders of existing '
+        'images that have none or outdated ones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*',
+            help='Image models to process, e.g. bikes.BikeImage (default: all registered)',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Rendering processes (0 renders in this process)',
+        )
+        parser.add_argument(
+            '--placeholders', action='store_true',
+            help='Only fill in missing pixel sizes and placeholders, which is much faster than making derivatives',
+        )
+
+    def handle(self, *args, **options):
+        labels = options['models'] or sorted(image_derivatives)
+        unknown = [label for label in labels if label not in image_derivatives]
+        if unknown:
+            raise CommandError(f"Unknown models: {', '.join(unknown)}. Registered: {', '.join(sorted(image_derivatives))}")
+
+        pipeline = ImagePipeline(workers=options['workers'])
+        task = 'fill_placeholder' if options['placeholders'] else 'process'
+        total = failed = 0
+        try:
+            for label in labels:
+                derivatives = image_derivatives[label]
+                pending = derivatives.pending_placeholders() if options['placeholders'] else derivatives.pending()
+                start = time.perf_counter()
+                if pipeline.workers:
+                    # One thread per rendering process keeps every process busy
+                    with ThreadPoolExecutor(pipeline.workers) as threads:
+                        results = list(threads.map(lambda pk: pipeline.run(derivatives, pk, task), pending))
+                else:
+                    results = [pipeline.run(derivatives, pk, task) for pk in pending]
+                done = sum(results)
+                total += done
+                failed += len(pending) - done
+                self.stdout.write(f'{label}: {done} of {len(pending)} images processed ({time.perf_counter() - start:.2f}s)')
+        finally:
+            pipeline.shutdown()
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} images failed or changed while processing; run again to retry'))
+        done = 'Placeholders filled in' if options['placeholders'] else 'Image derivatives generated'
+        self.stdout.write(self.style.SUCCESS(f'{done} for {total} images'))
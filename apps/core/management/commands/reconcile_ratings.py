@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.ratings import review_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the stored rating counters of reviewed items from their review tables and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*',
+            help='Review tables to reconcile, e.g. bikes.BikeReview (default: all registered)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report items whose counters drifted')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        labels = options['tables'] or sorted(review_counters)
+        unknown = [label for label in labels if label not in review_counters]
+        if unknown:
+            raise CommandError(f"Unknown tables: {', '.join(unknown)}. Registered: {', '.join(sorted(review_counters))}")
+
+        total = 0
+        for label in labels:
+            start = time.perf_counter()
+            drifted = review_counters[label].recount(dry_run=options['dry_run'], batch_size=options['batch_size'])
+            total += drifted
+            self.stdout.write(f'{label}: {drifted} items drifted ({time.perf_counter() - start:.2f}s)')
+
+        action = 'found' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f'Rating counters reconciled, {total} drifted items {action}'))
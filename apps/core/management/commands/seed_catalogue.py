@@ -0,0 +1,199 @@
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import cache
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from PIL import Image
+
+from apps.bikes import models as bikes
+from apps.bookings.models import Booking
+from apps.bookings.references import next_booking_reference
+from apps.core.geo import geohash_for
+from apps.fulltours import models as fulltours
+from apps.holidaypackages import models as holidaypackages
+
+User = get_user_model()
+
+# (city, state, latitude, longitude) that listings and pickup points are spread around
+HUBS = [
+    ('Mumbai', 'Maharashtra', 19.0760, 72.8777),
+    ('Delhi', 'Delhi', 28.6139, 77.2090),
+    ('Bangalore', 'Karnataka', 12.9716, 77.5946),
+    ('Goa', 'Goa', 15.2993, 74.1240),
+    ('Manali', 'Himachal Pradesh', 32.2432, 77.1892),
+]
+
+PICKUPS_PER_LISTING = 3
+IMAGES_PER_LISTING = 2
+ITINERARY_DAYS = 3
+# Seeded images are real files of this size, so the image pipeline and media serving have something to read
+SAMPLE_IMAGE_SIZE = (8, 6)
+
+SEED_PASSWORD = 'catalogue-pass-123'
+
+# Every listing gets one booking by the catalogue traveller, spread from here on
+BOOKINGS_START = datetime(2030, 1, 1, 10, tzinfo=timezone.utc)
+BOOKING_STATUSES = ['pending', 'confirmed', 'active', 'completed', 'cancelled']
+
+
+@cache
+def sample_image():
+    buffer = BytesIO()
+    Image.new('RGB', SAMPLE_IMAGE_SIZE, (200, 120, 40)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def seed_image(model, name):
+    """Store the sample image for `model`'s image field and return its stored name"""
+    return model._meta.get_field('image').storage.save(name, ContentFile(sample_image()))
+
+
+class Command(BaseCommand):
+    help = 'Seed a deterministic bikes/fulltours/holidaypackages catalogue of a given size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=20, help='Listings per catalogue')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        size = options['size']
+        seed = options['seed']
+
+        # Lookup tables (brands, cities, fuel types, ...) come from the regular seeder
+        call_command('seed_bikes_data', stdout=self.stdout if options['verbosity'] > 1 else StringIO())
+
+        with transaction.atomic():
+            traveller, providers = self.seed_users()
+            self.seed_bikes(size, seed, providers)
+            self.seed_tours(fulltours, fulltours.Fulltour, fulltours.FullTourCity, 'fulltour', size, seed, providers)
+            self.seed_tours(holidaypackages, holidaypackages.Holidaypackage, holidaypackages.HolidayPackageCity, 'holidaypackage', size, seed, providers)
+            for service_type, model in [('bike', bikes.Bike), ('fulltour', fulltours.Fulltour), ('holidaypackage', holidaypackages.Holidaypackage)]:
+                self.seed_bookings(service_type, model, traveller)
+
+        self.stdout.write(self.style.SUCCESS(f'Catalogue seeded with {size} listings per app'))
+
+    def seed_users(self):
+        traveller = self.get_user('catalogue-traveller', 'traveller')
+        return traveller, [self.get_user(f'catalogue-provider{i}', 'service_provider') for i in range(2)]
+
+    def get_user(self, username, user_type):
+        user, created = User.objects.get_or_create(
+            email=f'{username}@example.com',
+            defaults={'username': username, 'user_type': user_type, 'is_verified': True},
+        )
+        if created:
+            user.set_password(SEED_PASSWORD)
+            user.save(update_fields=['password'])
+        return user
+
+    def pickup_locations(self, module, city_model, prefix, index, rnd):
+        """Create the pickup points for listing `index` around its hub"""
+        name, state, lat, lng = HUBS[index % len(HUBS)]
+        city, _ = city_model.objects.get_or_create(name=name, defaults={'state': state})
+        locations = []
+        for n in range(PICKUPS_PER_LISTING):
+            latitude = Decimal(lat + rnd.uniform(-0.2, 0.2)).quantize(Decimal('0.0000001'))
+            longitude = Decimal(lng + rnd.uniform(-0.2, 0.2)).quantize(Decimal('0.0000001'))
+            locations.append(module.PickupLocation(
+                name=f'{prefix} {index} pickup {n}', address=f'{name}, {state}', city=city,
+                latitude=latitude, longitude=longitude, geohash=geohash_for(latitude, longitude),
+            ))
+        return city, module.PickupLocation.objects.bulk_create(locations)
+
+    def seed_bikes(self, size, seed, providers):
+        brands = list(bikes.BikeBrand.objects.order_by('pk'))
+        years = list(bikes.BikeModelYear.objects.order_by('pk'))
+        transmissions = list(bikes.BikeTransmission.objects.order_by('pk'))
+        fuel_types = list(bikes.BikeFuelType.objects.order_by('pk'))
+        rental_types = [bikes.BikeRentalType.objects.get_or_create(type=t)[0] for t in ['Hourly', 'Daily', 'Weekly']]
+
+        existing = set(bikes.Bike.objects.filter(title__startswith='Catalogue bike ').values_list('title', flat=True))
+        for index in range(size):
+            title = f'Catalogue bike {index}'
+            if title in existing:
+                continue
+            # One generator per listing so a larger catalogue extends a smaller one
+            rnd = random.Random(f'{seed}-bike-{index}')
+            city, locations = self.pickup_locations(bikes, bikes.BikeCity, 'Bike', index, rnd)
+            bike = bikes.Bike.objects.create(
+                title=title, model=f'Model {index}', city=city,
+                brand=rnd.choice(brands), model_year=rnd.choice(years),
+                transmission=rnd.choice(transmissions), fuel_type=rnd.choice(fuel_types),
+                rental_type=rnd.choice(rental_types), service_provider=providers[index % len(providers)],
+                price_per_hour=Decimal(rnd.randrange(50, 500)), price_per_day=Decimal(rnd.randrange(500, 3000)),
+                safety_deposit=Decimal('2000.00'), operating_hours='8 AM - 8 PM',
+                documents_required='Valid driving license', terms_and_conditions='Standard rental terms apply',
+            )
+            bike.pickup_locations.set(locations)
+            bikes.BikeImage.objects.bulk_create([
+                bikes.BikeImage(
+                    bike=bike, image=seed_image(bikes.BikeImage, f'bikes/catalogue/{index}-{n}.jpg'), is_primary=(n == 0),
+                )
+                for n in range(IMAGES_PER_LISTING)
+            ])
+
+    def seed_tours(self, module, model, city_model, prefix, size, seed, providers):
+        """Fulltours and holiday packages share the same schema"""
+        image_model = getattr(module, f'{model.__name__}Image')
+        label = prefix.capitalize()
+
+        existing = set(model.objects.filter(title__startswith=f'Catalogue {prefix} ').values_list('title', flat=True))
+        for index in range(size):
+            title = f'Catalogue {prefix} {index}'
+            if title in existing:
+                continue
+            rnd = random.Random(f'{seed}-{prefix}-{index}')
+            city, locations = self.pickup_locations(module, city_model, label, index, rnd)
+            listing = model.objects.create(
+                title=title, model=f'{label} {index}', city=city,
+                service_provider=providers[index % len(providers)],
+                price_per_person=Decimal(rnd.randrange(5000, 50000)),
+                price_per_hour=Decimal(rnd.randrange(100, 1000)), price_per_day=Decimal(rnd.randrange(1000, 10000)),
+                safety_deposit=Decimal('5000.00'), operating_hours='All day',
+                documents_required='Government ID', terms_and_conditions='<p>Standard terms apply</p>',
+                description=f'<p>{label} around {city.name}</p>',
+            )
+            listing.pickup_locations.set(locations)
+            image_model.objects.bulk_create([
+                image_model(**{
+                    prefix: listing, 'is_primary': n == 0,
+                    'image': seed_image(image_model, f'{prefix}s/catalogue/{index}-{n}.jpg'),
+                })
+                for n in range(IMAGES_PER_LISTING)
+            ])
+            for day in range(1, ITINERARY_DAYS + 1):
+                itinerary = module.Itinerary.objects.create(
+                    **{prefix: listing}, dayNum=f'Day {day}', name=f'Day {day} in {city.name}',
+                    city=city.name, description=f'<p>Day {day}</p>',
+                )
+                module.ItineraryImage.objects.create(
+                    itinerary=itinerary, is_primary=True,
+                    image=seed_image(module.ItineraryImage, f'itineraries/catalogue/{index}-{day}.jpg'),
+                )
+
+
+    def seed_bookings(self, service_type, model, traveller):
+        content_type = ContentType.objects.get_for_model(model)
+        booked = set(Booking.objects.filter(content_type=content_type, user=traveller).values_list('object_id', flat=True))
+        listings = model.objects.filter(title__startswith='Catalogue ').exclude(pk__in=booked).order_by('pk')
+
+        bookings = []
+        for listing in listings:
+            index = int(listing.title.rsplit(' ', 1)[1])
+            start = BOOKINGS_START + timedelta(days=3 * index)
+            bookings.append(Booking(
+                booking_reference=next_booking_reference(), user=traveller, service_type=service_type,
+                content_type=content_type, object_id=listing.pk, start_date=start, end_date=start + timedelta(days=2),
+                duration_days=2, base_cost=listing.price_per_day * 2, total_cost=listing.price_per_day * 2,
+                security_deposit=listing.safety_deposit, status=BOOKING_STATUSES[index % len(BOOKING_STATUSES)],
+                contact_name='Catalogue Traveller', contact_phone='9000000000', contact_email=traveller.email,
+                service_provider_id=listing.service_provider_id,
+            ))
+        Booking.objects.bulk_create(bookings)
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.availability import daily_calendars
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the month availability bitmaps from the per-day availability tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables', nargs='*',
+            help='Daily tables to sync, e.g. bikes.BikeAvailability (default: all registered)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        labels = options['tables'] or sorted(daily_calendars)
+        unknown = [label for label in labels if label not in daily_calendars]
+        if unknown:
+            raise CommandError(f"Unknown tables: {', '.join(unknown)}. Registered: {', '.join(sorted(daily_calendars))}")
+
+        for label in labels:
+            start = time.perf_counter()
+            months = daily_calendars[label].sync(batch_size=options['batch_size'])
+            self.stdout.write(f'{label}: {months} month rows in {time.perf_counter() - start:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS('Availability bitmaps synced'))
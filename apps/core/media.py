@@ -0,0 +1,181 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import UPLOAD_DIR, is_blob
+
+# Content-addressed names never change content
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# path prefix -> check(request, path) returning whether the file may be served
+media_permissions = {}
+
+
+def register_media_permission(prefix, check):
+    media_permissions[prefix] = check
+    return check
+
+
+class FileRange:
+    """
+    Up to `length` bytes of an open file from its current position. It
+    keeps fileno(), so a WSGI server's file wrapper can still hand the
+    range to os.sendfile() (gunicorn sends Content-Length bytes).
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def byte_range(header, size):
+    """(start, end) inclusive for a single-range Range header, None to send everything, False if unsatisfiable"""
+    match = RANGE.match(header.strip())
+    # Multiple ranges are allowed to be answered with the whole file
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        if last and int(last) < int(first):
+            # Invalid rather than unsatisfiable, so the header is ignored
+            return None
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        # A suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size:
+        return False
+    return start, end
+
+
+def validators(path, stat):
+    """(ETag, Last-Modified timestamp) of a media file"""
+    if is_blob(path):
+        # The name holds the SHA-256 of the content
+        etag = f'"{os.path.splitext(os.path.basename(path))[0]}"'
+    else:
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return etag, int(stat.st_mtime)
+
+
+def check_permission(request, path):
+    """Whether any check guards `path`; raises PermissionDenied when one refuses it"""
+    checked = False
+    for prefix, check in media_permissions.items():
+        if path.startswith(prefix):
+            if not check(request, path):
+                raise PermissionDenied
+            checked = True
+    return checked
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    A file under MEDIA_ROOT, after any permission check registered for its
+    path. With MEDIA_SERVING = 'x-accel-redirect' (nginx) or 'x-sendfile'
+    (Apache, lighttpd) the front proxy sends the bytes; otherwise they go
+    out as a FileResponse honouring single Range requests. Either way the
+    response carries ETag, Last-Modified and cache headers, and a matching
+    conditional request gets a 304 without opening the file.
+    """
+    # Direct uploads are unchecked until a row claims them
+    if path.startswith(f'{UPLOAD_DIR}/'):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    private = check_permission(request, path)
+
+    etag, last_modified = validators(path, stat)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = send(request, path, full_path, stat.st_size, etag, last_modified)
+    response.headers.setdefault('ETag', etag)
+    response.headers.setdefault('Last-Modified', http_date(last_modified))
+    # Served as the extension's type, never as what the bytes look like
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if private:
+        # Shared caches must not hand a guarded file to someone else
+        response.headers['Cache-Control'] = f"private, max-age={getattr(settings, 'MEDIA_MAX_AGE', 86400)}"
+    else:
+        response.headers['Cache-Control'] = (
+            IMMUTABLE_CACHE if is_blob(path) else f"public, max-age={getattr(settings, 'MEDIA_MAX_AGE', 86400)}"
+        )
+    return response
+
+
+def send(request, path, full_path, size, etag, last_modified):
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    mode = getattr(settings, 'MEDIA_SERVING', 'django')
+
+    if mode == 'x-accel-redirect':
+        # An internal nginx location aliasing MEDIA_ROOT; nginx answers Range itself
+        response = HttpResponse(content_type=content_type)
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(path)
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    requested = byte_range(request.headers.get('Range', ''), size) if request.method == 'GET' else None
+    if requested is not None and not if_range_matches(request, etag, last_modified):
+        requested = None
+    if requested is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(full_path, 'rb')
+    if requested is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = requested
+        file.seek(start)
+        response = FileResponse(FileRange(file, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def if_range_matches(request, etag, last_modified):
+    """Whether a Range applies given If-Range: an unchanged file (by ETag or date) or no If-Range"""
+    condition = request.headers.get('If-Range')
+    if not condition:
+        return True
+    if condition.startswith('"') or condition.startswith('W/'):
+        return condition == etag
+    return parse_http_date_safe(condition) == last_modified
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def sync_availability(apps, schema_editor):
+    from apps.core.availability import daily_calendars
+
+    for daily_calendar in daily_calendars.values():
+        daily_calendar.sync(apps=apps)
+
+
+def clear_availability(apps, schema_editor):
+    apps.get_model('core', 'AvailabilityMonth').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    """Month bitmaps for the days already blocked in the per-day availability tables"""
+
+    dependencies = [
+        ('core', '0002_media_blob'),
+        ('bikes', '0018_content_addressed_images'),
+        ('campervans', '0006_content_addressed_images'),
+        ('cars', '0006_content_addressed_images'),
+        ('fulltours', '0007_content_addressed_images'),
+        ('holidaypackages', '0006_content_addressed_images'),
+        ('hotels', '0006_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_availability, clear_availability),
+    ]
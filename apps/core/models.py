@@ -0,0 +1,40 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class AvailabilityMonth(models.Model):
+    """
+    One month of an item's calendar as a bitmask: bit n set means day n + 1
+    is blocked. Items without a row for a month are free all month.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    item = GenericForeignKey('content_type', 'object_id')
+    month = models.DateField(help_text='First day of the month')
+    blocked = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'month', 'object_id'], name='core_availability_month_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id} - {self.month:%Y-%m}"
+
+
+class MediaBlob(models.Model):
+    """
+    One file of the content-addressed media storage (apps.core.storage) and
+    the number of stored references to it; the file goes with the last one.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.references} references)"
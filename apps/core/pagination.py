@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class DistanceCursorPagination(CursorPagination):
+    """Cursor pagination for querysets annotated with `distance` (nearest first)"""
+    ordering = ('distance', 'pk')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class NewestFirstCursorPagination(CursorPagination):
+    """Keyset pagination over `created_at`, newest first; pages stay cheap however deep"""
+    ordering = ('-created_at', '-pk')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
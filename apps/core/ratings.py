@@ -0,0 +1,157 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf, Round
+from django.db.models.signals import post_delete, post_save, pre_save
+
+STARS = range(1, 6)
+RATING_PLACES = Decimal('0.01')
+
+
+def star_field(star):
+    return f'star_{star}_count'
+
+
+# Columns on the item model that the counters below maintain
+COUNTER_FIELDS = ['rating', 'total_reviews', 'rating_sum', *(star_field(star) for star in STARS)]
+
+
+def average(rating_sum, count):
+    if not count:
+        return Decimal('0.00')
+    return (Decimal(rating_sum) / count).quantize(RATING_PLACES, rounding=ROUND_HALF_UP)
+
+
+def breakdown(item):
+    """{star: number of reviews} from the counters stored on `item`"""
+    return {star: getattr(item, star_field(star)) for star in STARS}
+
+
+def recount(review_model, item_field, ids=None, dry_run=False, batch_size=1000):
+    """
+    Recompute the counters of the given item ids (default: all items)
+    from the review table and store those that drifted. Returns the
+    number of items whose counters were wrong. Works with the historical
+    models of a data migration too.
+    """
+    item_model = review_model._meta.get_field(item_field).related_model
+    reviews = review_model.objects.order_by().values(item_field)
+    items = item_model.objects.only(*COUNTER_FIELDS).order_by('pk')
+    if ids is not None:
+        reviews = reviews.filter(**{f'{item_field}__in': ids})
+        items = items.filter(pk__in=ids)
+    stats = {
+        row[item_field]: row
+        for row in reviews.annotate(
+            count=Count('pk'),
+            total=Sum('rating'),
+            **{star_field(star): Count('pk', filter=Q(rating=star)) for star in STARS},
+        )
+    }
+
+    drifted = []
+    for item in items.iterator(chunk_size=batch_size):
+        row = stats.get(item.pk, {})
+        expected = {
+            'total_reviews': row.get('count', 0),
+            'rating_sum': row.get('total') or 0,
+            **{star_field(star): row.get(star_field(star), 0) for star in STARS},
+        }
+        expected['rating'] = average(expected['rating_sum'], expected['total_reviews'])
+        if any(getattr(item, field) != value for field, value in expected.items()):
+            for field, value in expected.items():
+                setattr(item, field, value)
+            drifted.append(item)
+
+    if drifted and not dry_run:
+        item_model.objects.bulk_update(drifted, COUNTER_FIELDS, batch_size=batch_size)
+    return len(drifted)
+
+
+class ReviewCounter:
+    """
+    Keeps `total_reviews`, `rating_sum`, the per-star counts and the
+    average `rating` of an item model in step with its review table.
+    Each review save or delete is one UPDATE of the item row with
+    F-expressions, so concurrent reviews never overwrite each other's
+    counts. Bulk writes to the review table need a `recount()`.
+    """
+
+    def __init__(self, review_model, item_field):
+        self.review_model = review_model
+        self.item_field = item_field
+        self.item_model = review_model._meta.get_field(item_field).related_model
+
+        uid = f'core.ratings:{review_model._meta.label}'
+        pre_save.connect(self.review_saving, sender=review_model, weak=False, dispatch_uid=f'{uid}:pre_save')
+        post_save.connect(self.review_saved, sender=review_model, weak=False, dispatch_uid=f'{uid}:save')
+        post_delete.connect(self.review_deleted, sender=review_model, weak=False, dispatch_uid=f'{uid}:delete')
+
+    def counted(self, review):
+        """(item id, rating) as it affects the counters"""
+        return getattr(review, f'{self.item_field}_id'), review.rating
+
+    def review_saving(self, instance, raw=False, update_fields=None, **kwargs):
+        instance._counted_rating = None
+        if raw or instance._state.adding:
+            return
+        if update_fields is not None and not {'rating', self.item_field} & set(update_fields):
+            return
+        instance._counted_rating = (
+            self.review_model.objects
+            .filter(pk=instance.pk)
+            .values_list(f'{self.item_field}_id', 'rating')
+            .first()
+        )
+
+    def review_saved(self, instance, created, raw=False, update_fields=None, **kwargs):
+        if raw:
+            return
+        if created:
+            self.adjust(*self.counted(instance), 1)
+            return
+        before = getattr(instance, '_counted_rating', None)
+        after = self.counted(instance)
+        if before is None or before == after:
+            return
+        self.adjust(*before, -1)
+        self.adjust(*after, 1)
+
+    def review_deleted(self, instance, **kwargs):
+        self.adjust(*self.counted(instance), -1)
+
+    def adjust(self, item_id, star, step):
+        """
+        Add (step=1) or remove (step=-1) one review of `star` stars. The
+        counters stop at 0: after drift (a review that was never counted)
+        a removal must not break their unsigned check constraints;
+        reconcile_ratings corrects them.
+        """
+        count = Greatest(F('total_reviews') + step, Value(0))
+        rating_sum = Greatest(F('rating_sum') + step * star, Value(0))
+        rating = Coalesce(
+            Cast(
+                Round(Cast(rating_sum, models.FloatField()) / NullIf(count, 0), 2),
+                models.DecimalField(max_digits=3, decimal_places=2),
+            ),
+            Value(Decimal('0.00')),
+        )
+        self.item_model.objects.filter(pk=item_id).update(
+            total_reviews=count,
+            rating_sum=rating_sum,
+            rating=rating,
+            **{star_field(star): Greatest(F(star_field(star)) + step, Value(0))},
+        )
+
+    def recount(self, ids=None, dry_run=False, batch_size=1000):
+        return recount(self.review_model, self.item_field, ids=ids, dry_run=dry_run, batch_size=batch_size)
+
+
+review_counters = {}
+
+
+def register_review_table(review_model, item_field):
+    review_counter = ReviewCounter(review_model, item_field)
+    review_counters[review_model._meta.label] = review_counter
+    return review_counter
@@ -0,0 +1,55 @@
+from storages.backends.s3 import S3Storage as BaseS3Storage
+from storages.utils import clean_name
+
+from .media import IMMUTABLE_CACHE
+from .storage import ContentAddressed, DirectUploads, is_blob
+
+
+class S3Storage(DirectUploads, BaseS3Storage):
+    """
+    django-storages' S3 backend (AWS or any S3-compatible service via
+    AWS_S3_ENDPOINT_URL) with direct uploads: browsers POST to the bucket
+    under a presigned policy, and claimed uploads are copied into place by
+    the service. Saves through the app go up as multipart uploads once
+    they pass AWS_S3_TRANSFER_CONFIG's threshold.
+    """
+
+    def key(self, name):
+        return self._normalize_name(clean_name(name))
+
+    def presigned_upload(self, name, content_type, max_size, expires):
+        post = self.bucket.meta.client.generate_presigned_post(
+            self.bucket_name,
+            self.key(name),
+            Fields={'Content-Type': content_type},
+            Conditions=[{'Content-Type': content_type}, ['content-length-range', 1, max_size]],
+            ExpiresIn=expires,
+        )
+        return {'url': post['url'], 'fields': post['fields']}
+
+    def move(self, old_name, new_name):
+        # A managed copy, server side and in parts for large objects; the
+        # metadata is replaced so the new name gets its own headers
+        self.bucket.copy(
+            {'Bucket': self.bucket_name, 'Key': self.key(old_name)},
+            self.key(new_name),
+            ExtraArgs={**self._get_write_parameters(new_name), 'MetadataDirective': 'REPLACE'},
+            Config=self.transfer_config,
+        )
+        self.delete(old_name)
+
+
+class ContentAddressedS3Storage(ContentAddressed, S3Storage):
+    """ContentAddressed in an S3 bucket; blobs are sent with far-future cache headers"""
+
+    def __init__(self, **kwargs):
+        # exists() has to ask the bucket, which it skips when overwriting is allowed
+        kwargs.setdefault('file_overwrite', False)
+        super().__init__(**kwargs)
+
+    def get_object_parameters(self, name):
+        parameters = super().get_object_parameters(name)
+        # _save() passes the key, under AWS_LOCATION
+        if is_blob(name.removeprefix(self.location).lstrip('/')):
+            parameters.setdefault('CacheControl', IMMUTABLE_CACHE)
+        return parameters
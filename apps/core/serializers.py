@@ -0,0 +1,97 @@
+from django.db import models
+from rest_framework import serializers
+
+from .images import srcset
+from .uploads import UploadError, claim_upload
+
+
+class EagerLoadingMixin:
+    """
+    Serializer mixin that declares the joins and prefetches its fields need.
+    `setup_eager_loading` applies them to a queryset so that serializing a
+    page costs a fixed number of queries, whatever its size.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
+
+
+class CitySuggestionSerializer(serializers.Serializer):
+    """A city from apps.core.autocomplete with its row id in each city table"""
+    name = serializers.CharField()
+    state = serializers.CharField()
+    country = serializers.CharField()
+    popularity = serializers.SerializerMethodField()
+    ids = serializers.SerializerMethodField()
+
+    def get_popularity(self, city):
+        kind = self.context.get('kind')
+        return city.popularity.get(kind, 0) if kind else city.total_popularity
+
+    def get_ids(self, city):
+        return {kind: row.pk for kind, row in city.rows.items()}
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    The thumbnail and srcset strings of an image row's derivatives (see
+    apps.core.images.srcset), or None until they have been generated.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', '*')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def url(self, image, name):
+        url = type(image)._meta.get_field('image').storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def to_representation(self, image):
+        return srcset(image.variants, lambda name: self.url(image, name))
+
+
+class PrimaryImageVariantsField(ImageVariantsField):
+    """ImageVariantsField of a listing's primary image; `images` is the (prefetched) related name"""
+
+    def __init__(self, images, **kwargs):
+        self.images = images
+        super().__init__(**kwargs)
+
+    def to_representation(self, item):
+        # Images are ordered primary-first, like the models' primary_image
+        image = next(iter(getattr(item, self.images).all()), None)
+        return super().to_representation(image) if image is not None else None
+
+
+class DirectUploadImageField(serializers.ImageField):
+    """
+    An ImageField that also takes the 'upload' token of a direct upload
+    (see apps.core.uploads): the stored file is validated like a posted
+    one, then moved into place by the storage when the row is saved.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) and data:
+            field = self.parent.Meta.model._meta.get_field(self.source)
+            try:
+                data = claim_upload(data, field)
+            except UploadError as error:
+                raise serializers.ValidationError(str(error))
+        return super().to_internal_value(data)
+
+
+class DirectUploadMixin:
+    """ModelSerializer mixin giving the model's image fields DirectUploadImageField"""
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.ImageField: DirectUploadImageField,
+    }
@@ -0,0 +1,250 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.files.utils import validate_file_name
+from django.db import IntegrityError, transaction
+from django.db.models import F, FileField
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.urls import reverse
+
+BLOB_DIR = 'blobs'
+# Direct uploads land here until a row claims them
+UPLOAD_DIR = 'incoming'
+UPLOAD_SALT = 'core.storage.upload'
+
+
+def media_storage():
+    """Storage of listing images; a callable so migrations don't freeze the backend"""
+    return storages['media']
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{BLOB_DIR}/')
+
+
+class StoredUpload(File):
+    """A file a client uploaded straight into `storage` under `key`, to be moved into place on save"""
+
+    def __init__(self, storage, key):
+        # Named like an upload, so upload_to sees only the file name
+        super().__init__(storage.open(key, 'rb'), os.path.basename(key))
+        self.key = key
+        # The storage itself rather than the default_storage proxy, which is what save() runs on
+        self.storage = getattr(storage, '_wrapped', storage)
+
+
+class DirectUploads:
+    """
+    Lets clients upload files straight to the storage: presigned_upload()
+    describes a form POST the browser sends to the storage itself, and
+    saving a StoredUpload of that file moves it into place there instead
+    of copying its bytes through the app.
+    """
+
+    def presigned_upload(self, name, content_type, max_size, expires):
+        """{'url', 'fields'}: a multipart POST of `fields` plus the file (as 'file', last) stores it as `name`"""
+        raise NotImplementedError('subclasses of DirectUploads must provide a presigned_upload() method')
+
+    def move(self, old_name, new_name):
+        raise NotImplementedError('subclasses of DirectUploads must provide a move() method')
+
+    def is_direct_upload(self, content):
+        return isinstance(content, StoredUpload) and content.storage is self
+
+    def save(self, name, content, max_length=None):
+        if not self.is_direct_upload(content):
+            return super().save(name, content, max_length=max_length)
+        name = self.get_available_name(name or content.name, max_length=max_length)
+        validate_file_name(name, allow_relative_path=True)
+        content.close()
+        self.move(content.key, name)
+        return name
+
+
+class LocalStorage(DirectUploads, FileSystemStorage):
+    """
+    FileSystemStorage with direct uploads, standing in for object storage
+    on a single node and offline: the presigned POST goes to the app's own
+    upload endpoint (apps.core.views.LocalUploadView) with a signed policy
+    in place of the storage's signature.
+    """
+
+    def alias(self):
+        return next(alias for alias in settings.STORAGES if storages[alias] is self)
+
+    def presigned_upload(self, name, content_type, max_size, expires):
+        policy = signing.dumps(
+            {'storage': self.alias(), 'name': name, 'content_type': content_type, 'max_size': max_size},
+            salt=UPLOAD_SALT,
+        )
+        return {
+            'url': reverse('local_upload'),
+            'fields': {'key': name, 'Content-Type': content_type, 'policy': policy},
+        }
+
+    def move(self, old_name, new_name):
+        new_path = self.path(new_name)
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        file_move_safe(self.path(old_name), new_path, allow_overwrite=True)
+
+
+class ContentAddressed(DirectUploads):
+    """
+    Stores each distinct file once, named after the SHA-256 of its content
+    (blobs/3e/12/3e12...f4.jpg) whatever name `upload_to` chose; only the
+    extension is kept. A name therefore never changes content and its URL
+    can be cached forever. Mixed into a storage backend whose exists()
+    tells whether a file is really there.
+
+    References to each blob are counted in MediaBlob: every save() adds
+    one and every delete() removes one, the last one deleting the file.
+    Names outside blobs/ (files stored before this storage) are deleted
+    outright, like the backend does.
+    """
+
+    @staticmethod
+    def digest(content):
+        sha256 = hashlib.sha256()
+        size = 0
+        content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+            size += len(chunk)
+        content.seek(0)
+        return sha256.hexdigest(), size
+
+    @staticmethod
+    def blob_name(digest, name):
+        extension = os.path.splitext(name or '')[1].lower()[:10]
+        return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest, size = self.digest(content)
+        name = self.blob_name(digest, name)
+
+        created = self.add_reference(name, digest, size)
+        write = created or not self.exists(name)
+        if not self.is_direct_upload(content):
+            if write:
+                self._save(name, content)
+            return name
+        # Directly uploaded: becomes the blob in place, or goes when the blob exists
+        content.close()
+        if write:
+            self.move(content.key, name)
+        else:
+            self.delete(content.key)
+        return name
+
+    def add_reference(self, name, digest, size):
+        """Count one more reference to `name`; True when it is a new blob"""
+        from .models import MediaBlob
+
+        while True:
+            if MediaBlob.objects.filter(name=name).update(references=F('references') + 1):
+                return False
+            try:
+                with transaction.atomic():
+                    MediaBlob.objects.create(name=name, sha256=digest, size=size, references=1)
+                return True
+            except IntegrityError:
+                # Created concurrently; count the reference on that row
+                continue
+
+    def delete(self, name):
+        from .models import MediaBlob
+
+        if not is_blob(name):
+            return super().delete(name)
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.references > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(references=F('references') - 1)
+                return
+            # The last reference; a concurrent save() waits for this row and writes the file again
+            super().delete(name)
+            if blob is not None:
+                blob.delete()
+
+
+class ContentAddressedStorage(ContentAddressed, LocalStorage):
+    """ContentAddressed on the local filesystem, MEDIA_ROOT by default"""
+
+    def __init__(self, **kwargs):
+        # Blobs are rewritten in place when their row was lost; the content is the same
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+
+class FileReferences:
+    """
+    Releases the blob of a model's file field when its row is deleted or
+    the field is given another file, once the transaction commits; the
+    storage deletes the blob with its last reference. Files from before
+    the content-addressed storage may be shared by rows that were seeded
+    with the same path, so they are left alone as Django always did
+    (dedupe_media moves them into blobs).
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+
+        uid = f'core.storage:{model._meta.label}.{field}'
+        pre_save.connect(self.file_saving, sender=model, weak=False, dispatch_uid=f'{uid}:pre_save')
+        post_save.connect(self.file_saved, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+        post_delete.connect(self.file_deleted, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+
+    @property
+    def storage(self):
+        return self.model._meta.get_field(self.field).storage
+
+    def file_saving(self, instance, raw=False, update_fields=None, **kwargs):
+        instance.__dict__[f'_stored_{self.field}'] = None
+        if raw or instance._state.adding:
+            return
+        if update_fields is not None and self.field not in update_fields:
+            return
+        file = getattr(instance, self.field)
+        before = self.model._default_manager.filter(pk=instance.pk).values_list(self.field, flat=True).first()
+        # An upload is stored (and referenced) by this save, even when it has the old blob's name
+        instance.__dict__[f'_stored_{self.field}'] = (before, bool(file) and not file._committed)
+
+    def file_saved(self, instance, raw=False, **kwargs):
+        before, uploaded = instance.__dict__.pop(f'_stored_{self.field}', None) or (None, False)
+        if raw or not before:
+            return
+        if uploaded or before != getattr(instance, self.field).name:
+            self.release(before)
+
+    def file_deleted(self, instance, **kwargs):
+        name = getattr(instance, self.field).name
+        if name:
+            self.release(name)
+
+    def release(self, name):
+        if is_blob(name):
+            transaction.on_commit(lambda: self.storage.delete(name))
+
+
+file_references = {}
+
+
+def track_file_references():
+    """FileReferences for every file field kept in a content-addressed storage"""
+    from django.apps import apps
+
+    for model in apps.get_models():
+        for field in model._meta.fields:
+            if isinstance(field, FileField) and isinstance(field.storage, ContentAddressed):
+                file_references[f'{model._meta.label}.{field.name}'] = FileReferences(model, field.name)
+    return file_references
@@ -0,0 +1,27 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class CatalogueTestCase(TestCase):
+    """
+    A test case over the seed_catalogue listings (`catalogue_size` per
+    app). Seeded images are real files, written to a throwaway MEDIA_ROOT
+    and processed inline by the image pipeline.
+    """
+    catalogue_size = 2
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root, IMAGE_PIPELINE_WORKERS=0))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        if cls.catalogue_size:
+            call_command('seed_catalogue', size=cls.catalogue_size, stdout=StringIO())
@@ -0,0 +1,82 @@
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike, BikeCity
+from apps.cars.models import CarCity
+
+from ..autocomplete import MAX_SUGGESTIONS, City, PrefixTrie, city_autocomplete, normalize
+from .catalogue import CatalogueTestCase
+
+
+def city(name, popularity):
+    result = City(name, 'State', 'India')
+    result.popularity = {'bike': popularity}
+    return result
+
+
+def names(cities):
+    return [city.name for city in cities]
+
+
+class PrefixTrieTests(SimpleTestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize('  São   Paulo! '), 'sao paulo')
+        self.assertEqual(normalize('ÖRNSKÖLDSVIK'), 'ornskoldsvik')
+
+    def test_lookup_matches_any_word_best_first(self):
+        trie = PrefixTrie(
+            [city('Delhi Cantt', 1), city('New Delhi', 5), city('Deoghar', 3), city('Mumbai', 9)],
+            rank=lambda city: (-city.total_popularity, city.name),
+        )
+
+        self.assertEqual(names(trie.lookup('de')), ['New Delhi', 'Deoghar', 'Delhi Cantt'])
+        self.assertEqual(names(trie.lookup('new de')), ['New Delhi'])
+        self.assertEqual(names(trie.lookup('delhi')), ['New Delhi', 'Delhi Cantt'])
+        self.assertEqual(trie.lookup('dx'), [])
+        self.assertEqual(names(trie.lookup(''))[0], 'Mumbai')
+
+    def test_nodes_keep_the_best_cities(self):
+        cities = [city(f'Agra {i}', i) for i in range(MAX_SUGGESTIONS + 5)]
+        trie = PrefixTrie(cities, rank=lambda city: -city.total_popularity)
+
+        self.assertEqual(len(trie.lookup('agra')), MAX_SUGGESTIONS)
+        self.assertEqual(trie.lookup('agra')[0].name, f'Agra {MAX_SUGGESTIONS + 4}')
+        # A city listed once even when several of its words match
+        self.assertEqual(names(trie.lookup('agra 1')), ['Agra 14', 'Agra 13', 'Agra 12', 'Agra 11', 'Agra 10', 'Agra 1'])
+
+
+class CityAutocompleteTests(CatalogueTestCase):
+    def setUp(self):
+        # Rows of the index built by an earlier test may have been rolled back
+        city_autocomplete.tries = None
+
+    def suggest(self, **params):
+        response = APIClient().get('/api/core/cities/autocomplete/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cities_merge_across_tables(self):
+        self.assertEqual(self.suggest(q='zuri'), [])
+        bike_city = BikeCity.objects.create(name='Zürich', state='Zurich', country='Switzerland')
+        car_city = CarCity.objects.create(name='Zurich', state='Zurich', country='Switzerland')
+
+        # Saving a city invalidates the index
+        [suggestion] = self.suggest(q='zuri')
+        self.assertEqual(suggestion['ids'], {'bike': bike_city.pk, 'car': car_city.pk})
+        self.assertEqual(suggestion['popularity'], 0)
+        self.assertEqual(self.suggest(q='zuri', kind='hotel'), [])
+
+    def test_popular_cities_come_first(self):
+        bike = Bike.objects.order_by('pk').first()
+        BikeCity.objects.create(name=f'{bike.city.name} Outskirts', state='Nowhere')
+
+        suggestions = self.suggest(q=bike.city.name[:3], kind='bike')
+        self.assertEqual(suggestions[0]['ids']['bike'], bike.city.pk)
+        self.assertEqual(suggestions[0]['popularity'], Bike.objects.filter(city=bike.city).count())
+        self.assertEqual(suggestions[-1]['popularity'], 0)
+        self.assertEqual(len(self.suggest(q=bike.city.name[:3], limit=1)), 1)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.suggest(q=''), [])
+        self.assertEqual(APIClient().get('/api/core/cities/autocomplete/', {'q': 'a', 'kind': 'boat'}).status_code, 400)
+        self.assertEqual(APIClient().get('/api/core/cities/autocomplete/', {'q': 'a', 'limit': 'x'}).status_code, 400)
@@ -0,0 +1,85 @@
+from datetime import date
+
+from rest_framework.test import APIClient
+
+from apps.bikes.availability import bike_calendar
+from apps.bikes.models import Bike, BikeAvailability
+
+from ..availability import FULL_MONTH, block_range, free_between, month_masks, unblock_range
+from ..models import AvailabilityMonth
+from .catalogue import CatalogueTestCase
+
+
+class MonthMaskTests(CatalogueTestCase):
+    catalogue_size = 0
+
+    def test_range_across_months(self):
+        self.assertEqual(month_masks(date(2031, 1, 30), date(2031, 2, 2)), {
+            date(2031, 1, 1): 0b11 << 29,
+            date(2031, 2, 1): 0b11,
+        })
+
+    def test_whole_month(self):
+        self.assertEqual(month_masks(date(2031, 1, 1), date(2031, 1, 31)), {date(2031, 1, 1): FULL_MONTH})
+        self.assertEqual(month_masks(date(2031, 2, 1), date(2031, 2, 28)), {date(2031, 2, 1): (1 << 28) - 1})
+
+
+class AvailabilityTests(CatalogueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bike, cls.other = Bike.objects.order_by('pk')[:2]
+
+    def free(self, start, end):
+        return set(free_between(Bike.objects.all(), start, end).values_list('pk', flat=True))
+
+    def test_blocked_days_exclude_the_item(self):
+        block_range(Bike, [self.bike.pk], date(2031, 3, 10), date(2031, 3, 12))
+
+        self.assertEqual(self.free(date(2031, 3, 1), date(2031, 3, 10)), {self.other.pk})
+        self.assertEqual(self.free(date(2031, 3, 12), date(2031, 4, 2)), {self.other.pk})
+        self.assertEqual(self.free(date(2031, 3, 13), date(2031, 4, 2)), {self.bike.pk, self.other.pk})
+
+        unblock_range(Bike, [self.bike.pk], date(2031, 3, 1), date(2031, 3, 31))
+        self.assertEqual(self.free(date(2031, 3, 1), date(2031, 3, 31)), {self.bike.pk, self.other.pk})
+        # Emptied months are not kept
+        self.assertFalse(AvailabilityMonth.objects.exists())
+
+    def test_daily_rows_keep_the_bitmaps(self):
+        row = BikeAvailability.objects.create(bike=self.bike, date=date(2031, 5, 10), is_available=False)
+        self.assertNotIn(self.bike.pk, self.free(date(2031, 5, 10), date(2031, 5, 10)))
+
+        # Moving the row frees the day it left
+        row.date = date(2031, 6, 1)
+        row.save()
+        self.assertIn(self.bike.pk, self.free(date(2031, 5, 10), date(2031, 5, 10)))
+        self.assertNotIn(self.bike.pk, self.free(date(2031, 6, 1), date(2031, 6, 1)))
+
+        row.is_available = True
+        row.save()
+        self.assertIn(self.bike.pk, self.free(date(2031, 6, 1), date(2031, 6, 1)))
+
+        row.is_available = False
+        row.save()
+        row.delete()
+        self.assertIn(self.bike.pk, self.free(date(2031, 6, 1), date(2031, 6, 1)))
+
+    def test_sync_picks_up_bulk_writes(self):
+        BikeAvailability.objects.bulk_create([
+            BikeAvailability(bike=self.other, date=date(2031, 7, day), is_available=False) for day in (1, 2)
+        ])
+        self.assertIn(self.other.pk, self.free(date(2031, 7, 1), date(2031, 7, 1)))
+
+        self.assertEqual(bike_calendar.sync(), 1)
+        self.assertNotIn(self.other.pk, self.free(date(2031, 7, 2), date(2031, 7, 5)))
+
+    def test_available_endpoint_filters_by_dates(self):
+        block_range(Bike, [self.bike.pk], date(2031, 8, 5), date(2031, 8, 5))
+
+        response = APIClient().get('/api/bikes/available/', {'start_date': '2031-08-01', 'end_date': '2031-08-07'})
+        self.assertEqual(response.status_code, 200)
+        ids = {bike['id'] for bike in response.json()['results']}
+        self.assertEqual(ids, {self.other.pk})
+
+        response = APIClient().get('/api/bikes/available/', {'start_date': '2031-08-07', 'end_date': '2031-08-01'})
+        self.assertEqual(response.status_code, 400)
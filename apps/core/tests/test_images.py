@@ -0,0 +1,121 @@
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+from apps.bikes.models import Bike, BikeImage
+
+from ..images import ORIENTATION, VERSION, derivative_names, image_derivatives, render, srcset
+from .catalogue import CatalogueTestCase
+
+
+def jpeg(size, color=(200, 120, 40), orientation=None):
+    buffer = BytesIO()
+    image = Image.new('RGB', size, color)
+    exif = image.getexif()
+    if orientation:
+        exif[ORIENTATION] = orientation
+    image.save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+class RenderTests(CatalogueTestCase):
+    catalogue_size = 0
+
+    def test_sizes_fit_their_boxes(self):
+        results = render(jpeg((2000, 1000)))
+
+        self.assertEqual((results['width'], results['height']), (2000, 1000))
+        self.assertEqual(
+            {size: (width, height) for size, (width, height, _) in results['sizes'].items()},
+            {'thumb': (320, 240), 'medium': (800, 400), 'large': (1600, 800)},
+        )
+        _, _, encoded = results['sizes']['medium']
+        self.assertEqual(Image.open(BytesIO(encoded['webp'])).format, 'WEBP')
+        self.assertEqual(Image.open(BytesIO(encoded['jpeg'])).format, 'JPEG')
+        self.assertTrue(results['placeholder'].startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(results['placeholder']), 1400)
+
+    def test_small_originals_are_not_upscaled(self):
+        results = render(jpeg((400, 200)))
+
+        # Medium and large would be the same image
+        self.assertEqual(list(results['sizes']), ['thumb', 'medium'])
+        self.assertEqual(results['sizes']['medium'][:2], (400, 200))
+
+    def test_rotated_originals_are_turned_upright(self):
+        results = render(jpeg((600, 300), orientation=6))
+
+        self.assertEqual((results['width'], results['height']), (300, 600))
+        self.assertEqual(results['sizes']['medium'][:2], (300, 600))
+
+
+class ImageDerivativeTests(CatalogueTestCase):
+    catalogue_size = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bike = Bike.objects.get()
+        cls.derivatives = image_derivatives['bikes.BikeImage']
+
+    def upload(self, data, name='photo.jpg'):
+        # Derivatives are made once the row's transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return BikeImage.objects.create(bike=self.bike, image=ContentFile(data, name=name))
+
+    def test_uploads_get_derivatives(self):
+        image = self.upload(jpeg((1200, 900)))
+        image.refresh_from_db()
+
+        self.assertTrue(self.derivatives.is_current(image.image.name, image.variants))
+        self.assertEqual((image.variants['source'], image.variants['version']), (image.image.name, VERSION))
+        self.assertEqual((image.width, image.height), (1200, 900))
+        self.assertTrue(image.placeholder.startswith('data:image/jpeg;base64,'))
+        self.assertNotIn(image.pk, self.derivatives.pending())
+        for name in derivative_names(image.variants):
+            self.assertTrue(image.image.storage.exists(name), name)
+
+        views = srcset(image.variants, lambda name: f'/media/{name}')
+        self.assertEqual((views['thumbnail']['width'], views['thumbnail']['height']), (320, 240))
+        large = image.variants['sizes']['large']['webp']
+        self.assertTrue(views['srcset']['webp'].endswith(f'/media/{large} 1200w'))
+        self.assertIn(' 800w, ', views['srcset']['webp'])
+        self.assertIsNone(srcset({}, str))
+
+    def test_replacing_or_deleting_the_original_drops_its_derivatives(self):
+        image = self.upload(jpeg((900, 900)))
+        image.refresh_from_db()
+        old = derivative_names(image.variants)
+        storage = image.image.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = ContentFile(jpeg((900, 900), color=(10, 20, 30)), name='other.jpg')
+            image.save()
+        image.refresh_from_db()
+        self.assertTrue(self.derivatives.is_current(image.image.name, image.variants))
+        self.assertFalse(any(storage.exists(name) for name in old))
+
+        current = derivative_names(image.variants)
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        self.assertFalse(any(storage.exists(name) for name in current))
+
+    def test_command_processes_pending_images(self):
+        # Seeded images are bulk-created, so nothing has processed them yet
+        pending = self.derivatives.pending()
+        self.assertEqual(pending, sorted(BikeImage.objects.values_list('pk', flat=True)))
+        self.assertEqual(self.derivatives.pending_placeholders(), pending)
+
+        call_command('generate_image_derivatives', 'bikes.BikeImage', '--placeholders', '--workers', '0', stdout=StringIO())
+        self.assertEqual(self.derivatives.pending_placeholders(), [])
+        self.assertEqual(self.derivatives.pending(), pending)
+
+        out = StringIO()
+        call_command('generate_image_derivatives', 'bikes.BikeImage', '--workers', '0', stdout=out)
+        self.assertIn(f'{len(pending)} of {len(pending)} images processed', out.getvalue())
+        self.assertEqual(self.derivatives.pending(), [])
+        # Stale versions are picked up again
+        BikeImage.objects.filter(pk=pending[0]).update(variants={'source': 'old.jpg', 'version': VERSION - 1})
+        self.assertEqual(self.derivatives.pending(), [pending[0]])
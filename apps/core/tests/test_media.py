@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from ..media import IMMUTABLE_CACHE, byte_range, media_permissions
+
+CONTENT = bytes(range(100))
+BLOB = 'blobs/3e/12/3e12f4.txt'
+
+
+class ByteRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=90-': (90, 99),
+            'bytes=95-200': (95, 99),
+            'bytes=-10': (90, 99),
+            'bytes=-200': (0, 99),
+            'bytes=100-': False,
+            'bytes=100-120': False,
+            # Ignored: the whole file is sent
+            'bytes=5-3': None,
+            'bytes=0-1,5-6': None,
+            'bytes=-': None,
+            'items=0-9': None,
+            '': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header):
+                self.assertEqual(byte_range(header, len(CONTENT)), expected)
+
+
+class ServeMediaTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root)
+        for name in ('bikes/file.txt', BLOB, 'incoming/upload.txt', 'private/file.txt'):
+            os.makedirs(os.path.join(media_root, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(media_root, name), 'wb') as f:
+                f.write(CONTENT)
+        cls.mtime = int(os.stat(os.path.join(media_root, 'bikes/file.txt')).st_mtime)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root, MEDIA_SERVING='django'))
+        super().setUpClass()
+
+    def get(self, path, **headers):
+        response = self.client.get(f'/media/{path}', headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_whole_file(self):
+        response = self.get('bikes/file.txt')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), CONTENT)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=86400')
+        self.assertEqual(response['Last-Modified'], http_date(self.mtime))
+
+    def test_blobs_are_cached_forever(self):
+        response = self.get(BLOB)
+
+        self.assertEqual(response['ETag'], '"3e12f4"')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE)
+
+    def test_conditional_requests(self):
+        etag = self.get('bikes/file.txt')['ETag']
+
+        response = self.get('bikes/file.txt', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual((response['ETag'], response['Cache-Control']), (etag, 'public, max-age=86400'))
+        self.assertEqual(self.get('bikes/file.txt', if_modified_since=http_date(self.mtime)).status_code, 304)
+        self.assertEqual(self.get('bikes/file.txt', if_none_match='"other"').status_code, 200)
+
+    def test_ranges(self):
+        response = self.get('bikes/file.txt', range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), CONTENT[10:20])
+        self.assertEqual((response['Content-Range'], response['Content-Length']), ('bytes 10-19/100', '10'))
+
+        response = self.get('bikes/file.txt', range='bytes=-5')
+        self.assertEqual(self.body(response), CONTENT[-5:])
+
+        response = self.get('bikes/file.txt', range='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+        self.assertEqual(self.get('bikes/file.txt', range='bytes=5-3').status_code, 200)
+        self.assertEqual(self.client.head('/media/bikes/file.txt', headers={'range': 'bytes=0-9'}).status_code, 200)
+
+    def test_if_range(self):
+        etag = self.get('bikes/file.txt')['ETag']
+
+        self.assertEqual(self.get('bikes/file.txt', range='bytes=0-9', if_range=etag).status_code, 206)
+        self.assertEqual(self.get('bikes/file.txt', range='bytes=0-9', if_range=http_date(self.mtime)).status_code, 206)
+        # The file changed since the client's copy: send all of it
+        response = self.get('bikes/file.txt', range='bytes=0-9', if_range='"stale"')
+        self.assertEqual((response.status_code, self.body(response)), (200, CONTENT))
+
+    def test_unservable_paths(self):
+        for path in ('incoming/upload.txt', '../secret.txt', 'bikes/missing.txt', 'bikes', 'bikes/file.txt/x'):
+            with self.subTest(path):
+                self.assertEqual(self.get(path).status_code, 404)
+        self.assertEqual(self.client.post('/media/bikes/file.txt').status_code, 405)
+
+    def test_permission_checks(self):
+        with mock.patch.dict(media_permissions, {'private/': lambda request, path: False}):
+            self.assertEqual(self.get('private/file.txt').status_code, 403)
+            self.assertEqual(self.get('bikes/file.txt').status_code, 200)
+        with mock.patch.dict(media_permissions, {'private/': lambda request, path: True}):
+            self.assertEqual(self.get('private/file.txt')['Cache-Control'], 'private, max-age=86400')
+
+    def test_front_proxy_sends_the_file(self):
+        with override_settings(MEDIA_SERVING='x-accel-redirect'):
+            response = self.get('bikes/file.txt', range='bytes=0-9')
+        self.assertEqual((response.status_code, response.content), (200, b''))
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/bikes/file.txt')
+        self.assertIn('ETag', response)
+
+        with override_settings(MEDIA_SERVING='x-sendfile'):
+            response = self.get('bikes/file.txt')
+        self.assertTrue(response['X-Sendfile'].endswith(os.path.join('bikes', 'file.txt')))
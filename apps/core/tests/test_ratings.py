@@ -0,0 +1,86 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from apps.bikes.models import Bike, BikeReview
+from apps.bikes.ratings import bike_ratings
+
+from ..ratings import breakdown
+from .catalogue import CatalogueTestCase
+
+User = get_user_model()
+
+
+class ReviewCounterTests(CatalogueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bike = Bike.objects.order_by('pk').first()
+        cls.users = [
+            User.objects.create_user(email=f'reviewer{i}@example.com', username=f'reviewer{i}', password='x')
+            for i in range(3)
+        ]
+
+    def review(self, user, rating):
+        return BikeReview.objects.create(bike=self.bike, user=user, rating=rating, review_text='Fine')
+
+    def counters(self):
+        bike = Bike.objects.get(pk=self.bike.pk)
+        return bike.total_reviews, bike.rating_sum, bike.rating, breakdown(bike)
+
+    def test_counters_follow_reviews(self):
+        first = self.review(self.users[0], 5)
+        self.review(self.users[1], 4)
+        self.review(self.users[2], 4)
+        self.assertEqual(self.counters(), (3, 13, Decimal('4.33'), {1: 0, 2: 0, 3: 0, 4: 2, 5: 1}))
+
+        first.rating = 1
+        first.save()
+        self.assertEqual(self.counters(), (3, 9, Decimal('3.00'), {1: 1, 2: 0, 3: 0, 4: 2, 5: 0}))
+
+        # Saves that leave the rating alone change nothing
+        first.helpful_count = 3
+        first.save(update_fields=['helpful_count'])
+        first.delete()
+        self.assertEqual(self.counters(), (2, 8, Decimal('4.00'), {1: 0, 2: 0, 3: 0, 4: 2, 5: 0}))
+
+    def test_moving_a_review_moves_its_counts(self):
+        other = Bike.objects.exclude(pk=self.bike.pk).order_by('pk').first()
+        review = self.review(self.users[0], 3)
+
+        review.bike = other
+        review.save()
+
+        self.assertEqual(self.counters()[:3], (0, 0, Decimal('0.00')))
+        other.refresh_from_db()
+        self.assertEqual((other.total_reviews, other.rating_sum, other.star_3_count), (1, 3, 1))
+
+    def test_removing_uncounted_reviews_stops_at_zero(self):
+        review = self.review(self.users[0], 5)
+        Bike.objects.filter(pk=self.bike.pk).update(total_reviews=0, rating_sum=0, star_5_count=0)
+
+        review.delete()
+
+        self.assertEqual(self.counters(), (0, 0, Decimal('0.00'), {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}))
+
+    def test_recount_repairs_drift(self):
+        self.review(self.users[0], 2)
+        BikeReview.objects.bulk_create([BikeReview(bike=self.bike, user=self.users[1], rating=4, review_text='Bulk')])
+        self.assertEqual(self.counters()[0], 1)
+
+        self.assertEqual(bike_ratings.recount(dry_run=True), 1)
+        self.assertEqual(self.counters()[0], 1)
+        self.assertEqual(bike_ratings.recount(), 1)
+        self.assertEqual(self.counters(), (2, 6, Decimal('3.00'), {1: 0, 2: 1, 3: 0, 4: 1, 5: 0}))
+        self.assertEqual(bike_ratings.recount(), 0)
+
+    def test_reconcile_command(self):
+        Bike.objects.filter(pk=self.bike.pk).update(total_reviews=7, rating_sum=30)
+        out = StringIO()
+
+        call_command('reconcile_ratings', 'bikes.BikeReview', stdout=out)
+
+        self.assertIn('bikes.BikeReview: 1 items drifted', out.getvalue())
+        self.assertEqual(self.counters()[:2], (0, 0))
@@ -0,0 +1,133 @@
+import os
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from apps.bikes.models import Bike, BikeImage
+
+from ..images import VERSION
+from ..management.commands.dedupe_media import GRACE
+from ..models import MediaBlob
+from ..storage import is_blob, media_storage
+from .catalogue import CatalogueTestCase
+
+
+def jpeg(color):
+    buffer = BytesIO()
+    Image.new('RGB', (8, 6), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+SAME, OTHER = jpeg((200, 0, 0)), jpeg((0, 0, 200))
+
+
+class ContentAddressedStorageTests(CatalogueTestCase):
+    catalogue_size = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bike = Bike.objects.get()
+
+    def create(self, data, name='photo.JPG'):
+        return BikeImage.objects.create(bike=self.bike, image=ContentFile(data, name=name))
+
+    def blob(self, name):
+        return MediaBlob.objects.filter(name=name).first()
+
+    def legacy_file(self, name, data):
+        """A file stored under its own name, as before the content-addressed storage"""
+        path = media_storage().path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return name
+
+    def test_identical_files_are_stored_once(self):
+        first, second = self.create(SAME), self.create(SAME, name='copy.jpg')
+        other = self.create(OTHER)
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertTrue(is_blob(first.image.name))
+        self.assertTrue(first.image.name.endswith('.jpg'))
+        blob = self.blob(first.image.name)
+        self.assertEqual((blob.references, blob.size), (2, len(SAME)))
+
+    def test_the_last_reference_deletes_the_file(self):
+        first, second = self.create(SAME), self.create(SAME)
+        name, storage = first.image.name, first.image.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.blob(name).references, 1)
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertIsNone(self.blob(name))
+        self.assertFalse(storage.exists(name))
+
+    def test_replacing_a_file_releases_the_old_blob(self):
+        image = self.create(SAME)
+        old = image.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.alt_text = 'Unchanged file'
+            image.save()
+        self.assertEqual(self.blob(old).references, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = ContentFile(OTHER, name='after.jpg')
+            image.save()
+        self.assertIsNone(self.blob(old))
+        self.assertEqual(self.blob(image.image.name).references, 1)
+
+        # Uploading the same content again keeps the count at one
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = ContentFile(OTHER, name='again.jpg')
+            image.save()
+        self.assertEqual(self.blob(image.image.name).references, 1)
+
+    def test_dedupe_media_moves_legacy_files_into_blobs(self):
+        first = self.legacy_file('bikes/legacy/first.jpg', SAME)
+        second = self.legacy_file('bikes/legacy/second.jpg', SAME)
+        variants = {'source': first, 'version': VERSION, 'sizes': {}}
+        rows = BikeImage.objects.bulk_create([
+            BikeImage(bike=self.bike, image=first, variants=variants),
+            BikeImage(bike=self.bike, image=second),
+            BikeImage(bike=self.bike, image='bikes/legacy/missing.jpg'),
+        ])
+
+        out = StringIO()
+        call_command('dedupe_media', 'bikes.BikeImage.image', '--dry-run', stdout=out)
+        self.assertIn('2 files would become 1 blobs', out.getvalue())
+        self.assertEqual(BikeImage.objects.get(pk=rows[0].pk).image.name, first)
+
+        call_command('dedupe_media', 'bikes.BikeImage.image', stdout=StringIO())
+        moved = BikeImage.objects.filter(pk__in=[rows[0].pk, rows[1].pk])
+        [name] = {image.image.name for image in moved}
+        self.assertTrue(is_blob(name))
+        self.assertEqual(self.blob(name).references, 2)
+        self.assertFalse(media_storage().exists(first))
+        # The derivatives' source moves with the file, so the row is not reprocessed
+        self.assertEqual(BikeImage.objects.get(pk=rows[0].pk).variants['source'], name)
+        self.assertEqual(BikeImage.objects.get(pk=rows[2].pk).image.name, 'bikes/legacy/missing.jpg')
+
+    def test_dedupe_media_recounts_old_blobs(self):
+        image = self.create(SAME)
+        orphan = media_storage().save('orphan.jpg', ContentFile(OTHER))
+        MediaBlob.objects.filter(name=image.image.name).update(references=5)
+        MediaBlob.objects.update(created_at=timezone.now() - GRACE - timedelta(minutes=1))
+
+        out = StringIO()
+        call_command('dedupe_media', stdout=out)
+
+        self.assertIn('1 reference counts fixed, 1 unreferenced blobs deleted', out.getvalue())
+        self.assertEqual(self.blob(image.image.name).references, 1)
+        self.assertIsNone(self.blob(orphan))
+        self.assertFalse(media_storage().exists(orphan))
@@ -0,0 +1,200 @@
+import base64
+import json
+import unittest
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.accounts.serializers import UserSerializer
+from apps.bikes.models import Bike
+from apps.bikes.serializers import BikeImageSerializer
+
+from ..media import IMMUTABLE_CACHE
+from ..models import MediaBlob
+from ..storage import StoredUpload, is_blob, media_storage
+from ..uploads import UploadError, check_image
+from .catalogue import CatalogueTestCase
+
+try:
+    import boto3
+    import requests
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+User = get_user_model()
+
+
+def image(image_format='JPEG', color=(200, 0, 0)):
+    buffer = BytesIO()
+    Image.new('RGB', (8, 6), color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class CheckImageTests(CatalogueTestCase):
+    catalogue_size = 0
+
+    def test_check_image(self):
+        check_image(BytesIO(image()), 'image/jpeg')
+        check_image(BytesIO(image('PNG')), 'image/png')
+
+        with self.assertRaisesMessage(UploadError, 'Upload a valid image.'):
+            check_image(BytesIO(b'<script>alert(1)</script>'), 'image/png')
+        with self.assertRaisesMessage(UploadError, 'The file is not image/png.'):
+            check_image(BytesIO(image()), 'image/png')
+        with self.assertRaisesMessage(UploadError, 'The file is not image/svg+xml.'):
+            check_image(BytesIO(image()), 'image/svg+xml')
+
+
+class DirectUploadTests(CatalogueTestCase):
+    catalogue_size = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.get(email='catalogue-traveller@example.com')
+        cls.bike = Bike.objects.get()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def start(self, field='bikes.BikeImage.image', content_type='image/jpeg'):
+        return self.client.post('/api/core/uploads/', {'field': field, 'content_type': content_type}, format='json')
+
+    def send(self, upload, data, **fields):
+        return APIClient().post(upload['url'], {
+            **upload['fields'], **fields,
+            'file': SimpleUploadedFile('photo.jpg', data, upload['fields']['Content-Type']),
+        }, format='multipart')
+
+    def upload(self, data=None, **start):
+        upload = self.start(**start).json()
+        self.assertEqual(self.send(upload, data or image()).status_code, 204)
+        return upload
+
+    def test_start_upload(self):
+        response = self.start()
+        self.assertEqual(response.status_code, 201)
+        upload = response.json()
+        self.assertEqual(upload['url'], 'http://testserver/api/core/uploads/local/')
+        self.assertTrue(upload['fields']['key'].startswith('incoming/'))
+        self.assertTrue(upload['fields']['key'].endswith('.jpg'))
+        self.assertEqual(upload['expires_in'], 3600)
+
+        for field, content_type in [
+            ('bikes.Bike.title', 'image/jpeg'), ('nothing.Here.image', 'image/jpeg'),
+            ('bikes.BikeImage.image', 'image/svg+xml'), ('', 'image/jpeg'),
+        ]:
+            with self.subTest(field=field, content_type=content_type):
+                self.assertEqual(self.start(field, content_type).status_code, 400)
+        self.assertEqual(APIClient().post('/api/core/uploads/', {}, format='json').status_code, 401)
+
+    def test_local_upload_checks_the_policy_and_the_file(self):
+        upload = self.start(content_type='image/png').json()
+
+        self.assertEqual(self.send(upload, image('PNG'), key='blobs/evil.png').status_code, 403)
+        self.assertEqual(self.send(upload, image('PNG'), policy='forged').status_code, 403)
+        self.assertEqual(self.send(upload, b'<html><script>').status_code, 400)
+        self.assertEqual(self.send(upload, image()).status_code, 400)
+        self.assertFalse(media_storage().exists(upload['fields']['key']))
+        self.assertEqual(APIClient().post(upload['url'], upload['fields'], format='multipart').status_code, 400)
+
+        with override_settings(MEDIA_UPLOAD_MAX_SIZE=10):
+            small = self.start(content_type='image/png').json()
+        self.assertEqual(self.send(small, image('PNG')).status_code, 400)
+
+        self.assertEqual(self.send(upload, image('PNG')).status_code, 204)
+        self.assertTrue(media_storage().exists(upload['fields']['key']))
+        # Uploads are not served until a row claims them
+        self.assertEqual(self.client.get(f"/media/{upload['fields']['key']}").status_code, 404)
+
+    def test_serializers_claim_uploads(self):
+        upload = self.upload()
+
+        serializer = BikeImageSerializer(data={'image': upload['upload'], 'alt_text': 'Uploaded'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        row = serializer.save(bike=self.bike)
+
+        self.assertTrue(is_blob(row.image.name))
+        self.assertEqual(MediaBlob.objects.get(name=row.image.name).references, 1)
+        self.assertFalse(media_storage().exists(upload['fields']['key']))
+
+        replay = BikeImageSerializer(data={'image': upload['upload']})
+        self.assertFalse(replay.is_valid())
+        self.assertEqual(replay.errors['image'], ['The upload has not been received.'])
+
+        # The same content again is counted on the existing blob
+        again = BikeImageSerializer(data={'image': self.upload()['upload']})
+        self.assertTrue(again.is_valid(), again.errors)
+        self.assertEqual(again.save(bike=self.bike).image.name, row.image.name)
+        self.assertEqual(MediaBlob.objects.get(name=row.image.name).references, 2)
+
+    def test_tokens_are_bound_to_their_field(self):
+        upload = self.upload()
+
+        serializer = UserSerializer(self.user, data={'profile_picture': upload['upload']}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['profile_picture'], ['The upload was made for another field.'])
+
+        serializer = BikeImageSerializer(data={'image': 'forged'})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['image'], ['Invalid or expired upload.'])
+
+        # Posting the file itself still works
+        serializer = BikeImageSerializer(data={'image': SimpleUploadedFile('photo.jpg', image(), 'image/jpeg')})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+@unittest.skipUnless(mock_aws, 'moto is not installed')
+class S3UploadTests(CatalogueTestCase):
+    catalogue_size = 0
+    bucket = 'media-test'
+
+    def setUp(self):
+        self.enterContext(mock_aws())
+        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.s3.create_bucket(Bucket=self.bucket)
+
+        from ..s3 import ContentAddressedS3Storage
+
+        self.storage = ContentAddressedS3Storage(
+            bucket_name=self.bucket, access_key='test', secret_key='test', region_name='us-east-1',
+        )
+
+    def post(self, upload, data):
+        return requests.post(upload['url'], data=upload['fields'], files={'file': ('photo.jpg', data, 'image/jpeg')})
+
+    def test_presigned_uploads_become_blobs(self):
+        upload = self.storage.presigned_upload('incoming/photo.jpg', 'image/jpeg', 1000, 60)
+        self.assertEqual(self.post(upload, image()).status_code, 204)
+
+        name = self.storage.save(None, StoredUpload(self.storage, 'incoming/photo.jpg'))
+
+        self.assertTrue(is_blob(name))
+        self.assertEqual(self.s3.head_object(Bucket=self.bucket, Key=name)['CacheControl'], IMMUTABLE_CACHE)
+        keys = [item['Key'] for item in self.s3.list_objects_v2(Bucket=self.bucket)['Contents']]
+        self.assertEqual(keys, [name])
+
+    def test_policy_limits_type_and_size(self):
+        upload = self.storage.presigned_upload('incoming/photo.jpg', 'image/jpeg', 10, 60)
+
+        policy = json.loads(base64.b64decode(upload['fields']['policy']))
+        self.assertIn(['content-length-range', 1, 10], policy['conditions'])
+        self.assertIn({'Content-Type': 'image/jpeg'}, policy['conditions'])
+        self.assertEqual(upload['fields']['key'], 'incoming/photo.jpg')
+
+    def test_uploads_of_stored_content_are_dropped(self):
+        names = []
+        for key in ('incoming/first.jpg', 'incoming/second.jpg'):
+            self.assertEqual(self.post(self.storage.presigned_upload(key, 'image/jpeg', 1000, 60), image()).status_code, 204)
+            names.append(self.storage.save(None, StoredUpload(self.storage, key)))
+
+        self.assertEqual(names[0], names[1])
+        self.assertEqual(MediaBlob.objects.get(name=names[0]).references, 2)
+        keys = [item['Key'] for item in self.s3.list_objects_v2(Bucket=self.bucket)['Contents']]
+        self.assertEqual(keys, [names[0]])
@@ -0,0 +1,94 @@
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ImageField
+from PIL import Image
+
+from .storage import UPLOAD_DIR, DirectUploads, StoredUpload
+
+TOKEN_SALT = 'core.uploads.token'
+# How long an upload can wait to be claimed by a row; unclaimed ones are
+# left in UPLOAD_DIR for the bucket's lifecycle rule (or a cron) to expire
+CLAIM_MAX_AGE = 24 * 60 * 60
+# Content type -> (extension, Pillow format). Raster images only: the type
+# and extension are what the file is served with, and SVG carries scripts
+IMAGE_TYPES = {
+    'image/jpeg': ('.jpg', 'JPEG'),
+    'image/png': ('.png', 'PNG'),
+    'image/gif': ('.gif', 'GIF'),
+    'image/webp': ('.webp', 'WEBP'),
+}
+
+
+class UploadError(Exception):
+    pass
+
+
+def field_label(field):
+    return f'{field.model._meta.label}.{field.name}'
+
+
+def upload_field(label):
+    """The file field labelled 'app_label.Model.field', if its storage takes direct uploads"""
+    try:
+        model_label, name = label.rsplit('.', 1)
+        field = apps.get_model(model_label)._meta.get_field(name)
+    except (ValueError, LookupError, FieldDoesNotExist):
+        raise UploadError(f'Unknown file field {label}.')
+    if not isinstance(field, ImageField) or not isinstance(field.storage, DirectUploads):
+        raise UploadError(f'{label} does not take direct uploads.')
+    return field
+
+
+def check_image(file, content_type):
+    """Raise UploadError unless `file` decodes as an image of `content_type`"""
+    try:
+        with Image.open(file) as image:
+            image_format = image.format
+            image.verify()
+    except Exception:
+        raise UploadError('Upload a valid image.')
+    finally:
+        file.seek(0)
+    if IMAGE_TYPES.get(content_type, (None, None))[1] != image_format:
+        raise UploadError(f'The file is not {content_type}.')
+
+
+def start_upload(label, content_type):
+    """
+    Where and how the client sends one image for `label`'s field: the
+    storage's presigned POST ('url', 'fields') plus an 'upload' token that
+    the field's serializer accepts in place of the file once it is sent.
+    The stored name's extension follows `content_type`, never the client's
+    file name.
+    """
+    field = upload_field(label)
+    if content_type not in IMAGE_TYPES:
+        raise UploadError(f"Only {', '.join(IMAGE_TYPES)} images can be uploaded.")
+
+    name = f'{UPLOAD_DIR}/{uuid.uuid4().hex}{IMAGE_TYPES[content_type][0]}'
+    expires = settings.MEDIA_UPLOAD_EXPIRES
+    upload = field.storage.presigned_upload(name, content_type, settings.MEDIA_UPLOAD_MAX_SIZE, expires)
+    return {
+        **upload,
+        'upload': signing.dumps({'field': label, 'name': name}, salt=TOKEN_SALT),
+        'expires_in': expires,
+    }
+
+
+def claim_upload(token, field):
+    """The file uploaded under `token` for `field`, as a StoredUpload its storage moves into place on save"""
+    try:
+        upload = signing.loads(token, salt=TOKEN_SALT, max_age=CLAIM_MAX_AGE)
+    except signing.BadSignature:
+        raise UploadError('Invalid or expired upload.')
+    if upload['field'] != field_label(field):
+        raise UploadError('The upload was made for another field.')
+    try:
+        return StoredUpload(field.storage, upload['name'])
+    except FileNotFoundError:
+        # Never sent, or already claimed
+        raise UploadError('The upload has not been received.')
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('cities/autocomplete/', views.CityAutocompleteView.as_view(), name='city_autocomplete'),
+    path('db-metrics/', views.DatabaseMetricsView.as_view(), name='db_metrics'),
+    path('uploads/', views.DirectUploadView.as_view(), name='direct_upload'),
+    path('uploads/local/', views.LocalUploadView.as_view(), name='local_upload'),
+]
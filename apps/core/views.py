@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import storages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import generics
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .autocomplete import CITY_TABLES, MAX_SUGGESTIONS, city_autocomplete
+from .db_metrics import metrics
+from .serializers import CitySuggestionSerializer
+from .storage import UPLOAD_SALT
+from .uploads import UploadError, check_image, start_upload
+
+
+class EagerLoadingViewMixin:
+    """
+    View mixin that applies the serializer's `setup_eager_loading` after
+    filtering. Hooks into filter_queryset so views that build their own
+    get_queryset still get it, for both list and detail lookups.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        setup_eager_loading = getattr(self.get_serializer_class(), 'setup_eager_loading', None)
+        if setup_eager_loading is not None:
+            queryset = setup_eager_loading(queryset)
+        return queryset
+
+
+class FilterOptionsView(generics.GenericAPIView):
+    """
+    Serves a cached `FilterOptions` entry (see apps.core.filter_options)
+    with an ETag, so clients revalidate with If-None-Match and get a 304.
+    """
+    filter_options = None
+
+    def get(self, request):
+        options, etag = self.filter_options.get()
+        response = Response(options)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return get_conditional_response(request, etag=etag, response=response)
+
+
+class DatabaseMetricsView(APIView):
+    """Connection reuse counters of the worker process that serves the request"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+class CityAutocompleteView(APIView):
+    """
+    City names starting with ?q= (at any word) across every app's city
+    table, most listings first. ?kind=bike etc. limits them to one table.
+    Served from an in-process index, without a query per keystroke.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        kind = request.query_params.get('kind') or None
+        if kind is not None and kind not in CITY_TABLES:
+            raise ValidationError({'kind': f"Choose from {', '.join(CITY_TABLES)}."})
+        try:
+            limit = min(int(request.query_params.get('limit', MAX_SUGGESTIONS)), MAX_SUGGESTIONS)
+        except ValueError:
+            raise ValidationError({'limit': 'A number is required.'})
+
+        cities = city_autocomplete.suggest(request.query_params.get('q', ''), kind=kind, limit=limit)
+        return Response(CitySuggestionSerializer(cities, many=True, context={'kind': kind}).data)
+
+
+class DirectUploadView(APIView):
+    """
+    Starts an upload that goes straight to media storage. POST {field:
+    'bikes.BikeImage.image', content_type} returns the form POST
+    ('url', 'fields'; the file goes last, as 'file') and an 'upload' token
+    to send as the field's value once the file is stored.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        missing = {
+            key: 'This field is required.'
+            for key in ('field', 'content_type') if not request.data.get(key)
+        }
+        if missing:
+            raise ValidationError(missing)
+        try:
+            upload = start_upload(request.data['field'], request.data['content_type'])
+        except UploadError as error:
+            raise ValidationError({'detail': str(error)})
+        upload['url'] = request.build_absolute_uri(upload['url'])
+        return Response(upload, status=201)
+
+
+class LocalUploadView(APIView):
+    """
+    Receives the presigned POSTs of LocalStorage, the filesystem stand-in
+    for object storage, checking the signed policy as the storage would,
+    and that the file really is an image of the declared type.
+    """
+    # The policy is the credential, as with the storage's own signature
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        try:
+            policy = signing.loads(
+                request.data.get('policy', ''), salt=UPLOAD_SALT, max_age=settings.MEDIA_UPLOAD_EXPIRES
+            )
+        except signing.BadSignature:
+            raise PermissionDenied('Invalid or expired upload policy.')
+        if request.data.get('key') != policy['name'] or request.data.get('Content-Type') != policy['content_type']:
+            raise PermissionDenied('The upload does not match its policy.')
+        file = request.data.get('file')
+        if file is None:
+            raise ValidationError({'file': 'This field is required.'})
+        if not 0 < file.size <= policy['max_size']:
+            raise ValidationError({'file': f"Files must be between 1 and {policy['max_size']} bytes."})
+        try:
+            check_image(file, policy['content_type'])
+        except UploadError as error:
+            raise ValidationError({'file': str(error)})
+
+        # Stored as is; the row that claims it moves it into place
+        storages[policy['storage']]._save(policy['name'], file)
+        return Response(status=204)
@@ -0,0 +1,10 @@
+from apps.core.filter_options import cached_filter_options
+
+from .models import FullTourCity
+
+
+@cached_filter_options('fulltours', [FullTourCity])
+def fulltour_filter_options():
+    return {
+        'cities': list(FullTourCity.objects.values_list('name', flat=True).distinct()),
+    }
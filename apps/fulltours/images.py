@@ -0,0 +1,6 @@
+from apps.core.images import register_image_model
+
+from .models import FulltourImage, ItineraryImage
+
+fulltour_images = register_image_model(FulltourImage)
+itinerary_images = register_image_model(ItineraryImage)
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+from apps.core.ratings import recount
+
+
+def fill_rating_counters(apps, schema_editor):
+    recount(apps.get_model('fulltours', 'FulltourReview'), 'fulltour')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulltours', '0003_pickuplocation_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fulltour',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fulltour',
+            name='star_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fulltour',
+            name='star_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fulltour',
+            name='star_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fulltour',
+            name='star_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fulltour',
+            name='star_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import apps.core.storage
+import apps.fulltours.models
+import apps.fulltours.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulltours', '0006_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fulltourimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.fulltours.utils.fulltour_image_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='itineraryimage',
+            name='image',
+            field=models.ImageField(storage=apps.core.storage.media_storage, upload_to=apps.fulltours.models.itinerary_image_upload_path),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from apps.core.geo import GeoQuerySet, geohash_for
+from apps.core.ratings import COUNTER_FIELDS, breakdown
+from apps.core.storage import media_storage
 from .utils import fulltour_image_upload_path
 from ckeditor_uploader.fields import RichTextUploadingField
 from ckeditor.fields import RichTextField
@@ -44,7 +47,11 @@ class ItineraryImage(models.Model):
         related_name='images',
         on_delete=models.CASCADE
     )
-    image = models.ImageField(upload_to=itinerary_image_upload_path)
+    image = models.ImageField(upload_to=itinerary_image_upload_path, storage=media_storage)
+    variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Thumbnails and resized copies, see apps.core.images')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False, help_text='Tiny blurred preview as a data: URI')
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -75,14 +82,31 @@ class PickupLocation(models.Model):
     city = models.ForeignKey(FullTourCity, on_delete=models.CASCADE)
     latitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
     longitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)  # Spatial index for nearby search
+
+    objects = GeoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['latitude', 'longitude'])]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.geohash = geohash_for(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ('latitude' in update_fields or 'longitude' in update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
 
 class FulltourImage(models.Model):
     fulltour = models.ForeignKey('Fulltour', related_name='fulltour_images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to=fulltour_image_upload_path, blank=True, null=True)
+    image = models.ImageField(upload_to=fulltour_image_upload_path, storage=media_storage, blank=True, null=True)
+    variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Thumbnails and resized copies, see apps.core.images')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False, help_text='Tiny blurred preview as a data: URI')
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -157,6 +181,13 @@ class Fulltour(models.Model):
     # Reviews & Ratings
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     total_reviews = models.IntegerField(default=0)
+    # Running totals kept by apps.core.ratings as reviews change
+    rating_sum = models.PositiveIntegerField(default=0)
+    star_1_count = models.PositiveIntegerField(default=0)
+    star_2_count = models.PositiveIntegerField(default=0)
+    star_3_count = models.PositiveIntegerField(default=0)
+    star_4_count = models.PositiveIntegerField(default=0)
+    star_5_count = models.PositiveIntegerField(default=0)
     total_trips = models.IntegerField(default=0)
 
     # Timestamps
@@ -166,10 +197,9 @@ class Fulltour(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for the fulltour"""
-        primary_img = self.fulltour_images.filter(is_primary=True).first()
-        if primary_img and primary_img.image:
-            return primary_img.image.url
-        first_img = self.fulltour_images.first()
+        # Images are ordered primary-first, so the first row is the primary
+        # image (or the newest one). Iterating .all() reuses prefetched rows.
+        first_img = next(iter(self.fulltour_images.all()), None)
         if first_img and first_img.image:
             return first_img.image.url
         return None
@@ -180,15 +210,10 @@ class Fulltour(models.Model):
         return [img.image.url for img in self.fulltour_images.all() if img.image]
 
     def update_rating(self):
-        """Update the average rating and total reviews count"""
-        reviews = self.reviews.all()
-        if reviews.exists():
-            self.rating = reviews.aggregate(models.Avg('rating'))['rating__avg'] or 0.0
-            self.total_reviews = reviews.count()
-        else:
-            self.rating = 0.0
-            self.total_reviews = 0
-        self.save()
+        """Recount the rating counters from the reviews (they are normally kept incrementally)"""
+        from .ratings import fulltour_ratings
+        fulltour_ratings.recount(ids=[self.pk])
+        self.refresh_from_db(fields=COUNTER_FIELDS)
 
     @property
     def average_rating(self):
@@ -197,11 +222,8 @@ class Fulltour(models.Model):
 
     @property
     def rating_breakdown(self):
-        """Get rating breakdown (count for each star level)"""
-        breakdown = {i: 0 for i in range(1, 6)}
-        for review in self.reviews.all():
-            breakdown[review.rating] += 1
-        return breakdown
+        """Get rating breakdown (count for each star level) from the stored counters"""
+        return breakdown(self)
 
     class Meta:
         ordering = ['-created_at']
@@ -0,0 +1,5 @@
+from apps.core.ratings import register_review_table
+
+from .models import FulltourReview
+
+fulltour_ratings = register_review_table(FulltourReview, 'fulltour')
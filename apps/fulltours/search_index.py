@@ -0,0 +1,10 @@
+from apps.search.indexes import register_search_index
+
+from .models import Fulltour
+
+fulltour_index = register_search_index(
+    Fulltour, 'fulltour',
+    keywords=['model', 'city__name'],
+    body=['description'],
+    city='city__name',
+)
@@ -2,8 +2,6 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views 
 from .views import ItineraryViewSet, ItineraryImageViewSet, FullTourCityListCreateView, FullTourCityViewSet
-from django.conf.urls.static import static
-from django.conf import settings
 
 # Create a router and register filter viewsets
 filter_router = DefaultRouter()
@@ -35,4 +33,4 @@ urlpatterns = [
     # path('model-years/', views.FulltourModelYearViewSet.as_view({'get': 'list'}), name='fulltour_model_years'),
     path('pickup-locations/', views.PickupLocationViewSet.as_view({'get': 'list'}), name='pickup_locations'),
     path('ckeditor/', include('ckeditor_uploader.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file
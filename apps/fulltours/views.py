@@ -1,6 +1,6 @@
-from rest_framework import generics, viewsets, filters, status
+from rest_framework import generics, viewsets, filters
 from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
@@ -8,9 +8,16 @@ from .models import Fulltour, FullTourCity, PickupLocation, Itinerary, Itinerary
  # FulltourFuelType, FulltourTransmission, FulltourModelYear,  
 from .serializers import ItinerarySerializer, ItineraryImageSerializer, FulltourSerializer, FulltourCreateSerializer, FullTourCitySerializer, PickupLocationSerializer
 # FulltourFuelTypeSerializer, FulltourTransmissionSerializer, FulltourModelYearSerializer, 
-from .location_utils import haversine_distance
-
-class ItineraryViewSet(viewsets.ModelViewSet):
+from apps.core.geo import annotate_nearest_pickup
+from apps.core.pagination import DistanceCursorPagination
+from apps.bookings.views import BookItemView
+from apps.core.filters import AvailabilityFilter
+from apps.core.autocomplete import city_autocomplete
+from apps.core.views import EagerLoadingViewMixin, FilterOptionsView
+from apps.search.filters import IndexSearchFilter
+from .filter_options import fulltour_filter_options
+
+class ItineraryViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     serializer_class = ItinerarySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -46,11 +53,11 @@ class ItineraryImageViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at']
     ordering = ['-created_at']
 
-class FulltourViewSet(viewsets.ModelViewSet):
+class FulltourViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     queryset = Fulltour.objects.all()
     serializer_class = FulltourSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexSearchFilter, filters.OrderingFilter]
     filterset_fields = [ 'city', 'available']
     search_fields = ['title', 'model', 'description', 'city__name']
     ordering_fields = ['price_per_person', 'price_per_day', 'rating', 'created_at']		
@@ -63,10 +70,10 @@ class FulltourViewSet(viewsets.ModelViewSet):
     # def get_queryset(self):
         # return Fulltour.objects.filter(available=True)
 
-class AvailableFulltoursView(generics.ListAPIView):
+class AvailableFulltoursView(EagerLoadingViewMixin, generics.ListAPIView):
     serializer_class = FulltourSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, IndexSearchFilter, AvailabilityFilter]
     filterset_fields = ['city']
     search_fields = ['title', 'model', 'description']
     
@@ -84,20 +91,16 @@ class AvailableFulltoursView(generics.ListAPIView):
             
         return queryset.order_by('-rating')
 
-class BookFulltourView(generics.CreateAPIView):
-    permission_classes = [IsAuthenticated]
-    
-    def post(self, request):
-        # This would integrate with the bookings app
-        # For now, just return success response
-        return Response({"message": "Booking request submitted"}, status=status.HTTP_201_CREATED)
+class BookFulltourView(BookItemView):
+    item_model = Fulltour
+    service_type = 'fulltour'
 
-class FulltourDetailView(generics.RetrieveAPIView):
+class FulltourDetailView(EagerLoadingViewMixin, generics.RetrieveAPIView):
     queryset = Fulltour.objects.all()
     serializer_class = FulltourSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-class FulltourFilterView(generics.ListAPIView):
+class FulltourFilterView(EagerLoadingViewMixin, generics.ListAPIView):
     serializer_class = FulltourSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
@@ -118,38 +121,19 @@ class FulltourFilterView(generics.ListAPIView):
             
         return queryset.order_by('-rating')
 
-class FulltourFilterOptionsView(generics.GenericAPIView):
+class FulltourFilterOptionsView(FilterOptionsView):
     """View to provide filter options for the frontend"""
     permission_classes = [IsAuthenticatedOrReadOnly]
-    
-    def get(self, request):
-        # Import related models
-        from .models import FulltourTransmission, FulltourFuelType, FulltourRentalType
-        
-        # Get all unique filter options from the database
-        # brands = list(FulltourBrand.objects.values_list('name', flat=True).distinct())
-        cities = list(FullTourCity.objects.values_list('name', flat=True).distinct())
-        #model_years = list(FulltourModelYear.objects.values_list('year', flat=True).order_by('-year'))
-        # transmissions = list(FulltourTransmission.objects.values_list('type', flat=True).distinct())
-        # fuel_types = list(FulltourFuelType.objects.values_list('type', flat=True).distinct())
-        # rental_types = list(FulltourRentalType.objects.values_list('type', flat=True).distinct())
-        
-        return Response({
-            # 'brands': brands,
-            'cities': cities,
-            # 'model_years': model_years,
-            # 'transmissions': transmissions,
-            # 'fuel_types': fuel_types,
-            # 'rental_types': rental_types,
-        })
+    filter_options = fulltour_filter_options
 
-class NearbyFulltoursView(generics.ListAPIView):
+class NearbyFulltoursView(EagerLoadingViewMixin, generics.ListAPIView):
     """View to get fulltours near a specific location, sorted by distance"""
     serializer_class = FulltourSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = DistanceCursorPagination
     
     def list(self, request, *args, **kwargs):
-        queryset = Fulltour.objects.filter(available=True)
+        queryset = self.filter_queryset(Fulltour.objects.filter(available=True))
         
         # Get user coordinates from query parameters
         user_lat = self.request.query_params.get('lat')
@@ -170,58 +154,34 @@ class NearbyFulltoursView(generics.ListAPIView):
             serializer = self.get_serializer(queryset, many=True)
             return Response(serializer.data)
         
-        # Calculate distances for all fulltours and filter by radius
-        fulltours_with_distance = []
-        
-        for fulltour in queryset:
-            closest_distance = float('inf')
-            closest_pickup_location = None
-            
-            # Find the closest pickup location for each fulltour
-            for pickup_location in fulltour.pickup_locations.all():
-                if pickup_location.latitude and pickup_location.longitude:
-                    distance = haversine_distance(
-                        user_lat, user_lng,
-                        float(pickup_location.latitude),
-                        float(pickup_location.longitude)
-                    )
-                    if distance < closest_distance:
-                        closest_distance = distance
-                        closest_pickup_location = pickup_location
-            
-            # Add fulltour to results if within radius
-            if closest_distance <= radius and closest_pickup_location:
-                fulltours_with_distance.append({
-                    'fulltour': fulltour,
-                    'distance': round(closest_distance, 2),
-                    'closest_pickup': closest_pickup_location
-                })
-        
-        # Sort by distance (ascending - nearest first)
-        fulltours_with_distance.sort(key=lambda x: x['distance'])
+        # Distance to the closest pickup location is computed, filtered and
+        # ordered in SQL; only the requested page is materialized
+        queryset = annotate_nearest_pickup(queryset, user_lat, user_lng, radius)
+        page = self.paginate_queryset(queryset)
+        closest_pickups = PickupLocation.objects.in_bulk([fulltour.closest_pickup_id for fulltour in page])
         
         # Serialize fulltours and add distance information
         result_data = []
-        for item in fulltours_with_distance:
-            fulltour_data = self.get_serializer(item['fulltour']).data
-            fulltour_data['distance_km'] = item['distance']
+        for fulltour, fulltour_data in zip(page, self.get_serializer(page, many=True).data):
+            closest_pickup = closest_pickups[fulltour.closest_pickup_id]
+            fulltour_data['distance_km'] = round(fulltour.distance, 2)
             fulltour_data['closest_pickup_location'] = {
-                'id': item['closest_pickup'].id,
-                'name': item['closest_pickup'].name,
-                'address': item['closest_pickup'].address,
-                'latitude': str(item['closest_pickup'].latitude),
-                'longitude': str(item['closest_pickup'].longitude),
+                'id': closest_pickup.id,
+                'name': closest_pickup.name,
+                'address': closest_pickup.address,
+                'latitude': str(closest_pickup.latitude),
+                'longitude': str(closest_pickup.longitude),
             }
             result_data.append(fulltour_data)
         
-        return Response(result_data)
+        return self.get_paginated_response(result_data)
 
 # class FulltourModelYearViewSet(viewsets.ReadOnlyModelViewSet):
     # queryset = FulltourModelYear.objects.all()
     # serializer_class = FulltourModelYearSerializer
     # permission_classes = [IsAuthenticatedOrReadOnly]
 
-class PickupLocationViewSet(viewsets.ReadOnlyModelViewSet):
+class PickupLocationViewSet(EagerLoadingViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PickupLocation.objects.all()
     serializer_class = PickupLocationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -240,7 +200,8 @@ class FullTourCityViewSet(viewsets.ReadOnlyModelViewSet):
         if not query:
             return Response([], status=200)
         
-        cities = self.queryset.filter(name__icontains=query)[:10]
+        # Served from the in-process city index rather than an icontains query per keystroke
+        cities = [city.rows['fulltour'] for city in city_autocomplete.suggest(query, kind='fulltour')]
         serializer = self.get_serializer(cities, many=True)
         return Response(serializer.data)
 	
@@ -0,0 +1,5 @@
+from apps.core.images import register_image_model
+
+from .models import TripImage
+
+trip_images = register_image_model(TripImage)
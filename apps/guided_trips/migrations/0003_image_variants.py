@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guided_trips', '0002_jointype_supportfeature_tripcity_tripdifficultylevel_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tripimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Thumbnails and resized copies, see apps.core.images'),
+        ),
+    ]
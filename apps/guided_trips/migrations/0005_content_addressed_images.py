@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import apps.core.storage
+import apps.guided_trips.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guided_trips', '0004_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tripimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.guided_trips.utils.trip_image_upload_path),
+        ),
+    ]
@@ -0,0 +1,5 @@
+from apps.core.availability import register_daily_table
+
+from .models import HolidaypackageAvailability
+
+holidaypackage_calendar = register_daily_table(HolidaypackageAvailability, 'holidaypackage')
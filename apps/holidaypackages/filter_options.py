@@ -0,0 +1,10 @@
+from apps.core.filter_options import cached_filter_options
+
+from .models import HolidayPackageCity
+
+
+@cached_filter_options('holidaypackages', [HolidayPackageCity])
+def holidaypackage_filter_options():
+    return {
+        'cities': list(HolidayPackageCity.objects.values_list('name', flat=True).distinct()),
+    }
@@ -0,0 +1,6 @@
+from apps.core.images import register_image_model
+
+from .models import HolidaypackageImage, ItineraryImage
+
+holidaypackage_images = register_image_model(HolidaypackageImage)
+itinerary_images = register_image_model(ItineraryImage)
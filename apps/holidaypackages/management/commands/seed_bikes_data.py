@@ -18,7 +18,10 @@ from apps.guided_trips.models import (
 from apps.pilgrim.models import (
     PilgrimRegion, PilgrimPackageType, PilgrimFeature, PilgrimDifficultyLevel
 )
-from apps.stories.models import StoryPlaceType, StoryJourneyType, StoryCity
+from apps.stories.models import (
+    UserstoriesPlaceType as StoryPlaceType, UserstoriesJourneyType as StoryJourneyType,
+    UserstoriesCity as StoryCity
+)
 from apps.insights.models import InsightCategory
 
 User = get_user_model()
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:59
+
+from django.db import migrations, models
+
+from apps.core.geo import geohash_for
+
+
+def populate_geohash(apps, schema_editor):
+    PickupLocation = apps.get_model('holidaypackages', 'PickupLocation')
+    locations = list(PickupLocation.objects.exclude(latitude=None).exclude(longitude=None))
+    for location in locations:
+        location.geohash = geohash_for(location.latitude, location.longitude)
+    PickupLocation.objects.bulk_update(locations, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holidaypackages', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pickuplocation',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='pickuplocation',
+            index=models.Index(fields=['latitude', 'longitude'], name='holidaypack_latitud_3653f4_idx'),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import apps.core.storage
+import apps.holidaypackages.models
+import apps.holidaypackages.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holidaypackages', '0005_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='holidaypackageimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.holidaypackages.utils.holidaypackage_image_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='itineraryimage',
+            name='image',
+            field=models.ImageField(storage=apps.core.storage.media_storage, upload_to=apps.holidaypackages.models.itinerary_image_upload_path),
+        ),
+    ]
@@ -0,0 +1,5 @@
+from apps.core.ratings import register_review_table
+
+from .models import HolidaypackageReview
+
+holidaypackage_ratings = register_review_table(HolidaypackageReview, 'holidaypackage')
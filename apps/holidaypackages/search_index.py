@@ -0,0 +1,10 @@
+from apps.search.indexes import register_search_index
+
+from .models import Holidaypackage
+
+holidaypackage_index = register_search_index(
+    Holidaypackage, 'holidaypackage',
+    keywords=['model', 'city__name'],
+    body=['description'],
+    city='city__name',
+)
@@ -1,19 +1,24 @@
 from rest_framework import serializers
+from apps.core.serializers import DirectUploadMixin, EagerLoadingMixin, ImageVariantsField, PrimaryImageVariantsField
 from .models import Itinerary, ItineraryImage, HolidayPackageCity, PickupLocation, Holidaypackage, HolidaypackageImage
 # HolidaypackageTransmission, HolidaypackageFuelType, HolidaypackageRentalType,
 
  # HolidaypackageModelYear
 
 
-class ItineraryImageSerializer(serializers.ModelSerializer):
+class ItineraryImageSerializer(DirectUploadMixin, serializers.ModelSerializer):
+    variants = ImageVariantsField()
+
     class Meta:
         model = ItineraryImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'created_at']
+        fields = ['id', 'image', 'width', 'height', 'placeholder', 'variants', 'alt_text', 'is_primary', 'created_at']
 
 
-class ItinerarySerializer(serializers.ModelSerializer):
+class ItinerarySerializer(EagerLoadingMixin, serializers.ModelSerializer):
     images = ItineraryImageSerializer(many=True, read_only=True)  # nested images
 
+    prefetch_related_fields = ('images',)
+
     class Meta:  # ✅ fixed indentation here
         model = Itinerary
         fields = [
@@ -23,10 +28,12 @@ class ItinerarySerializer(serializers.ModelSerializer):
         ]
 
 
-class HolidaypackageImageSerializer(serializers.ModelSerializer):
+class HolidaypackageImageSerializer(DirectUploadMixin, serializers.ModelSerializer):
+    variants = ImageVariantsField()
+
     class Meta:
         model = HolidaypackageImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'created_at']
+        fields = ['id', 'image', 'width', 'height', 'placeholder', 'variants', 'alt_text', 'is_primary', 'created_at']
 
 # class HolidaypackageBrandSerializer(serializers.ModelSerializer):
     # class Meta:
@@ -53,14 +60,16 @@ class HolidayPackageCitySerializer(serializers.ModelSerializer):
         # model = HolidaypackageTransmission
         # fields = '__all__'
 
-class PickupLocationSerializer(serializers.ModelSerializer):
+class PickupLocationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     city_name = serializers.CharField(source='city.name', read_only=True)
     
+    select_related_fields = ('city',)
+    
     class Meta:
         model = PickupLocation
         fields = ['id', 'name', 'address', 'city', 'city_name', 'latitude', 'longitude']
 
-class HolidaypackageSerializer(serializers.ModelSerializer):
+class HolidaypackageSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     # brand_name = serializers.CharField(source='brand.name', read_only=True)
     city_name = serializers.CharField(source='city.name', read_only=True)
     service_provider_name = serializers.CharField(source='service_provider.username', read_only=True)
@@ -71,8 +80,13 @@ class HolidaypackageSerializer(serializers.ModelSerializer):
     holidaypackage_images = HolidaypackageImageSerializer(many=True, read_only=True)
     primary_image = serializers.CharField(read_only=True)
     all_images = serializers.ListField(read_only=True)
+    primary_image_variants = PrimaryImageVariantsField('holidaypackage_images')
+    rating_breakdown = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     #model_year_display = serializers.CharField(source='model_year.year', read_only=True)  # Display the year
     
+    select_related_fields = ('city', 'service_provider')
+    prefetch_related_fields = ('pickup_locations__city', 'holidaypackage_images')
+    
     class Meta:
         model = Holidaypackage
         fields = [
@@ -83,8 +97,8 @@ class HolidaypackageSerializer(serializers.ModelSerializer):
 			'city', 'city_name', 'pickup_locations',
             'price_per_hour', 'price_per_person', 'price_per_day', 'price_per_week', 'price_per_month', 
             'safety_deposit', 'operating_hours', 'available', 'documents_required',
-            'terms_and_conditions', 'holidaypackage_images', 'primary_image', 'all_images', 
-            'rating', 'total_reviews', 'total_trips', 'created_at'
+            'terms_and_conditions', 'holidaypackage_images', 'primary_image', 'primary_image_variants', 'all_images', 
+            'rating', 'total_reviews', 'rating_breakdown', 'total_trips', 'created_at'
         ]
         read_only_fields = ['id', 'service_provider', 'rating', 'total_reviews', 'created_at']
 
@@ -1,6 +1,6 @@
-from rest_framework import generics, viewsets, filters, status
+from rest_framework import generics, viewsets, filters
 from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
@@ -8,9 +8,16 @@ from .models import Holidaypackage, HolidayPackageCity, PickupLocation, Itinerar
  # HolidaypackageFuelType, HolidaypackageTransmission, HolidaypackageModelYear,  
 from .serializers import ItinerarySerializer, ItineraryImageSerializer, HolidaypackageSerializer, HolidaypackageCreateSerializer, HolidayPackageCitySerializer, PickupLocationSerializer
 # HolidaypackageFuelTypeSerializer, HolidaypackageTransmissionSerializer, HolidaypackageModelYearSerializer, 
-from .location_utils import haversine_distance
-
-class ItineraryViewSet(viewsets.ModelViewSet):
+from apps.core.geo import annotate_nearest_pickup
+from apps.core.pagination import DistanceCursorPagination
+from apps.bookings.views import BookItemView
+from apps.core.filters import AvailabilityFilter
+from apps.core.autocomplete import city_autocomplete
+from apps.core.views import EagerLoadingViewMixin, FilterOptionsView
+from apps.search.filters import IndexSearchFilter
+from .filter_options import holidaypackage_filter_options
+
+class ItineraryViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     serializer_class = ItinerarySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -46,11 +53,11 @@ class ItineraryImageViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at']
     ordering = ['-created_at']
 
-class HolidaypackageViewSet(viewsets.ModelViewSet):
+class HolidaypackageViewSet(EagerLoadingViewMixin, viewsets.ModelViewSet):
     queryset = Holidaypackage.objects.all()
     serializer_class = HolidaypackageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexSearchFilter, filters.OrderingFilter]
     filterset_fields = [ 'city', 'available']
     search_fields = ['title', 'model', 'description', 'city__name']
     ordering_fields = ['price_per_person', 'price_per_day', 'rating', 'created_at']		
@@ -63,10 +70,10 @@ class HolidaypackageViewSet(viewsets.ModelViewSet):
     # def get_queryset(self):
         # return Holidaypackage.objects.filter(available=True)
 
-class AvailableHolidaypackagesView(generics.ListAPIView):
+class AvailableHolidaypackagesView(EagerLoadingViewMixin, generics.ListAPIView):
     serializer_class = HolidaypackageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, IndexSearchFilter, AvailabilityFilter]
     filterset_fields = ['city']
     search_fields = ['title', 'model', 'description']
     
@@ -84,20 +91,16 @@ class AvailableHolidaypackagesView(generics.ListAPIView):
             
         return queryset.order_by('-rating')
 
-class BookHolidaypackageView(generics.CreateAPIView):
-    permission_classes = [IsAuthenticated]
-    
-    def post(self, request):
-        # This would integrate with the bookings app
-        # For now, just return success response
-        return Response({"message": "Booking request submitted"}, status=status.HTTP_201_CREATED)
+class BookHolidaypackageView(BookItemView):
+    item_model = Holidaypackage
+    service_type = 'holidaypackage'
 
-class HolidaypackageDetailView(generics.RetrieveAPIView):
+class HolidaypackageDetailView(EagerLoadingViewMixin, generics.RetrieveAPIView):
     queryset = Holidaypackage.objects.all()
     serializer_class = HolidaypackageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-class HolidaypackageFilterView(generics.ListAPIView):
+class HolidaypackageFilterView(EagerLoadingViewMixin, generics.ListAPIView):
     serializer_class = HolidaypackageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
@@ -118,38 +121,19 @@ class HolidaypackageFilterView(generics.ListAPIView):
             
         return queryset.order_by('-rating')
 
-class HolidaypackageFilterOptionsView(generics.GenericAPIView):
+class HolidaypackageFilterOptionsView(FilterOptionsView):
     """View to provide filter options for the frontend"""
     permission_classes = [IsAuthenticatedOrReadOnly]
-    
-    def get(self, request):
-        # Import related models
-        from .models import HolidaypackageTransmission, HolidaypackageFuelType, HolidaypackageRentalType
-        
-        # Get all unique filter options from the database
-        # brands = list(HolidaypackageBrand.objects.values_list('name', flat=True).distinct())
-        cities = list(HolidayPackageCity.objects.values_list('name', flat=True).distinct())
-        #model_years = list(HolidaypackageModelYear.objects.values_list('year', flat=True).order_by('-year'))
-        # transmissions = list(HolidaypackageTransmission.objects.values_list('type', flat=True).distinct())
-        # fuel_types = list(HolidaypackageFuelType.objects.values_list('type', flat=True).distinct())
-        # rental_types = list(HolidaypackageRentalType.objects.values_list('type', flat=True).distinct())
-        
-        return Response({
-            # 'brands': brands,
-            'cities': cities,
-            # 'model_years': model_years,
-            # 'transmissions': transmissions,
-            # 'fuel_types': fuel_types,
-            # 'rental_types': rental_types,
-        })
+    filter_options = holidaypackage_filter_options
 
-class NearbyHolidaypackagesView(generics.ListAPIView):
+class NearbyHolidaypackagesView(EagerLoadingViewMixin, generics.ListAPIView):
     """View to get holidaypackages near a specific location, sorted by distance"""
     serializer_class = HolidaypackageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = DistanceCursorPagination
     
     def list(self, request, *args, **kwargs):
-        queryset = Holidaypackage.objects.filter(available=True)
+        queryset = self.filter_queryset(Holidaypackage.objects.filter(available=True))
         
         # Get user coordinates from query parameters
         user_lat = self.request.query_params.get('lat')
@@ -170,58 +154,34 @@ class NearbyHolidaypackagesView(generics.ListAPIView):
             serializer = self.get_serializer(queryset, many=True)
             return Response(serializer.data)
         
-        # Calculate distances for all holidaypackages and filter by radius
-        holidaypackages_with_distance = []
-        
-        for holidaypackage in queryset:
-            closest_distance = float('inf')
-            closest_pickup_location = None
-            
-            # Find the closest pickup location for each holidaypackage
-            for pickup_location in holidaypackage.pickup_locations.all():
-                if pickup_location.latitude and pickup_location.longitude:
-                    distance = haversine_distance(
-                        user_lat, user_lng,
-                        float(pickup_location.latitude),
-                        float(pickup_location.longitude)
-                    )
-                    if distance < closest_distance:
-                        closest_distance = distance
-                        closest_pickup_location = pickup_location
-            
-            # Add holidaypackage to results if within radius
-            if closest_distance <= radius and closest_pickup_location:
-                holidaypackages_with_distance.append({
-                    'holidaypackage': holidaypackage,
-                    'distance': round(closest_distance, 2),
-                    'closest_pickup': closest_pickup_location
-                })
-        
-        # Sort by distance (ascending - nearest first)
-        holidaypackages_with_distance.sort(key=lambda x: x['distance'])
+        # Distance to the closest pickup location is computed, filtered and
+        # ordered in SQL; only the requested page is materialized
+        queryset = annotate_nearest_pickup(queryset, user_lat, user_lng, radius)
+        page = self.paginate_queryset(queryset)
+        closest_pickups = PickupLocation.objects.in_bulk([holidaypackage.closest_pickup_id for holidaypackage in page])
         
         # Serialize holidaypackages and add distance information
         result_data = []
-        for item in holidaypackages_with_distance:
-            holidaypackage_data = self.get_serializer(item['holidaypackage']).data
-            holidaypackage_data['distance_km'] = item['distance']
+        for holidaypackage, holidaypackage_data in zip(page, self.get_serializer(page, many=True).data):
+            closest_pickup = closest_pickups[holidaypackage.closest_pickup_id]
+            holidaypackage_data['distance_km'] = round(holidaypackage.distance, 2)
             holidaypackage_data['closest_pickup_location'] = {
-                'id': item['closest_pickup'].id,
-                'name': item['closest_pickup'].name,
-                'address': item['closest_pickup'].address,
-                'latitude': str(item['closest_pickup'].latitude),
-                'longitude': str(item['closest_pickup'].longitude),
+                'id': closest_pickup.id,
+                'name': closest_pickup.name,
+                'address': closest_pickup.address,
+                'latitude': str(closest_pickup.latitude),
+                'longitude': str(closest_pickup.longitude),
             }
             result_data.append(holidaypackage_data)
         
-        return Response(result_data)
+        return self.get_paginated_response(result_data)
 
 # class HolidaypackageModelYearViewSet(viewsets.ReadOnlyModelViewSet):
     # queryset = HolidaypackageModelYear.objects.all()
     # serializer_class = HolidaypackageModelYearSerializer
     # permission_classes = [IsAuthenticatedOrReadOnly]
 
-class PickupLocationViewSet(viewsets.ReadOnlyModelViewSet):
+class PickupLocationViewSet(EagerLoadingViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PickupLocation.objects.all()
     serializer_class = PickupLocationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -240,7 +200,8 @@ class HolidayPackageCityViewSet(viewsets.ReadOnlyModelViewSet):
         if not query:
             return Response([], status=200)
         
-        cities = self.queryset.filter(name__icontains=query)[:10]
+        # Served from the in-process city index rather than an icontains query per keystroke
+        cities = [city.rows['holidaypackage'] for city in city_autocomplete.suggest(query, kind='holidaypackage')]
         serializer = self.get_serializer(cities, many=True)
         return Response(serializer.data)
 	
@@ -0,0 +1,10 @@
+from apps.search.indexes import register_search_index
+
+from .models import Hotel
+
+hotel_index = register_search_index(
+    Hotel, 'hotel',
+    keywords=['area', 'city__name', 'property_type__type'],
+    body=['description', 'address'],
+    city='city__name',
+)
@@ -1,10 +1,14 @@
 from rest_framework import serializers
+from apps.core.ratings import COUNTER_FIELDS
 from .models import Hotel
 
 class HotelSerializer(serializers.ModelSerializer):
+    rating_breakdown = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
     class Meta:
         model = Hotel
         fields = '__all__'  # Include all fields from the Hotel model
+        read_only_fields = COUNTER_FIELDS  # Kept by apps.core.ratings from the reviews
 
 class HotelCreateSerializer(serializers.ModelSerializer):
     class Meta:
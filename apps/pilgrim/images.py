@@ -0,0 +1,6 @@
+from apps.core.images import register_image_model
+
+from .models import PilgrimTourImage, PilgrimHotelImage
+
+pilgrim_tour_images = register_image_model(PilgrimTourImage)
+pilgrim_hotel_images = register_image_model(PilgrimHotelImage)
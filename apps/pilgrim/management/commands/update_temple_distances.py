@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from apps.pilgrim.models import PilgrimHotel, PilgrimageDestination
+
+
+class Command(BaseCommand):
+    help = 'Fill PilgrimHotel.distance_to_temple from hotel and destination coordinates'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--overwrite', action='store_true',
+            help='Recompute hotels that already have a distance_to_temple value',
+        )
+
+    def handle(self, *args, **options):
+        hotels = PilgrimHotel.objects.exclude(latitude=None).exclude(longitude=None).prefetch_related('near_destinations')
+        if not options['overwrite']:
+            hotels = hotels.filter(distance_to_temple='')
+
+        # Hotels without linked destinations are measured against every site
+        all_destinations = list(PilgrimageDestination.objects.exclude(latitude=None).exclude(longitude=None))
+
+        updated = []
+        for hotel in hotels:
+            destinations = hotel.near_destinations.all() or all_destinations
+            destination, distance = hotel.nearest_destination(destinations)
+            if destination is None:
+                self.stdout.write(f'No destination coordinates for "{hotel.title}". Skipping.')
+                continue
+            hotel.distance_to_temple = f'{distance:.1f} km from {destination.name}'
+            updated.append(hotel)
+
+        PilgrimHotel.objects.bulk_update(updated, ['distance_to_temple'], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f'Updated distance_to_temple for {len(updated)} hotels'))
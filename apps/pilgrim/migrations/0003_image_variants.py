@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilgrim', '0002_pilgrimdifficultylevel_pilgrimfeature_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pilgrimhotelimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Thumbnails and resized copies, see apps.core.images'),
+        ),
+        migrations.AddField(
+            model_name='pilgrimtourimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Thumbnails and resized copies, see apps.core.images'),
+        ),
+    ]
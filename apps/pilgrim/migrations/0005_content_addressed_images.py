@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import apps.core.storage
+import apps.pilgrim.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pilgrim', '0004_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pilgrimhotelimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.pilgrim.utils.pilgrim_image_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='pilgrimtourimage',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.storage.media_storage, upload_to=apps.pilgrim.utils.pilgrim_image_upload_path),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from apps.core.location_utils import haversine_batch
+from apps.core.storage import media_storage
 from .utils import pilgrim_image_upload_path
 
 User = get_user_model()
@@ -49,7 +51,11 @@ class PilgrimageDestination(models.Model):
 
 class PilgrimTourImage(models.Model):
     tour = models.ForeignKey('PilgrimTour', related_name='tour_images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to=pilgrim_image_upload_path, blank=True, null=True)
+    image = models.ImageField(upload_to=pilgrim_image_upload_path, storage=media_storage, blank=True, null=True)
+    variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Thumbnails and resized copies, see apps.core.images')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False, help_text='Tiny blurred preview as a data: URI')
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -115,11 +121,9 @@ class PilgrimTour(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for the tour"""
-        primary_img = self.tour_images.filter(is_primary=True).first()
-        if primary_img and primary_img.image:
-            return primary_img.image.url
-        # Fallback to first available image
-        first_img = self.tour_images.first()
+        # Images are ordered primary-first, so the first row is the primary
+        # image (or the newest one). Iterating .all() reuses prefetched rows.
+        first_img = next(iter(self.tour_images.all()), None)
         if first_img and first_img.image:
             return first_img.image.url
         return None
@@ -134,7 +138,11 @@ class PilgrimTour(models.Model):
 
 class PilgrimHotelImage(models.Model):
     hotel = models.ForeignKey('PilgrimHotel', related_name='hotel_images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to=pilgrim_image_upload_path, blank=True, null=True)
+    image = models.ImageField(upload_to=pilgrim_image_upload_path, storage=media_storage, blank=True, null=True)
+    variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Thumbnails and resized copies, see apps.core.images')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False, help_text='Tiny blurred preview as a data: URI')
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -223,11 +231,9 @@ class PilgrimHotel(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for the hotel"""
-        primary_img = self.hotel_images.filter(is_primary=True).first()
-        if primary_img and primary_img.image:
-            return primary_img.image.url
-        # Fallback to first available image
-        first_img = self.hotel_images.first()
+        # Images are ordered primary-first, so the first row is the primary
+        # image (or the newest one). Iterating .all() reuses prefetched rows.
+        first_img = next(iter(self.hotel_images.all()), None)
         if first_img and first_img.image:
             return first_img.image.url
         return None
@@ -237,5 +243,28 @@ class PilgrimHotel(models.Model):
         """Get all image URLs for the hotel"""
         return [img.image.url for img in self.hotel_images.all() if img.image]
 
+    def nearest_destination(self, destinations=None):
+        """
+        Get (destination, distance_km) for the closest pilgrimage site.
+        Defaults to the hotel's near_destinations; returns (None, None) when
+        the hotel or the destinations have no coordinates.
+        """
+        if self.latitude is None or self.longitude is None:
+            return None, None
+        if destinations is None:
+            destinations = self.near_destinations.all()
+        destinations = list(destinations)
+        if not destinations:
+            return None, None
+
+        batch = haversine_batch(
+            self.latitude, self.longitude,
+            [destination.latitude for destination in destinations],
+            [destination.longitude for destination in destinations],
+        )
+        if batch.nearest_index is None:
+            return None, None
+        return destinations[batch.nearest_index], float(batch.distances[batch.nearest_index])
+
     class Meta:
         ordering = ['-created_at']
\ No newline at end of file
@@ -0,0 +1,11 @@
+from apps.search.indexes import register_search_index
+
+from .models import PilgrimTour
+
+pilgrim_tour_index = register_search_index(
+    PilgrimTour, 'pilgrim_tour',
+    keywords=['region__name', 'state', 'package_type__type'],
+    body=['description'],
+    city='state',
+    published='is_active',
+)
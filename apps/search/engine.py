@@ -0,0 +1,212 @@
+import re
+
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+
+from .models import SearchDocument
+
+TABLE = SearchDocument._meta.db_table
+# Document columns returned with results; the full-text tables have columns of the same names
+COLUMNS = ', '.join(f'{TABLE}.{column}' for column in ('id', 'kind', 'object_id', 'title', 'city'))
+# PostgreSQL text search configuration; stems English words like the SQLite porter tokenizer
+CONFIG = 'english'
+FTS_TABLE = 'search_document_fts'
+TRIGRAM_TABLE = 'search_document_trigrams'
+# Relative weight of title, keywords and body matches in SQLite's bm25()
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+MAX_TERMS = 8
+SUGGEST_CANDIDATES = 100
+SUGGEST_THRESHOLD = 0.3
+
+
+def terms(text):
+    """Lowercased words of a query; punctuation never reaches the full-text syntax"""
+    return re.findall(r'\w+', text.lower())[:MAX_TERMS]
+
+
+def trigrams(word):
+    """Trigrams of one word, padded the way pg_trgm pads them"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def word_similarity(words, title):
+    """Mean over the query words of their best trigram similarity to a word of `title`"""
+    title_trigrams = [trigrams(word) for word in terms(title)]
+    if not words or not title_trigrams:
+        return 0.0
+    total = 0.0
+    for word in words:
+        query = trigrams(word)
+        total += max(len(query & other) / len(query | other) for other in title_trigrams)
+    return total / len(words)
+
+
+def install(using='default'):
+    """
+    Create the full-text structures over SearchDocument (migration 0002;
+    benchmarks that skip migrations call it themselves). Idempotent.
+
+    PostgreSQL gets a generated, weighted tsvector column with a GIN index
+    and a pg_trgm index on titles for typo-tolerant suggestions. SQLite
+    gets an FTS5 table (porter stemming, prefix indexes) and an FTS5
+    trigram table, both kept in step with the documents by triggers.
+    """
+    db = connections[using]
+    with db.cursor() as cursor:
+        if db.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f"ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+                f"setweight(to_tsvector('{CONFIG}', title), 'A') || "
+                f"setweight(to_tsvector('{CONFIG}', keywords), 'B') || "
+                f"setweight(to_tsvector('{CONFIG}', body), 'C')) STORED"
+            )
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS search_document_vector_idx ON {TABLE} USING gin (search_vector)')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS search_document_title_trgm_idx ON {TABLE} USING gin (title gin_trgm_ops)'
+            )
+        elif db.vendor == 'sqlite':
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+            created = cursor.fetchone()[0]
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"title, keywords, body, content='{TABLE}', content_rowid='id', "
+                f"tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TRIGRAM_TABLE} USING fts5("
+                f"title, content='{TABLE}', content_rowid='id', tokenize='trigram')"
+            )
+            add = (
+                f"INSERT INTO {FTS_TABLE}(rowid, title, keywords, body) VALUES (new.id, new.title, new.keywords, new.body); "
+                f"INSERT INTO {TRIGRAM_TABLE}(rowid, title) VALUES (new.id, new.title);"
+            )
+            remove = (
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, keywords, body) "
+                f"VALUES ('delete', old.id, old.title, old.keywords, old.body); "
+                f"INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);"
+            )
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {TABLE} BEGIN {add} END')
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {TABLE} BEGIN {remove} END')
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON {TABLE} BEGIN {remove} {add} END'
+            )
+            if not created:
+                # Index documents written before the tables existed
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                cursor.execute(f"INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall(using='default'):
+    """Drop what install() created"""
+    db = connections[using]
+    with db.cursor() as cursor:
+        if db.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS search_document_title_trgm_idx')
+            cursor.execute('DROP INDEX IF EXISTS search_document_vector_idx')
+            cursor.execute(f'ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector')
+        elif db.vendor == 'sqlite':
+            for trigger in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {TRIGRAM_TABLE}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def match_sql(words):
+    """(condition, params, rank expression) matching every word, the last one as a prefix"""
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+        return (
+            f"search_vector @@ to_tsquery('{CONFIG}', %s)",
+            [tsquery],
+            f"ts_rank_cd(search_vector, to_tsquery('{CONFIG}', %s))",
+        )
+    if connection.vendor == 'sqlite':
+        query = ' '.join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+        weights = ', '.join(map(str, BM25_WEIGHTS))
+        # bm25() is lower for better matches
+        return f'{FTS_TABLE} MATCH %s', [query], f'-bm25({FTS_TABLE}, {weights})'
+    raise NotImplementedError(f'Full-text search is not available on {connection.vendor}')
+
+
+def match_source():
+    if connection.vendor == 'postgresql':
+        return TABLE
+    # CROSS JOIN keeps SQLite from driving the join from the kind index and
+    # running MATCH once per document
+    return f'{FTS_TABLE} CROSS JOIN {TABLE} ON {TABLE}.id = {FTS_TABLE}.rowid'
+
+
+def kind_filter(kinds):
+    if not kinds:
+        return '', []
+    return f" AND {TABLE}.kind IN ({', '.join(['%s'] * len(kinds))})", list(kinds)
+
+
+def search(text, kinds=None, limit=20):
+    """Best matching documents for `text`, each with a `score` (higher is better)"""
+    words = terms(text)
+    if not words:
+        return []
+    condition, params, rank = match_sql(words)
+    rank_params = params if connection.vendor == 'postgresql' else []
+    kind_sql, kind_params = kind_filter(kinds)
+    return list(SearchDocument.objects.raw(
+        f'SELECT {COLUMNS}, {rank} AS score FROM {match_source()} WHERE {condition}{kind_sql} '
+        f'ORDER BY score DESC, {TABLE}.title LIMIT %s',
+        rank_params + params + kind_params + [limit],
+    ))
+
+
+def matching_ids(kind, text):
+    """
+    Subquery of the ids of every `kind` item matching `text`, for
+    filter(pk__in=...) on a catalogue queryset; the database joins it
+    rather than the ids travelling through Python as parameters.
+    """
+    words = terms(text)
+    if not words:
+        return []
+    condition, params, _ = match_sql(words)
+    kind_sql, kind_params = kind_filter([kind])
+    return RawSQL(f'SELECT {TABLE}.object_id FROM {match_source()} WHERE {condition}{kind_sql}', params + kind_params)
+
+
+def suggest(text, kinds=None, limit=5):
+    """
+    Documents whose titles resemble `text` despite typos, best first, each
+    with a `score` between 0 and 1 (trigram word similarity).
+    """
+    words = terms(text)
+    if not words:
+        return []
+    kind_sql, kind_params = kind_filter(kinds)
+    query = ' '.join(words)
+
+    if connection.vendor == 'postgresql':
+        return list(SearchDocument.objects.raw(
+            f'SELECT {COLUMNS}, word_similarity(%s, title) AS score FROM {TABLE} '
+            f'WHERE %s <%% title{kind_sql} ORDER BY score DESC, title LIMIT %s',
+            [query, query, *kind_params, limit],
+        ))
+    if connection.vendor != 'sqlite':
+        raise NotImplementedError(f'Full-text search is not available on {connection.vendor}')
+
+    # Candidates share at least one trigram with the query; they are scored like pg_trgm
+    grams = sorted({word[i:i + 3] for word in words for i in range(len(word) - 2)})
+    if not grams:
+        return []
+    candidates = SearchDocument.objects.raw(
+        f'SELECT {COLUMNS} FROM {TRIGRAM_TABLE} '
+        f'CROSS JOIN {TABLE} ON {TABLE}.id = {TRIGRAM_TABLE}.rowid '
+        f'WHERE {TRIGRAM_TABLE} MATCH %s{kind_sql} ORDER BY bm25({TRIGRAM_TABLE}) LIMIT %s',
+        [' OR '.join(f'"{gram}"' for gram in grams), *kind_params, SUGGEST_CANDIDATES],
+    )
+    suggestions = []
+    for document in candidates:
+        document.score = word_similarity(words, document.title)
+        if document.score >= SUGGEST_THRESHOLD:
+            suggestions.append(document)
+    suggestions.sort(key=lambda document: (-document.score, document.title))
+    return suggestions[:limit]
@@ -0,0 +1,127 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.html import strip_tags
+
+from .models import SearchDocument
+
+
+def resolve(instance, path):
+    """Value of a lookup path like 'brand__name' on `instance` ('' when missing)"""
+    value = instance
+    for name in path.split('__'):
+        value = getattr(value, name, None)
+        if value is None:
+            return ''
+    return str(value)
+
+
+class SearchIndex:
+    """
+    How one catalogue model becomes a SearchDocument: `title` is weighted
+    highest, then the short `keywords` fields, then the long `body` fields
+    (HTML is stripped). Fields are lookup paths; related ones are joined
+    when the index is rebuilt. Instances failing `published` (a boolean
+    field name) are kept out of the index.
+
+    Saving or deleting an instance updates its document. Bulk writes and
+    renamed cities or brands need a `rebuild()`.
+    """
+
+    def __init__(self, model, kind, title='title', keywords=(), body=(), city='', published=None):
+        self.model = model
+        self.kind = kind
+        self.title = title
+        self.keywords = list(keywords)
+        self.body = list(body)
+        self.city = city
+        self.published = published
+
+        uid = f'search.indexes:{model._meta.label}'
+        post_save.connect(self.item_saved, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+        post_delete.connect(self.item_deleted, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+
+    @property
+    def related(self):
+        paths = [self.title, self.city, *self.keywords, *self.body]
+        return sorted({path.rsplit('__', 1)[0] for path in paths if '__' in path})
+
+    def is_published(self, instance):
+        return self.published is None or bool(getattr(instance, self.published))
+
+    def document(self, instance, content_type, document_model=SearchDocument):
+        return document_model(
+            content_type=content_type,
+            object_id=instance.pk,
+            kind=self.kind,
+            title=resolve(instance, self.title)[:255],
+            keywords=' '.join(filter(None, (resolve(instance, path) for path in self.keywords))),
+            body='\n'.join(filter(None, (strip_tags(resolve(instance, path)) for path in self.body))),
+            city=resolve(instance, self.city)[:100],
+        )
+
+    def item_saved(self, instance, raw=False, **kwargs):
+        if raw:
+            return
+        content_type = ContentType.objects.get_for_model(self.model)
+        if not self.is_published(instance):
+            SearchDocument.objects.filter(content_type=content_type, object_id=instance.pk).delete()
+            return
+        document = self.document(instance, content_type)
+        SearchDocument.objects.update_or_create(
+            content_type=content_type,
+            object_id=instance.pk,
+            defaults={field: getattr(document, field) for field in ('kind', 'title', 'keywords', 'body', 'city')},
+        )
+
+    def item_deleted(self, instance, **kwargs):
+        SearchDocument.objects.filter(
+            content_type=ContentType.objects.get_for_model(self.model), object_id=instance.pk
+        ).delete()
+
+    def rebuild(self, batch_size=500, apps=None):
+        """
+        Replace every document of this model; returns the number indexed.
+        A migration passes its `apps` so the historical models are used.
+        """
+        if apps is None:
+            model, document_model = self.model, SearchDocument
+            content_type = ContentType.objects.get_for_model(self.model)
+        else:
+            model, document_model = apps.get_model(self.model._meta.label), apps.get_model('search', 'SearchDocument')
+            content_type, _ = apps.get_model('contenttypes', 'ContentType').objects.get_or_create(
+                app_label=self.model._meta.app_label, model=self.model._meta.model_name,
+            )
+        queryset = model._default_manager.select_related(*self.related).order_by('pk')
+        if self.published:
+            queryset = queryset.filter(**{self.published: True})
+
+        count = 0
+        with transaction.atomic():
+            document_model.objects.filter(content_type=content_type).delete()
+            batch = []
+            for instance in queryset.iterator(chunk_size=batch_size):
+                batch.append(self.document(instance, content_type, document_model))
+                if len(batch) >= batch_size:
+                    document_model.objects.bulk_create(batch)
+                    count += len(batch)
+                    batch = []
+            document_model.objects.bulk_create(batch)
+            count += len(batch)
+        return count
+
+
+search_indexes = {}
+
+
+def register_search_index(model, kind, **options):
+    search_index = SearchIndex(model, kind, **options)
+    search_indexes[kind] = search_index
+    return search_index
+
+
+def index_for_model(model):
+    for search_index in search_indexes.values():
+        if search_index.model is model:
+            return search_index
+    return None
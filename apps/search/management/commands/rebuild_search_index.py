@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.search.indexes import search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search documents of the catalogue models from their tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kinds', nargs='*', help='Kinds to rebuild, e.g. bike hotel (default: all registered)')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        kinds = options['kinds'] or sorted(search_indexes)
+        unknown = [kind for kind in kinds if kind not in search_indexes]
+        if unknown:
+            raise CommandError(f"Unknown kinds: {', '.join(unknown)}. Registered: {', '.join(sorted(search_indexes))}")
+
+        for kind in kinds:
+            start = time.perf_counter()
+            count = search_indexes[kind].rebuild(batch_size=options['batch_size'])
+            self.stdout.write(f'{kind}: {count} documents in {time.perf_counter() - start:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
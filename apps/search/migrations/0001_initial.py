@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('kind', models.CharField(max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('keywords', models.TextField(blank=True, help_text='Brand, model, city and similar short fields')),
+                ('body', models.TextField(blank=True)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind'], name='search_document_kind_idx')],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id'), name='search_document_unique')],
+            },
+        ),
+    ]
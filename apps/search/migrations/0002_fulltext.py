@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from apps.search.engine import install
+
+    install(schema_editor.connection.alias)
+
+
+def uninstall(apps, schema_editor):
+    from apps.search.engine import uninstall
+
+    uninstall(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+    """The tsvector column and GIN/trigram indexes (PostgreSQL) or FTS5 tables and triggers (SQLite)"""
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
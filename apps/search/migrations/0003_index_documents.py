@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def index_documents(apps, schema_editor):
+    from apps.search.indexes import search_indexes
+
+    # The full-text tables' triggers index each document as it is inserted
+    for search_index in search_indexes.values():
+        search_index.rebuild(apps=apps)
+
+
+def remove_documents(apps, schema_editor):
+    apps.get_model('search', 'SearchDocument').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    """Documents for the listings that existed before search"""
+
+    dependencies = [
+        ('search', '0002_fulltext'),
+        ('bikes', '0018_content_addressed_images'),
+        ('campervans', '0006_content_addressed_images'),
+        ('cars', '0006_content_addressed_images'),
+        ('fulltours', '0007_content_addressed_images'),
+        ('holidaypackages', '0006_content_addressed_images'),
+        ('hotels', '0006_content_addressed_images'),
+        ('pilgrim', '0005_content_addressed_images'),
+        ('stories', '0004_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_documents, remove_documents),
+    ]
@@ -0,0 +1,31 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of one catalogue listing, kept by apps.search.indexes.
+    The full-text structures over it (a tsvector column and GIN indexes on
+    PostgreSQL, FTS5 tables on SQLite) are installed by apps.search.engine.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    item = GenericForeignKey('content_type', 'object_id')
+    kind = models.CharField(max_length=50)
+    title = models.CharField(max_length=255)
+    keywords = models.TextField(blank=True, help_text='Brand, model, city and similar short fields')
+    body = models.TextField(blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='search_document_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['kind'], name='search_document_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} - {self.title}"
@@ -0,0 +1,26 @@
+from rest_framework import serializers
+
+from .indexes import search_indexes
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    kind = serializers.CharField(required=False, help_text='Comma-separated kinds, e.g. bike,hotel')
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+    def validate_kind(self, value):
+        kinds = [kind.strip() for kind in value.split(',') if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in search_indexes]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown kinds: {', '.join(unknown)}. Choose from {', '.join(sorted(search_indexes))}."
+            )
+        return kinds
+
+
+class SearchResultSerializer(serializers.Serializer):
+    kind = serializers.CharField()
+    id = serializers.IntegerField(source='object_id')
+    title = serializers.CharField()
+    city = serializers.CharField()
+    score = serializers.FloatField()
@@ -0,0 +1,62 @@
+from rest_framework.test import APIClient
+
+from apps.bikes.models import Bike
+from apps.core.tests.catalogue import CatalogueTestCase
+
+from .models import SearchDocument
+
+
+class SearchTests(CatalogueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.himalayan, cls.scooter = Bike.objects.order_by('pk')[:2]
+        cls.himalayan.title = 'Royal Enfield Himalayan'
+        cls.himalayan.save()
+        cls.scooter.title = 'Honda Activa Scooter'
+        cls.scooter.save()
+
+    def search(self, path='/api/search/', **params):
+        response = APIClient().get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_saved_items_are_indexed(self):
+        document = SearchDocument.objects.get(kind='bike', object_id=self.himalayan.pk)
+        self.assertEqual((document.title, document.city), ('Royal Enfield Himalayan', self.himalayan.city.name))
+        self.assertIn(self.himalayan.model, document.keywords)
+
+        self.himalayan.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='bike', object_id=self.himalayan.pk).exists())
+
+    def test_search_ranks_matches(self):
+        results = self.search(q='himalayan')['results']
+        self.assertEqual([(result['kind'], result['id']) for result in results], [('bike', self.himalayan.pk)])
+
+        # The last word matches as a prefix, and words are stemmed
+        self.assertEqual([result['id'] for result in self.search(q='royal himal')['results']], [self.himalayan.pk])
+        self.assertEqual([result['id'] for result in self.search(q='scooters')['results']], [self.scooter.pk])
+        self.assertEqual(self.search(q='himalayan', kind='hotel')['results'], [])
+        # Full-text syntax in the query is just text
+        self.assertEqual(self.search(q='"himalayan" (royal* -')['results'][0]['id'], self.himalayan.pk)
+
+    def test_typos_fall_back_to_suggestions(self):
+        data = self.search(q='himalyan')
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['suggestions'][0]['id'], self.himalayan.pk)
+        self.assertGreaterEqual(data['suggestions'][0]['score'], 0.3)
+
+        suggestions = self.search('/api/search/suggest/', q='hondda activa')['suggestions']
+        self.assertEqual([suggestion['id'] for suggestion in suggestions], [self.scooter.pk])
+        self.assertEqual(self.search('/api/search/suggest/', q='zzzzzz')['suggestions'], [])
+
+    def test_invalid_queries_are_rejected(self):
+        self.assertEqual(APIClient().get('/api/search/').status_code, 400)
+        self.assertEqual(APIClient().get('/api/search/', {'q': 'bike', 'kind': 'spaceship'}).status_code, 400)
+        self.assertEqual(APIClient().get('/api/search/', {'q': 'bike', 'limit': 0}).status_code, 400)
+
+    def test_catalogue_search_uses_the_index(self):
+        ids = [bike['id'] for bike in self.search('/api/bikes/', search='himalayan')['results']]
+        self.assertEqual(ids, [self.himalayan.pk])
+        # Punctuation alone filters nothing
+        self.assertEqual(len(self.search('/api/bikes/', search='!!')['results']), Bike.objects.count())
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('', views.SearchView.as_view(), name='search'),
+    path('suggest/', views.SuggestView.as_view(), name='search_suggest'),
+]
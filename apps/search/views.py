@@ -0,0 +1,41 @@
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import engine
+from .serializers import SearchQuerySerializer, SearchResultSerializer
+
+
+class SearchView(APIView):
+    """
+    Ranked full-text search over every indexed catalogue listing:
+    ?q=words (the last word matches as a prefix), optional ?kind=bike,hotel
+    and ?limit=. When nothing matches, typo-tolerant title suggestions are
+    returned instead.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        q, kinds, limit = params.validated_data['q'], params.validated_data.get('kind'), params.validated_data['limit']
+
+        results = engine.search(q, kinds=kinds, limit=limit)
+        suggestions = [] if results else engine.suggest(q, kinds=kinds)
+        return Response({
+            'query': q,
+            'results': SearchResultSerializer(results, many=True).data,
+            'suggestions': SearchResultSerializer(suggestions, many=True).data,
+        })
+
+
+class SuggestView(APIView):
+    """Listings whose titles resemble ?q= even with typos, for "did you mean" prompts"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = SearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        q = params.validated_data['q']
+        suggestions = engine.suggest(q, kinds=params.validated_data.get('kind'), limit=params.validated_data['limit'])
+        return Response({'query': q, 'suggestions': SearchResultSerializer(suggestions, many=True).data})
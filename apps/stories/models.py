@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from apps.core.storage import media_storage
 from .utils import story_image_upload_path
 
 User = get_user_model()
@@ -69,10 +70,9 @@ class Userstories(models.Model):
     @property
     def primary_image(self):
         """Get the primary image for the story"""
-        primary_img = self.story_images.filter(is_primary=True).first()
-        if primary_img and primary_img.image:
-            return primary_img.image.url
-        first_img = self.story_images.first()
+        # Images are ordered primary-first, so the first row is the primary
+        # image (or the newest one). Iterating .all() reuses prefetched rows.
+        first_img = next(iter(self.story_images.all()), None)
         if first_img and first_img.image:
             return first_img.image.url
         return None
@@ -89,7 +89,11 @@ class Userstories(models.Model):
 
 class UserstoriesImage(models.Model):
     story = models.ForeignKey(Userstories, related_name='story_images', on_delete=models.CASCADE)
-    image = models.ImageField(upload_to=story_image_upload_path, blank=True, null=True)
+    image = models.ImageField(upload_to=story_image_upload_path, storage=media_storage, blank=True, null=True)
+    variants = models.JSONField(default=dict, blank=True, editable=False, help_text='Thumbnails and resized copies, see apps.core.images')
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False, help_text='Tiny blurred preview as a data: URI')
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,11 @@
+from apps.search.indexes import register_search_index
+
+from .models import Userstories
+
+story_index = register_search_index(
+    Userstories, 'story',
+    keywords=['city__name', 'specific_place', 'place_type__type', 'journey_type__type'],
+    body=['summary', 'content'],
+    city='city__name',
+    published='is_approved',
+)
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 import dj_database_url
 from decouple import config
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'django_filters',
 
+    'apps.core',
     'apps.accounts',
     'apps.fulltours',
     'apps.holidaypackages',
@@ -63,6 +65,7 @@ INSTALLED_APPS = [
     'apps.bikes',
     'apps.stories',
     'apps.bookings',
+    'apps.search',
     'apps.insights',
 
     'ckeditor',
@@ -123,6 +126,38 @@ DATABASES = {
     }
 }
 DATABASES["default"]= dj_database_url.parse(config('DATABASE_URL'))
+# Test databases are migrated like production ones. DB_TEST_MIGRATE=False
+# builds them straight from the models, which is quicker but leaves out
+# what migrations add beyond the tables (search structures, constraints,
+# counter rows, backfills)
+DATABASES["default"]["TEST"] = {'MIGRATE': config('DB_TEST_MIGRATE', default=True, cast=bool)}
+
+# Connection reuse. By default each worker keeps its connection open for
+# DB_CONN_MAX_AGE seconds (0 closes it after every request) and checks it
+# is still alive before reuse. On Postgres, DB_POOL=True switches to
+# Django's native psycopg 3 pool instead; pooling and persistent
+# connections are mutually exclusive, so CONN_MAX_AGE is then 0.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+if DB_POOL and DATABASES["default"]["ENGINE"] == 'django.db.backends.postgresql':
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
+# SQLite allows one writer at a time. Taking the write lock when a
+# transaction begins (rather than on its first write) makes concurrent
+# booking transactions wait their turn instead of failing with
+# "database is locked" after both have read.
+if DATABASES["default"]["ENGINE"] == 'django.db.backends.sqlite3':
+    DATABASES["default"].setdefault("OPTIONS", {}).update({
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': config('DB_SQLITE_TIMEOUT', default=20, cast=int),
+    })
 
 # if os.getenv("DATABASE_URL"):
 #     DATABASES = {
@@ -146,13 +181,54 @@ DATABASES["default"]= dj_database_url.parse(config('DATABASE_URL'))
 # ------------------------------------------------------------------------------
 # CACHE
 # ------------------------------------------------------------------------------
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'traveller-clicks',
-        'TIMEOUT': 300,
+# The cache is shared by all gunicorn workers (login user data, verification
+# rate limits, filter options), so it must not be per-process.
+#   CACHE_URL=redis://host:6379/0   Redis with a pooled client (production)
+#   CACHE_URL=file:///path/to/dir   file-based, shared by processes on one host
+#   CACHE_URL=db://                 table in the default database, e.g. SQLite
+#                                   (run `manage.py createcachetable` first)
+# Without CACHE_URL a file-based cache in the temp directory is used.
+CACHE_URL = config('CACHE_URL', default='')
+CACHE_KEY_PREFIX = config('CACHE_KEY_PREFIX', default='travellerclicks')
+
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                # Passed to redis-py's ConnectionPool, one pool per worker
+                'max_connections': config('CACHE_MAX_CONNECTIONS', default=20, cast=int),
+                'socket_connect_timeout': 2,
+                'socket_timeout': 2,
+                'health_check_interval': 30,
+            },
+        }
+    }
+elif CACHE_URL.startswith('db://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    if CACHE_URL.startswith('file://'):
+        cache_dir = CACHE_URL[len('file://'):]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'travellerclicks-cache')
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': cache_dir,
+            'KEY_PREFIX': CACHE_KEY_PREFIX,
+            'TIMEOUT': 300,
+        }
     }
-}
 
 # ------------------------------------------------------------------------------
 # AUTH
@@ -182,6 +258,52 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    # ckeditor_uploader, profile pictures, insight images
+    'default': {'BACKEND': 'apps.core.storage.LocalStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    # Listing images: each distinct file stored once under a hash of its content
+    'media': {'BACKEND': 'apps.core.storage.ContentAddressedStorage'},
+}
+
+# Where uploads are kept: 'filesystem' (MEDIA_ROOT on this node) or 's3' (a
+# bucket on AWS or any S3-compatible service, shared by every node). Both
+# take direct uploads (POST /api/core/uploads/); the filesystem receives
+# them at /api/core/uploads/local/ in place of the bucket.
+MEDIA_STORAGE = os.getenv('MEDIA_STORAGE', 'filesystem')
+if MEDIA_STORAGE == 's3':
+    from boto3.s3.transfer import TransferConfig
+
+    # Credentials come from AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY
+    AWS_STORAGE_BUCKET_NAME = os.getenv('AWS_STORAGE_BUCKET_NAME')
+    # MinIO, R2, Spaces...; unset for AWS
+    AWS_S3_ENDPOINT_URL = os.getenv('AWS_S3_ENDPOINT_URL') or None
+    AWS_S3_REGION_NAME = os.getenv('AWS_S3_REGION_NAME') or None
+    # A CDN in front of the bucket
+    AWS_S3_CUSTOM_DOMAIN = os.getenv('AWS_S3_CUSTOM_DOMAIN') or None
+    # Plain URLs, which caches can keep, rather than ones signed per request
+    AWS_QUERYSTRING_AUTH = config('AWS_QUERYSTRING_AUTH', default=False, cast=bool)
+    # Files over 8 MB are streamed up in 8 MB parts
+    AWS_S3_TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 2 ** 20, multipart_chunksize=8 * 2 ** 20)
+    STORAGES['default'] = {'BACKEND': 'apps.core.s3.S3Storage'}
+    STORAGES['media'] = {'BACKEND': 'apps.core.s3.ContentAddressedS3Storage'}
+
+# Largest direct upload, and how long its presigned POST stays valid (seconds)
+MEDIA_UPLOAD_MAX_SIZE = int(os.getenv('MEDIA_UPLOAD_MAX_SIZE', 50 * 2 ** 20))
+MEDIA_UPLOAD_EXPIRES = int(os.getenv('MEDIA_UPLOAD_EXPIRES', 3600))
+
+# How /media/ files are sent: 'django' (FileResponse, os.sendfile where the
+# WSGI server supports it), 'x-accel-redirect' (nginx, internal location at
+# MEDIA_ACCEL_REDIRECT_PREFIX aliasing MEDIA_ROOT) or 'x-sendfile' (Apache, lighttpd)
+MEDIA_SERVING = os.getenv('MEDIA_SERVING', 'django')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+# Browser cache lifetime of media outside blobs/, which can be overwritten in place
+MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', 86400))
+
+# Processes rendering thumbnails and WebP/JPEG copies of uploaded images
+# (apps.core.images); 0 renders them inline
+IMAGE_PIPELINE_WORKERS = int(os.getenv('IMAGE_PIPELINE_WORKERS', 2))
+
 # ------------------------------------------------------------------------------
 # CKEDITOR
 # ------------------------------------------------------------------------------
@@ -230,10 +352,15 @@ else:
 # ------------------------------------------------------------------------------
 # EMAIL
 # ------------------------------------------------------------------------------
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# Emails are queued in the accounts outbox and sent by `manage.py send_queued_emails`.
+# For tests point EMAIL_HOST/EMAIL_PORT at a local stand-in
+# (`manage.py smtp_sink`, EMAIL_USE_TLS=False) or set EMAIL_BACKEND to the
+# locmem/console backend.
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
+EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
@@ -1,7 +1,8 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from apps.core.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -11,7 +12,12 @@ urlpatterns = [
 	path('api/stories/', include('apps.stories.urls')),  # Direct stories app URLs
 	path('api/tours/', include('apps.tours.urls')),  # Direct tours app URLs
     path('api/accounts/', include('apps.accounts.urls')),  # Direct accounts app URLs
+    path('api/core/', include('apps.core.urls')),  # Shared infrastructure endpoints
+    path('api/bookings/', include('apps.bookings.urls')),  # Booking lists and exports
+    path('api/search/', include('apps.search.urls')),  # Full-text search across the catalogues
 	path('ckeditor/', include('ckeditor_uploader.urls')),
+    # Uploaded files, handed to the front proxy when MEDIA_SERVING says so
+    re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$", serve_media, name='media'),
     # your other URLs
 
     # path('api/cars/', include('apps.cars.urls')),
@@ -20,9 +26,4 @@ urlpatterns = [
     # path('api/guided-trips/', include('apps.guided_trips.urls')),
     # path('api/pilgrim/', include('apps.pilgrim.urls')),
     # path('api/stories/', include('apps.stories.urls')),
-    # path('api/bookings/', include('apps.bookings.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]